@@ -0,0 +1,93 @@
+import time
+import tracemalloc
+
+from fibertree import Tensor
+
+#
+# Compare the memory footprint and traversal throughput of
+# Tensor.fromRandom() tensors with "list" and "array" fiber storage
+#
+
+print("--------------------------------------")
+print("      Fiber storage benchmark")
+print("--------------------------------------")
+print("")
+
+shape = [200, 2000]
+densities = [0.01, 0.1, 0.5]
+repeats = 3
+
+
+def build(storage, density):
+    """Build a random tensor and return it with its allocated bytes"""
+
+    tracemalloc.start()
+    t = Tensor.fromRandom(["M", "K"],
+                          shape,
+                          [1.0, density],
+                          seed=10,
+                          storage=storage)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return t, size
+
+
+def traverse(t):
+    """Sum all the values in a tensor, returning elements per second"""
+
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+
+        count = 0
+        total = 0
+        for m, a_k in t.getRoot():
+            for k, a_val in a_k:
+                total += a_val
+                count += 1
+
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return count / best
+
+
+def intersect(t):
+    """Intersect each row with the next, returning rows per second"""
+
+    best = None
+    a_m = t.getRoot()
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+
+        prev = None
+        for m, a_k in a_m:
+            if prev is not None:
+                for k, (a_val, b_val) in prev & a_k:
+                    pass
+            prev = a_k
+
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return len(a_m) / best
+
+
+print(f"Shape: {shape}")
+print("")
+print(f"{'density':>8} {'storage':>8} {'memory (KB)':>12} "
+      f"{'elems/s':>12} {'rows/s':>10}")
+
+for density in densities:
+    for storage in ["list", "array"]:
+        t, size = build(storage, density)
+
+        print(f"{density:8.2f} {storage:>8} {size/1024:12.1f} "
+              f"{traverse(t):12.0f} {intersect(t):10.0f}")
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,77 @@
+import time
+
+import numpy as np
+
+from fibertree import Fiber
+
+#
+# Compare the intersection (&) and union (|) of mid-density leaf
+# fibers held in array storage (coordinate lists) against fibers held
+# in bitmap storage (word-wide AND/OR)
+#
+
+print("--------------------------------------")
+print("      Bitmap storage benchmark")
+print("--------------------------------------")
+print("")
+
+K = 1000000
+repeats = 3
+
+
+def make_fiber(density, storage, seed):
+    """Create a random leaf fiber"""
+
+    rng = np.random.default_rng(seed)
+
+    coords = np.flatnonzero(rng.random(K) < density)
+    payloads = rng.random(len(coords)) + 1
+
+    return Fiber(coords, payloads, shape=K, storage=storage)
+
+
+def intersect(a_k, b_k):
+    """Count the elements of the intersection"""
+
+    return sum(1 for _ in a_k & b_k)
+
+
+def union(a_k, b_k):
+    """Count the elements of the union"""
+
+    return sum(1 for _ in a_k | b_k)
+
+
+print(f"K: {K}")
+print("")
+print(f"{'density':>8} {'op':>3} {'storage':>8} {'time (s)':>9} {'coords (KB)':>12}")
+
+for density in [0.05, 0.2, 0.5]:
+    for name, op in [("&", intersect), ("|", union)]:
+        results = {}
+
+        for storage in ["array", "bitmap"]:
+            a_k = make_fiber(density, storage, 10)
+            b_k = make_fiber(density, storage, 20)
+
+            if storage == "array":
+                size = a_k.coords.nbytes
+            else:
+                size = a_k._bitmap.nbytes + a_k._bitmap_ranks.nbytes
+
+            best = None
+
+            for _ in range(repeats):
+                start = time.perf_counter()
+                results[storage] = op(a_k, b_k)
+                elapsed = time.perf_counter() - start
+
+                best = elapsed if best is None else min(best, elapsed)
+
+            print(f"{density:>8} {name:>3} {storage:>8} {best:9.3f} {size // 1024:12d}")
+
+        assert results["array"] == results["bitmap"]
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,57 @@
+import random
+import time
+
+from fibertree import Fiber
+
+#
+# Compare building long fibers by inserting elements in random
+# coordinate order (each insertion with getPayloadRef() of a new
+# coordinate) into a fiber held in list storage against a fiber held
+# in "chunked" storage
+#
+
+print("--------------------------------------")
+print("    Chunked storage insertion benchmark")
+print("--------------------------------------")
+print("")
+
+repeats = 3
+
+
+def build(coords, storage):
+    """Insert the coordinates into an empty fiber"""
+
+    z_k = Fiber(storage=storage)
+
+    for k in coords:
+        z_ref = z_k.getPayloadRef(k)
+        z_ref += k
+
+    return z_k
+
+
+print(f"{'occupancy':>10} {'storage':>8} {'time (s)':>9}")
+
+for occupancy in [10000, 100000, 300000]:
+    coords = list(range(occupancy))
+    random.Random(10).shuffle(coords)
+
+    results = {}
+
+    for storage in ["list", "chunked"]:
+        best = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[storage] = build(coords, storage)
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f"{occupancy:>10} {storage:>8} {best:9.3f}")
+
+    assert results["list"] == results["chunked"]
+
+print("")
+print("--------------------------------------")
+print("")
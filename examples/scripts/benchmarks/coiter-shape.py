@@ -0,0 +1,55 @@
+import time
+
+from fibertree import Fiber
+
+#
+# Compare the dense co-iteration of `Fiber.coiterShape()` (a cursor
+# per fiber) against searching each fiber at each coordinate of the
+# shape with `getPayload()`
+#
+
+print("--------------------------------------")
+print("    Dense co-iteration benchmark")
+print("--------------------------------------")
+print("")
+
+K = 200000
+repeats = 3
+
+
+def search_coiter(fibers):
+    """Co-iterate by searching each fiber at each coordinate"""
+
+    for k in range(K):
+        payloads = tuple(fiber.getPayload(k) for fiber in fibers)
+
+
+def cursor_coiter(fibers):
+    """Co-iterate with coiterShape"""
+
+    for k, payloads in Fiber.coiterShape(fibers):
+        pass
+
+
+print(f"K: {K}")
+print("")
+print(f"{'density':>8} {'coiterator':>11} {'time (s)':>9}")
+
+for density in [0.01, 0.1, 0.5]:
+    fibers = [Fiber.fromRandom([K], density, seed=seed) for seed in [1, 2]]
+
+    for name, coiter in [("search", search_coiter), ("cursor", cursor_coiter)]:
+        best = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            coiter(fibers)
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f"{density:>8} {name:>11} {best:9.3f}")
+
+print("")
+print("--------------------------------------")
+print("")
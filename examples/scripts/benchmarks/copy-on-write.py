@@ -0,0 +1,63 @@
+import copy
+import time
+import tracemalloc
+
+from fibertree import Tensor
+
+#
+# Compare copying a tensor with deepcopy() (which pickles the whole
+# fibertree) against a copy-on-write copy (which shares the
+# coordinates and payloads of the fibers until they are mutated), and
+# time the transforms that copy their input tensor and measure the
+# memory that their results hold
+#
+
+print("--------------------------------------")
+print("     Copy-on-write tensor benchmark")
+print("--------------------------------------")
+print("")
+
+M = 2000
+K = 2000
+density = 0.05
+repeats = 3
+
+a = Tensor.fromRandom(["M", "K"], [M, K], [1.0, density], seed=10)
+
+operations = {
+    "deepcopy": lambda: copy.deepcopy(a),
+    "cow copy": lambda: a._cowCopy(),
+    "splitUniform": lambda: a.splitUniform(100),
+    "splitUniform (K)": lambda: a.splitUniform(100, depth=1),
+    "swizzleRanks": lambda: a.swizzleRanks(["K", "M"]),
+    "updatePayloads": lambda: a.updatePayloads(lambda i, c, p: p, depth=1),
+}
+
+print(f"A: {M}x{K} (density {density})")
+print("")
+print(f"{'operation':>17} {'time (s)':>9} {'memory (MB)':>12}")
+
+for name, operation in operations.items():
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = operation()
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    del result
+
+    tracemalloc.start()
+    result = operation()
+    memory = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    print(f"{name:>17} {best:9.3f} {memory:12.1f}")
+
+assert a._cowCopy() == copy.deepcopy(a)
+
+print("")
+print("--------------------------------------")
+print("")
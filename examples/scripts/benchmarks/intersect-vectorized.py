@@ -0,0 +1,76 @@
+import time
+
+import numpy as np
+
+from fibertree import Fiber
+
+#
+# Compare the two-operand intersection (&) of long leaf fibers held
+# in list storage (the generator-based merge) against fibers held in
+# array storage (the vectorized intersection)
+#
+
+print("--------------------------------------")
+print("    Vectorized intersection benchmark")
+print("--------------------------------------")
+print("")
+
+K = 1000000
+repeats = 3
+
+rng = np.random.default_rng(10)
+
+
+def make_fiber(occupancy, storage):
+    """Create a random leaf fiber"""
+
+    coords = np.sort(rng.choice(K, occupancy, replace=False))
+    payloads = rng.random(occupancy)
+
+    if storage == "list":
+        return Fiber(coords.tolist(), payloads.tolist())
+
+    return Fiber(coords, payloads, storage=storage)
+
+
+def dot(a_k, b_k):
+    """Intersect two fibers and sum the products of the payloads"""
+
+    z = 0
+
+    for k, (a_val, b_val) in a_k & b_k:
+        z += a_val * b_val
+
+    return z
+
+
+print(f"K: {K}")
+print("")
+print(f"{'occupancy':>19} {'storage':>8} {'time (s)':>9}")
+
+for a_occupancy, b_occupancy in [(100000, 100000), (1000, 500000)]:
+    results = {}
+
+    for storage in ["list", "array"]:
+        rng = np.random.default_rng(10)
+
+        a_k = make_fiber(a_occupancy, storage)
+        b_k = make_fiber(b_occupancy, storage)
+
+        best = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[storage] = dot(a_k, b_k)
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        occupancy = f"{a_occupancy}x{b_occupancy}"
+        print(f"{occupancy:>19} {storage:>8} {best:9.3f}")
+
+    assert results["list"] == results["array"]
+
+print("")
+print("--------------------------------------")
+print("")
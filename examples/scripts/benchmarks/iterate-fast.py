@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+
+from fibertree import Fiber
+
+#
+# Compare a plain iteration loop over a leaf fiber (which takes the
+# fast path when metrics are not being collected) against the checked
+# iteration of `iterOccupancy()`
+#
+
+print("--------------------------------------")
+print("    Fiber iteration benchmark")
+print("--------------------------------------")
+print("")
+
+K = 1000000
+repeats = 3
+
+rng = np.random.default_rng(10)
+
+coords = np.arange(K)
+payloads = rng.random(K) + 1
+
+
+def fast_loop(a_k):
+    """Iterate with the fast path"""
+
+    for k, a_val in a_k:
+        pass
+
+
+def checked_loop(a_k):
+    """Iterate with the checked path"""
+
+    for k, a_val in a_k.iterOccupancy():
+        pass
+
+
+print(f"K: {K}")
+print("")
+print(f"{'storage':>8} {'iterator':>9} {'time (s)':>9}")
+
+for storage in ["list", "array"]:
+    if storage == "list":
+        a_k = Fiber(coords.tolist(), payloads.tolist())
+    else:
+        a_k = Fiber(coords, payloads, storage=storage)
+
+    for name, loop in [("checked", checked_loop), ("fast", fast_loop)]:
+        best = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            loop(a_k)
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f"{storage:>8} {name:>9} {best:9.3f}")
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,68 @@
+import time
+
+from fibertree import Tensor
+
+#
+# Compare applying chains of transforms eagerly, which builds every
+# intermediate tensor, against materializing the same chains recorded
+# on a lazy tensor (which fuses a run of swaps and swizzles into one
+# swizzle, and a split followed by a swizzle into a single sort), and
+# against iterating over the first element of the lazy root fiber
+# (which only transforms the sub-fiber that is reached)
+#
+
+print("--------------------------------------")
+print("     Lazy transforms benchmark")
+print("--------------------------------------")
+print("")
+
+M = 200
+K = 2000
+N = 100
+density = [1.0, 0.05, 0.2]
+repeats = 3
+
+a = Tensor.fromRandom(["M", "K", "N"], [M, K, N], density, seed=10)
+
+chains = {
+    "swap-swap-swap": lambda t: t.swapRanks(depth=0).swapRanks(depth=1).swapRanks(depth=0),
+    "split-swizzle": lambda t: t.splitUniform(64, depth=1).swizzleRanks(["N", "M", "K.1", "K.0"]),
+    "split-swizzle-flatten": lambda t: t.splitUniform(64, depth=1)
+                                        .swizzleRanks(["M", "K.1", "N", "K.0"])
+                                        .flattenRanks(depth=2),
+}
+
+def first_fiber(root):
+    for c, p in root:
+        return p
+
+def best_time(operation):
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+print(f"A: {M}x{K}x{N} (density {density})")
+print("")
+print(f"{'chain':>22} {'eager (s)':>10} {'lazy (s)':>9} {'eager first (s)':>16} {'lazy first (s)':>15}")
+
+for name, chain in chains.items():
+    eager = best_time(lambda: chain(a))
+    lazy = best_time(lambda: chain(a.lazy()).materialize())
+    eager_first = best_time(lambda: first_fiber(chain(a).getRoot()))
+    lazy_first = best_time(lambda: first_fiber(chain(a.lazy()).getRoot()))
+
+    print(f"{name:>22} {eager:10.3f} {lazy:9.3f} {eager_first:16.3f} {lazy_first:15.3f}")
+
+    assert chain(a.lazy()).materialize() == chain(a)
+    assert first_fiber(chain(a.lazy()).getRoot()) == first_fiber(chain(a).getRoot())
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,54 @@
+import time
+
+from fibertree import Tensor
+
+#
+# Compare a sweep over mappings that repeatedly swizzles and splits
+# the same input tensor without and with the cache of results of the
+# tensor (see Tensor.setCacheSize())
+#
+
+print("--------------------------------------")
+print("       Result cache benchmark")
+print("--------------------------------------")
+print("")
+
+M = 500
+K = 500
+density = 0.1
+sweeps = 20
+
+a = Tensor.fromRandom(["M", "K"], [M, K], [1.0, density], seed=10)
+
+
+def sweep():
+    """Apply the operations of each mapping of the sweep"""
+
+    for _ in range(sweeps):
+        for order in [["M", "K"], ["K", "M"]]:
+            a.swizzleRanks(order)
+
+        for tile in [10, 50]:
+            a.splitUniform(tile)
+            a.splitEqual(tile, depth=1)
+
+
+print(f"A: {M}x{K} (density {density})  Sweeps: {sweeps}")
+print("")
+print(f"{'cache':>6} {'time (s)':>9}")
+
+for size in [0, 16]:
+    a.setCacheSize(size)
+
+    start = time.perf_counter()
+    sweep()
+    elapsed = time.perf_counter() - start
+
+    print(f"{size:>6} {elapsed:9.3f}")
+
+print("")
+print(a.getCacheStats())
+
+print("")
+print("--------------------------------------")
+print("")
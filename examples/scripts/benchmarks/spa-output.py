@@ -0,0 +1,69 @@
+import time
+
+from fibertree import Fiber
+from fibertree import Tensor
+
+#
+# Compare a B-stationary spMspV (see ../spMspV), which scatters
+# partial products into the output fiber with the populate operator
+# (<<), with the output fiber in list storage against the output
+# fiber in "spa" (dense scratchpad accumulator) storage
+#
+
+print("--------------------------------------")
+print("      SPA output fiber benchmark")
+print("--------------------------------------")
+print("")
+
+M = 20000
+K = 1000
+density = 0.02
+repeats = 3
+
+a = Tensor.fromRandom(["K", "M"], [K, M], [1.0, density], seed=10)
+b = Tensor.fromRandom(["K"], [K], [0.5], seed=20)
+
+
+def spmspv(storage):
+    """B-stationary spMspV"""
+
+    z_m = Fiber(shape=M, storage=storage)
+
+    a_k = a.getRoot()
+    b_k = b.getRoot()
+
+    for k_coord, (a_m, b_val) in (a_k & b_k):
+        for m_coord, (z_ref, a_val) in (z_m << a_m):
+            z_ref += a_val * b_val
+
+    #
+    # Compact the output
+    #
+    len(z_m)
+
+    return z_m
+
+
+print(f"A: {K}x{M} (density {density})  B: {K} (density 0.5)")
+print("")
+print(f"{'storage':>8} {'time (s)':>9}")
+
+results = {}
+
+for storage in ["list", "spa"]:
+    best = None
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results[storage] = spmspv(storage)
+        elapsed = time.perf_counter() - start
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"{storage:>8} {best:9.3f}")
+
+assert results["list"] == results["spa"]
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,71 @@
+import time
+
+from fibertree import Fiber
+
+#
+# Time splitting a large fiber (with "list" and "array" storage) and
+# then traversing each partition once. The partition boundaries are
+# found with a binary search, and each partition holds slices of the
+# coordinates and payloads of the fiber (views of the buffers of an
+# "array" storage fiber), rather than being built element by element
+#
+
+print("--------------------------------------")
+print("     Split views benchmark")
+print("--------------------------------------")
+print("")
+
+shape = 4000000
+occupancy = 1000000
+repeats = 3
+
+coords = list(range(0, shape, shape // occupancy))
+payloads = [float(c % 7 + 1) for c in coords]
+
+fibers = {storage: Fiber(coords, payloads, shape=shape, storage=storage)
+          for storage in ("list", "array")}
+
+splits = {
+    "splitUniform": lambda f: f.splitUniform(1000),
+    "splitUniform (halo)": lambda f: f.splitUniform(1000, pre_halo=4, post_halo=4),
+    "splitEqual": lambda f: f.splitEqual(250),
+    "splitNonUniform": lambda f: f.splitNonUniform(list(range(0, shape, 1000))),
+}
+
+def traverse(split):
+    total = 0.0
+    for fiber in split.payloads:
+        for p in fiber.payloads:
+            total += p
+    return total
+
+print(f"Fiber: shape {shape}, occupancy {occupancy}")
+print("")
+print(f"{'split':>20} {'storage':>8} {'split (s)':>10} {'traverse (s)':>13}")
+
+totals = {}
+
+for name, split in splits.items():
+    for storage, fiber in fibers.items():
+        best_split = None
+        best_traverse = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = split(fiber)
+            middle = time.perf_counter()
+            total = traverse(result)
+            end = time.perf_counter()
+
+            best_split = middle - start if best_split is None else min(best_split, middle - start)
+            best_traverse = end - middle if best_traverse is None else min(best_traverse, end - middle)
+
+        totals.setdefault(name, set()).add(total)
+
+        print(f"{name:>20} {storage:>8} {best_split:10.3f} {best_traverse:13.3f}")
+
+assert all(len(total) == 1 for total in totals.values())
+
+print("")
+print("--------------------------------------")
+print("")
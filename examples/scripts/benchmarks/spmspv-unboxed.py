@@ -0,0 +1,102 @@
+import gc
+import time
+import tracemalloc
+
+from fibertree import Tensor
+
+#
+# Compare a read-mostly C-stationary spMspV (see ../spMspV) on
+# tensors whose leaf payloads are unboxed (the default), tensors whose
+# leaf payloads have all been boxed and tensors with "array" storage
+#
+# The size of the inputs is measured both after they are built and
+# after the workload has run, since traversing a fiber boxes its
+# unboxed payloads in place
+#
+
+print("--------------------------------------")
+print("      Unboxed payload benchmark")
+print("--------------------------------------")
+print("")
+
+M = 500
+K = 2000
+density = 0.05
+repeats = 3
+
+
+def make_inputs(payloads):
+    """Create the A matrix and B vector with the given kind of payloads"""
+
+    storage = "array" if payloads == "array" else "list"
+
+    a = Tensor.fromRandom(["M", "K"], [M, K], [1.0, density], seed=10, storage=storage)
+    b = Tensor.fromRandom(["K"], [K], [0.5], seed=20, storage=storage)
+
+    if payloads == "boxed":
+        #
+        # Rewriting each payload with itself stores the boxed
+        # payload produced by iteration
+        #
+        a.getRoot().updatePayloads(lambda i, c, p: p, depth=1)
+        b.getRoot().updatePayloads(lambda i, c, p: p)
+
+    return a, b
+
+
+def spmspv(a, b):
+    """C-stationary spMspV"""
+
+    z = Tensor(rank_ids=["M"])
+
+    a_m = a.getRoot()
+    b_k = b.getRoot()
+    z_m = z.getRoot()
+
+    for m_coord, (z_ref, a_k) in (z_m << a_m):
+        for k_coord, (a_val, b_val) in (a_k & b_k):
+            z_ref += a_val * b_val
+
+    return z
+
+
+print(f"A: {M}x{K} (density {density})  B: {K} (density 0.5)")
+print("")
+print(f"{'payloads':>9} {'built (KB)':>11} {'after (KB)':>11} {'first (s)':>10} {'best (s)':>9}")
+
+results = {}
+
+for payloads in ["boxed", "unboxed", "array"]:
+    #
+    # Measure the inputs after they are built and after the workload
+    #
+    tracemalloc.start()
+    a, b = make_inputs(payloads)
+    built, _ = tracemalloc.get_traced_memory()
+    z = spmspv(a, b)
+    del z
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    #
+    # Time the workload (without tracing) on fresh inputs
+    #
+    a, b = make_inputs(payloads)
+
+    times = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        z = spmspv(a, b)
+        times.append(time.perf_counter() - start)
+
+    results[payloads] = z
+
+    print(f"{payloads:>9} {built/1024:11.1f} {after/1024:11.1f} {times[0]:10.3f} {min(times):9.3f}")
+
+assert results["boxed"] == results["unboxed"] == results["array"]
+
+print("")
+print("--------------------------------------")
+print("")
@@ -0,0 +1,54 @@
+import time
+
+from fibertree import Tensor
+
+#
+# Compare swizzling the ranks of a 4-D tensor by collecting the
+# elements in a FiberBuilder (a sort of coordinate tuples and a
+# per-element rebuild) against a single lexicographic sort of arrays
+# of coordinates, for a full and a partial (top two ranks) swizzle
+#
+
+print("--------------------------------------")
+print("       Swizzle ranks benchmark")
+print("--------------------------------------")
+print("")
+
+shape = [20, 30, 40, 50]
+density = [1.0, 0.8, 0.5, 0.5]
+repeats = 3
+
+a = Tensor.fromRandom(["A", "B", "C", "D"], shape, density, seed=10)
+
+rank_ids = a.getRankIds()
+a_shape = a.getShape(authoritative=True)
+
+print(f"Shape: {shape}  Leaf elements: {a.countValues()}")
+print("")
+print(f"{'rank order':>12} {'engine':>8} {'time (s)':>9}")
+
+for new_rank_ids, swiz_len in [(["D", "C", "B", "A"], 4), (["B", "A", "C", "D"], 2)]:
+    guide = [rank_ids.index(r) for r in new_rank_ids][:swiz_len]
+
+    engines = {"builder": lambda: a._swizzleBuilder(guide),
+               "sort": lambda: a._swizzleArrays(guide, a_shape)}
+
+    results = {}
+
+    for engine, swizzle in engines.items():
+        best = None
+
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[engine] = swizzle()
+            elapsed = time.perf_counter() - start
+
+            best = elapsed if best is None else min(best, elapsed)
+
+        print(f"{''.join(new_rank_ids):>12} {engine:>8} {best:9.3f}")
+
+    assert results["builder"] == results["sort"]
+
+print("")
+print("--------------------------------------")
+print("")
@@ -1,7 +1,9 @@
 
 from .core.tensor import *
+from .core.lazy_tensor import *
 from .core.rank import *
 from .core.fiber import *
+from .core.fiber_builder import *
 from .core.coord_payload import *
 from .core.payload import *
 
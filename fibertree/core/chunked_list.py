@@ -0,0 +1,392 @@
+#cython: language_level=3
+"""ChunkedList
+
+A class used to hold the coordinates or payloads of a fiber with
+"chunked" storage (see `Fiber.getStorage()`).
+
+"""
+import bisect
+import logging
+from collections.abc import MutableSequence
+from itertools import chain
+
+#
+# Set up logging
+#
+module_logger = logging.getLogger('fibertree.core.chunked_list')
+
+
+class ChunkedList(MutableSequence):
+    """A list held as a list of bounded-size blocks.
+
+    A `ChunkedList` behaves like a Python `list`, but holds its items
+    in a list of blocks (each a `list` of at most `2*load` items) and
+    a summary index of the offset of each block. So an insertion or
+    deletion only moves the items of one block, rather than all the
+    items after the insertion point, and the block holding a position
+    is found by a binary search of the summary index.
+
+    The summary index is a binary indexed (Fenwick) tree of the block
+    lengths, so it is updated in O(log n) after an insertion or
+    deletion, and is only rebuilt when a block is split or removed,
+    i.e., at most once per `load` insertions or deletions. Concatenating
+    or slicing lists copies whole blocks rather than single items.
+
+    Constructor
+    -----------
+
+    Parameters
+    ----------
+
+    iterable: iterable, default=()
+        The initial items of the list
+
+    load: integer, default=512
+        The target number of items in a block
+
+    """
+
+    def __init__(self, iterable=(), load=512):
+        """__init__"""
+
+        self._load = load
+
+        if isinstance(iterable, ChunkedList):
+            self._blocks = [list(block) for block in iterable._blocks]
+        else:
+            items = list(iterable)
+            self._blocks = [items[i:i + load] for i in range(0, len(items), load)]
+
+        self._len = sum(len(block) for block in self._blocks)
+
+        self._index = None
+        self._top = 0
+
+
+    @classmethod
+    def _fromBlocks(cls, blocks, load):
+        """Create a `ChunkedList` that holds the given (non-empty) blocks"""
+
+        result = cls(load=load)
+
+        result._blocks = blocks
+        result._len = sum(len(block) for block in blocks)
+
+        return result
+
+#
+# Summary index methods
+#
+    def _getIndex(self):
+        """Return the summary index, a binary indexed (Fenwick) tree of
+        the block lengths, building it if needed"""
+
+        index = self._index
+
+        if index is None:
+            index = [0]
+            index.extend(len(block) for block in self._blocks)
+
+            size = len(self._blocks)
+
+            for i in range(1, size + 1):
+                parent = i + (i & -i)
+                if parent <= size:
+                    index[parent] += index[i]
+
+            self._index = index
+
+            self._top = 1 << (size.bit_length() - 1) if size else 0
+
+        return index
+
+
+    def _changed(self, block_index, delta):
+        """Record that the length of a block changed by `delta`"""
+
+        index = self._index
+
+        if index is None:
+            return
+
+        i = block_index + 1
+        size = len(index)
+
+        while i < size:
+            index[i] += delta
+            i += i & -i
+
+
+    def _invalidate(self):
+        """Record that the blocks were added, removed or replaced"""
+
+        self._index = None
+
+
+    def _offset(self, block_index):
+        """Return the position of the first item of a block"""
+
+        index = self._getIndex()
+
+        offset = 0
+        i = block_index
+
+        while i > 0:
+            offset += index[i]
+            i -= i & -i
+
+        return offset
+
+
+    def _locate(self, pos):
+        """Return the block index and the index in the block of `pos`"""
+
+        if pos < 0:
+            pos += self._len
+
+        if not 0 <= pos < self._len:
+            raise IndexError("ChunkedList index out of range")
+
+        index = self._getIndex()
+        size = len(index) - 1
+
+        #
+        # Descend the tree to the last block whose offset is not
+        # greater than `pos`
+        #
+        block_index = 0
+        bit = self._top
+
+        while bit:
+            i = block_index + bit
+
+            if i <= size and index[i] <= pos:
+                block_index = i
+                pos -= index[i]
+
+            bit >>= 1
+
+        return block_index, pos
+
+#
+# Sequence methods
+#
+    def __len__(self):
+        """__len__"""
+
+        return self._len
+
+
+    def __getitem__(self, key):
+        """__getitem__"""
+
+        if isinstance(key, slice):
+            return self._getSlice(key)
+
+        block_index, index = self._locate(key)
+
+        return self._blocks[block_index][index]
+
+
+    def _getSlice(self, key):
+        """Return a slice (copying whole blocks where possible)"""
+
+        start, stop, step = key.indices(self._len)
+
+        if step != 1:
+            return ChunkedList(list(self)[key], load=self._load)
+
+        if start >= stop:
+            return ChunkedList(load=self._load)
+
+        first_block, first_index = self._locate(start)
+        last_block, last_index = self._locate(stop - 1)
+
+        if first_block == last_block:
+            blocks = [self._blocks[first_block][first_index:last_index + 1]]
+        else:
+            blocks = [self._blocks[first_block][first_index:]]
+            blocks.extend(list(block) for block in self._blocks[first_block + 1:last_block])
+            blocks.append(self._blocks[last_block][:last_index + 1])
+
+        return ChunkedList._fromBlocks(blocks, self._load)
+
+
+    def __setitem__(self, key, value):
+        """__setitem__"""
+
+        if isinstance(key, slice):
+            items = list(self)
+            items[key] = value
+            self._reset(items)
+            return
+
+        block_index, index = self._locate(key)
+
+        self._blocks[block_index][index] = value
+
+
+    def __delitem__(self, key):
+        """__delitem__"""
+
+        if isinstance(key, slice):
+            items = list(self)
+            del items[key]
+            self._reset(items)
+            return
+
+        block_index, index = self._locate(key)
+
+        block = self._blocks[block_index]
+        del block[index]
+
+        self._len -= 1
+
+        if len(block) == 0:
+            del self._blocks[block_index]
+            self._invalidate()
+        else:
+            self._changed(block_index, -1)
+
+
+    def insert(self, pos, value):
+        """Insert `value` before position `pos`"""
+
+        if pos < 0:
+            pos = max(0, pos + self._len)
+
+        if pos >= self._len:
+            self.append(value)
+            return
+
+        block_index, index = self._locate(pos)
+
+        block = self._blocks[block_index]
+        block.insert(index, value)
+
+        self._len += 1
+
+        if len(block) > 2 * self._load:
+            self._splitBlock(block_index)
+        else:
+            self._changed(block_index, 1)
+
+
+    def append(self, value):
+        """Append `value` to the end of the list"""
+
+        if len(self._blocks) == 0 or len(self._blocks[-1]) >= 2 * self._load:
+            self._blocks.append([value])
+            self._invalidate()
+        else:
+            self._blocks[-1].append(value)
+            self._changed(len(self._blocks) - 1, 1)
+
+        self._len += 1
+
+
+    def extend(self, values):
+        """Append all of `values` to the end of the list"""
+
+        for value in values:
+            self.append(value)
+
+
+    def _splitBlock(self, block_index):
+        """Split an oversized block into two blocks"""
+
+        block = self._blocks[block_index]
+        half = len(block) // 2
+
+        self._blocks[block_index:block_index + 1] = [block[:half], block[half:]]
+
+        self._invalidate()
+
+
+    def _reset(self, items):
+        """Replace all the items of the list"""
+
+        load = self._load
+
+        self._blocks = [items[i:i + load] for i in range(0, len(items), load)]
+        self._len = len(items)
+
+        self._invalidate()
+
+
+    def copy(self):
+        """Return a (shallow) copy of the list"""
+
+        return ChunkedList(self, load=self._load)
+
+
+    def __contains__(self, value):
+        """__contains__"""
+
+        return any(value in block for block in self._blocks)
+
+
+    def __iter__(self):
+        """__iter__"""
+
+        return chain.from_iterable(self._blocks)
+
+
+    def __reversed__(self):
+        """__reversed__"""
+
+        for block in reversed(self._blocks):
+            yield from reversed(block)
+
+
+    def __add__(self, other):
+        """Concatenate two lists (copying whole blocks of a `ChunkedList`)"""
+
+        if isinstance(other, ChunkedList):
+            blocks = [list(block) for block in chain(self._blocks, other._blocks)]
+            return ChunkedList._fromBlocks(blocks, self._load)
+
+        return list(self) + list(other)
+
+
+    def __eq__(self, other):
+        """__eq__"""
+
+        if isinstance(other, (ChunkedList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+        return NotImplemented
+
+
+    def __repr__(self):
+        """__repr__"""
+
+        return f"ChunkedList({list(self)})"
+
+#
+# Search methods
+#
+    def bisect_left(self, value):
+        """Return the position of `value` in a sorted list (or where it
+        would be inserted), as `bisect.bisect_left()` does"""
+
+        blocks = self._blocks
+
+        #
+        # Find the first block whose last item is not less than `value`
+        #
+        lo = 0
+        hi = len(blocks)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if blocks[mid][-1] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        if lo == len(blocks):
+            return self._len
+
+        return self._offset(lo) + bisect.bisect_left(blocks[lo], value)
@@ -0,0 +1,251 @@
+#cython: language_level=3
+"""CompressedFibers
+
+A class used to hold the payloads of a fiber whose sub-fibers are
+segments of the flat arrays of a compressed (CSR-like) fibertree.
+
+"""
+import logging
+import weakref
+
+from .fiber import Fiber
+
+#
+# Set up logging
+#
+module_logger = logging.getLogger('fibertree.core.compressed_fibers')
+
+
+class CompressedFibers:
+    """The sub-fibers of a fiber in a compressed fibertree.
+
+    A compressed fibertree holds three flat arrays for each rank (see
+    `Tensor.save()`):
+
+    - **segments**: the offsets of each fiber of the rank in the
+      other arrays of the rank
+
+    - **coords**: the coordinates of all the fibers of the rank
+
+    - **payloads**: (leaf rank only) the values of all the fibers of
+      the rank. The payload of each element of the other ranks is the
+      fiber of the rank below at the same position.
+
+    A `CompressedFibers` is a read-only sequence used as the payloads
+    of a fiber of such a tree. A sub-fiber is only created when it is
+    accessed (by indexing or iteration), and holds zero-copy views
+    (slices) of the arrays in "array" storage, so the arrays may be,
+    for example, the arrays of a CSR matrix (see `Fiber.fromCSR()`)
+    or a memory-mapped file (see `Tensor.fromFile()`).
+
+    Sub-fibers are only weakly cached, so they are dropped as soon as
+    they are no longer referenced, unless they have been mutated. The
+    first mutation of a sub-fiber converts it into "list" storage (see
+    `Fiber._toListStorage()`), which **pins** it, i.e., the sequence
+    keeps it, so the mutation is not lost.
+
+    Constructor
+    -----------
+
+    Parameters
+    ----------
+
+    fiber: Fiber
+        The fiber whose payloads are the sub-fibers
+
+    ranks: list of dicts
+        The "segments", "coords" and "payloads" arrays of each rank
+
+    positions: sequence of integers
+        The positions of the sub-fibers in their rank
+
+    shape: list
+        The shape of each rank
+
+    default: value
+        The default value of the fibers
+
+    level: integer
+        The rank of the sub-fibers
+
+    """
+
+    def __init__(self, fiber, ranks, positions, shape, default, level):
+        """__init__"""
+
+        self._fiber = fiber
+
+        self._ranks = ranks
+        self._positions = positions
+
+        self._shape = shape
+        self._default = default
+        self._level = level
+
+        self._cache = weakref.WeakValueDictionary()
+        self._pinned = {}
+
+
+    @staticmethod
+    def makeFiber(ranks, level, pos, shape, default):
+        """Create the fiber at position `pos` of rank `level`
+
+        Parameters
+        ----------
+
+        ranks: list of dicts
+            The "segments", "coords" and "payloads" arrays of each rank
+
+        level: integer
+            The rank of the fiber
+
+        pos: integer
+            The position of the fiber in its rank
+
+        shape: list
+            The shape of each rank
+
+        default: value
+            The default value of the fibers
+
+        Returns
+        -------
+
+        fiber: Fiber
+            A fiber whose sub-fibers (if any) are created lazily
+
+        """
+
+        segments = ranks[level]['segments']
+
+        start = int(segments[pos])
+        end = int(segments[pos + 1])
+
+        coords = ranks[level]['coords'][start:end]
+
+        if level == len(ranks) - 1:
+            return Fiber._fromBuffers(coords,
+                                      ranks[level]['payloads'][start:end],
+                                      shape=shape[level],
+                                      default=default)
+
+        fiber = Fiber._fromBuffers(coords, [], shape=shape[level], default=default)
+
+        fiber.payloads = CompressedFibers(fiber,
+                                          ranks,
+                                          range(start, end),
+                                          shape,
+                                          default,
+                                          level + 1)
+
+        return fiber
+
+
+    def __len__(self):
+        """Return the number of sub-fibers"""
+
+        return len(self._positions)
+
+
+    def __getitem__(self, key):
+        """Return the sub-fiber at position `key` (or a list of
+        sub-fibers for a slice)"""
+
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+
+        pos = int(self._positions[key])
+
+        fiber = self._pinned.get(pos)
+
+        if fiber is not None:
+            return fiber
+
+        fiber = self._cache.get(pos)
+
+        if fiber is not None:
+            return fiber
+
+        fiber = CompressedFibers.makeFiber(self._ranks,
+                                           self._level,
+                                           pos,
+                                           self._shape,
+                                           self._default)
+
+        #
+        # The sub-fibers are owned by the rank below the owner of the
+        # fiber, but are not added to the rank, which would keep them
+        # alive
+        #
+        owner = self._fiber.getOwner()
+
+        if owner is not None and owner.getNextRank() is not None:
+            fiber.setOwner(owner.getNextRank())
+
+        #
+        # Let the sub-fiber pin itself when it is first mutated
+        #
+        fiber.__dict__["_view_of"] = (self, pos)
+
+        self._cache[pos] = fiber
+
+        return fiber
+
+
+    def pin(self, pos, fiber):
+        """Keep the sub-fiber `fiber` at position `pos` (e.g., because
+        it has been mutated), and the fibers above it"""
+
+        self._pinned[pos] = fiber
+
+        view_of = self._fiber.__dict__.pop("_view_of", None)
+
+        if view_of is not None:
+            view_of[0].pin(view_of[1], self._fiber)
+
+
+    def __iter__(self):
+        """Iterate over the sub-fibers"""
+
+        for i in range(len(self)):
+            yield self[i]
+
+
+    def __getstate__(self):
+        """Get state for pickling (the cache cannot be pickled)"""
+
+        state = self.__dict__.copy()
+        del state['_cache']
+
+        return state
+
+
+    def __setstate__(self, state):
+        """Set state when unpickling"""
+
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_pinned', {})
+        self._cache = weakref.WeakValueDictionary()
+
+
+    @staticmethod
+    def checkIndices(indptr, indices):
+        """Check that the coordinates of each fiber are increasing
+
+        The check is done with vectorized operations over all the
+        fibers of a rank at once.
+
+        """
+
+        increasing = indices[1:] > indices[:-1]
+
+        #
+        # The last element of a fiber need not be less than the first
+        # element of the next fiber
+        #
+        ends = indptr[1:-1]
+        ends = ends[(ends > 0) & (ends < len(indices))]
+
+        increasing[ends - 1] = True
+
+        return bool(increasing.all())
@@ -7,6 +7,7 @@ coordinate/payload tuple.
 """
 import logging
 import pickle
+from collections import namedtuple
 
 from .payload import Payload
 
@@ -227,7 +228,7 @@ class CoordPayload():
         `Payload`, a `CoordPayload` or a `Fiber`.
 
         """
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             self.payload <<= other.payload
         else:
             self.payload <<= self.payload + other
@@ -239,7 +240,7 @@ class CoordPayload():
     def __add__(self, other):
         """__add__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             ans = self.payload + other.payload
         else:
             ans = self.payload + other
@@ -254,7 +255,7 @@ class CoordPayload():
     def __iadd__(self, other):
         """__iadd__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             self.payload += other.payload
         else:
             self.payload += other
@@ -264,7 +265,7 @@ class CoordPayload():
     def __sub__(self, other):
         """__sub__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             ans = self.payload - other.payload
         else:
             ans = self.payload - other
@@ -279,7 +280,7 @@ class CoordPayload():
     def __isub__(self, other):
         """__isub__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             self.payload -= other.payload
         else:
             self.payload -= other
@@ -289,7 +290,7 @@ class CoordPayload():
     def __mul__(self, other):
         """__mul__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             ans = self.payload * other.payload
         else:
             ans = self.payload * other
@@ -304,7 +305,7 @@ class CoordPayload():
     def __imul__(self, other):
         """__imul__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             self.payload *= other.payload
         else:
             self.payload *= other
@@ -314,7 +315,7 @@ class CoordPayload():
     def __div__(self, other):
         """__div__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             ans = self.payload / other.payload
         else:
             ans = self.payload / other
@@ -329,7 +330,7 @@ class CoordPayload():
     def __idiv__(self, other):
         """__idiv__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             self.payload /= other.payload
         else:
             self.payload /= other
@@ -344,7 +345,7 @@ class CoordPayload():
     def __eq__(self, other):
         """__eq__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload == other.payload
 
         return self.payload == other
@@ -352,7 +353,7 @@ class CoordPayload():
     def __lt__(self, other):
         """__lt__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload < other.payload
 
         return self.payload < other
@@ -360,7 +361,7 @@ class CoordPayload():
     def __le__(self, other):
         """__le__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload <= other.payload
 
         return self.payload <= other
@@ -368,7 +369,7 @@ class CoordPayload():
     def __gt__(self, other):
         """__gt__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload > other.payload
 
         return self.payload > other
@@ -376,7 +377,7 @@ class CoordPayload():
     def __ge__(self, other):
         """__ge__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload >= other.payload
 
         return self.payload >= other
@@ -384,7 +385,7 @@ class CoordPayload():
     def __ne__(self, other):
         """__ne__"""
 
-        if isinstance(other, CoordPayload):
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
             return self.payload != other.payload
 
         return self.payload != other
@@ -409,6 +410,172 @@ class CoordPayload():
 
         return str(f"CoordPayload(coord={self.coord}, payload={self.payload})")
 
+
+_CoordPayloadTuple = namedtuple("CoordPayloadTuple", ["coord", "payload"])
+
+
+class CoordPayloadTuple(_CoordPayloadTuple):
+    """A lightweight, read-only element of a fiber.
+
+    Instances of this class are returned instead of a `CoordPayload`
+    by the fast path of fiber iteration (see `Fiber.__iter__()`).
+    Since it is a `tuple`, it is created and unpacked (e.g., `for c, p
+    in fiber`) without running any Python code.
+
+    Like a `CoordPayload`, the element has `coord` and `payload`
+    attributes, and its index, arithmetic and comparison operations
+    operate on the `payload`. However, the attributes cannot be
+    assigned to, so operations that update the element (e.g., +=, <<=)
+    update the **boxed** payload in place.
+
+    """
+
+    __slots__ = ()
+
+    def _setPayload(self, payload):
+        """Allow an in-place update of the payload (e.g., `element.payload
+        <<= value`) to assign back the same object"""
+
+        if payload is not self.payload:
+            raise AttributeError("can't set attribute")
+
+    payload = property(_CoordPayloadTuple.payload.__get__, _setPayload)
+
+    @staticmethod
+    def _payload(other):
+        """Return the payload of `other` if it is an element"""
+
+        if isinstance(other, (CoordPayload, CoordPayloadTuple)):
+            return other.payload
+
+        return other
+
+    #
+    # Position based methods
+    #
+    def __getitem__(self, keys):
+        """Index into the payload (see `CoordPayload.__getitem__()`)"""
+
+        return self.payload.__getitem__(keys)
+
+    def __setitem__(self, key, newvalue):
+        """Update the payload (see `CoordPayload.__setitem__()`)"""
+
+        self.payload.__setitem__(key, newvalue)
+
+    #
+    # Assignment operator
+    #
+    def __ilshift__(self, other):
+        """Assign a new **boxed** value (see `CoordPayload.__ilshift__()`)"""
+
+        payload = self.payload
+        payload <<= self._payload(other)
+
+        return self
+
+    #
+    # Arithmetic operations
+    #
+    def __add__(self, other):
+        """__add__"""
+
+        return self.payload + self._payload(other)
+
+    def __radd__(self, other):
+        """__radd__"""
+
+        return other + self.payload
+
+    def __iadd__(self, other):
+        """__iadd__"""
+
+        payload = self.payload
+        payload += self._payload(other)
+
+        return self
+
+    def __sub__(self, other):
+        """__sub__"""
+
+        return self.payload - self._payload(other)
+
+    def __rsub__(self, other):
+        """__rsub__"""
+
+        return other - self.payload
+
+    def __isub__(self, other):
+        """__isub__"""
+
+        payload = self.payload
+        payload -= self._payload(other)
+
+        return self
+
+    def __mul__(self, other):
+        """__mul__"""
+
+        return self.payload * self._payload(other)
+
+    def __rmul__(self, other):
+        """__rmul__"""
+
+        return other * self.payload
+
+    def __imul__(self, other):
+        """__imul__"""
+
+        payload = self.payload
+        payload *= self._payload(other)
+
+        return self
+
+    def __truediv__(self, other):
+        """__truediv__"""
+
+        return self.payload / self._payload(other)
+
+    def __rtruediv__(self, other):
+        """__rtruediv__"""
+
+        return other / self.payload
+
+#
+# Comparison operations
+#
+    def __eq__(self, other):
+        """__eq__"""
+
+        return self.payload == self._payload(other)
+
+    def __ne__(self, other):
+        """__ne__"""
+
+        return self.payload != self._payload(other)
+
+    def __lt__(self, other):
+        """__lt__"""
+
+        return self.payload < self._payload(other)
+
+    def __le__(self, other):
+        """__le__"""
+
+        return self.payload <= self._payload(other)
+
+    def __gt__(self, other):
+        """__gt__"""
+
+        return self.payload > self._payload(other)
+
+    def __ge__(self, other):
+        """__ge__"""
+
+        return self.payload >= self._payload(other)
+
+    __hash__ = None
+
 #
 # Pdoc stuff
 #
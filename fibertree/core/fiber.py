@@ -10,6 +10,7 @@ a tensor.
 import logging
 from sys import exit
 
+import array
 import bisect
 import copy
 import sys
@@ -20,13 +21,15 @@ import numbers
 import pickle
 import random
 
+import numpy as np
 import yaml
 
 from .any import Any
+from .chunked_list import ChunkedList
 from .coord_payload import CoordPayload
 from .iterators import coiterShape, coiterShapeRef, coiterActiveShape, \
     coiterActiveShapeRef, coiterRangeShape, coiterRangeShapeRef, intersection, \
-    union
+    union, unionReduce, _fast_payloads, _get_format
 from .metrics import Metrics
 from .payload import Payload
 from .rank_attrs import RankAttrs
@@ -36,6 +39,14 @@ from .rank_attrs import RankAttrs
 #
 module_logger = logging.getLogger('fibertree.core.fiber')
 
+#
+# Population count of "bitmap" words (only in numpy 2.0 or later, see
+# `Fiber._popcount()`)
+#
+_bitwise_count = getattr(np, "bitwise_count", None)
+
+_byte_popcounts = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
 
 #
 # Define an error class
@@ -150,6 +161,15 @@ class Fiber:
     unique: Boolean, default=True
         Attribute specifing that the coordinates are unique
 
+    storage: str, default="list"
+        The concrete representation of the coordinates and payloads,
+        either "list", "array", "spa", "bitmap" or "chunked" (see
+        `Fiber.getStorage()`)
+
+    indexed: Boolean, default=None
+        Attribute specifying that coordinate lookups use a hash index
+        of the coordinates, by default only for unordered fibers
+
 
     Notes
     -----
@@ -165,6 +185,49 @@ class Fiber:
     instance variables holding those lists (coords and payloads) are
     currently left public...
 
+    Leaf payloads are held as raw (unboxed) values and are wrapped in
+    a `Payload` (in place) the first time a reference to them is
+    handed out, e.g., by `Fiber.getPayloadRef()`, the `<<` operator or
+    iteration (including the merge operators), so the payloads
+    yielded can be used to update the fiber. So unboxed payloads save
+    a Python object per element only until they are reached, e.g.,
+    for tensors that are built, copied, transformed or saved without
+    being traversed. Traversing a fiber boxes its payloads, so for
+    read-only tensors that are traversed use `storage="array"`
+    (below), whose iteration yields copies and never boxes the
+    stored payloads.
+
+    With `storage="array"` the coordinates and any scalar leaf
+    payloads are instead held in contiguous buffers (`array.array` or
+    a `memoryview` of a NumPy array), which avoids a Python object per
+    element. Such fibers are read-optimized, and the first mutation of
+    the fiber converts it back to list storage.
+
+    With `storage="spa"` a leaf fiber with a known shape is held as a
+    dense scratchpad accumulator (SPA): a dense array of payloads, an
+    occupancy bitmap and a list of the coordinates touched. Such
+    fibers are write-optimized for use as outputs, e.g., of the `<<`
+    operator, since `Fiber.getPayloadRef()` and `Fiber.getPayload()`
+    are O(1) for any coordinate. The first use of the fiber that needs
+    its (sorted) coordinates and payloads compacts it into list
+    storage.
+
+    With `storage="bitmap"` a leaf fiber with a known shape holds an
+    occupancy bitmap (in 64-bit words) and its payloads packed as in
+    "array" storage. Membership and the position of a coordinate (its
+    rank in the bitmap) are found with a popcount over the words, and
+    the intersection (&) and union (|) of two bitmap fibers use
+    word-wide AND/OR operations. Like "array" storage, the first
+    mutation converts the fiber to list storage.
+
+    With `storage="chunked"` the coordinates and payloads are held in
+    a `ChunkedList`, i.e., a list of bounded-size blocks with a summary
+    index of the block offsets. So inserting or deleting an element
+    (e.g., with `Fiber.getPayloadRef()` of a new coordinate) only
+    moves the elements of one block, and a lookup is a binary search
+    of the blocks, which makes such fibers suited to being built in
+    coordinate order other than increasing.
+
     """
 
 
@@ -178,7 +241,9 @@ class Fiber:
                  ordered=True,
                  unique=True,
                  rank_attrs=None,
-                 active_range=None):
+                 active_range=None,
+                 storage="list",
+                 indexed=None):
 
         #
         # Set up logging
@@ -191,6 +256,20 @@ class Fiber:
         self._ordered = ordered
         self._unique = unique
 
+        if indexed is None:
+            indexed = not ordered
+
+        self._indexed = indexed
+        self._coord_index = None
+
+        #
+        # Set when the coordinate and payload lists may be shared
+        # with a copy-on-write copy (see `Fiber._cowCopy()`), or to
+        # "coords" when only the coordinate list may be shared (see
+        # `Fiber._unsharePayloads()`)
+        #
+        self._shared = False
+
         #
         # Handle cases with missing inputs
         #
@@ -223,17 +302,35 @@ class Fiber:
 
         #
         # Note:
-        #    If a payload is already boxed, Payload.maybe_box() will
-        #    NOT double box it.
+        #    Leaf payloads are held unboxed and are only **boxed**
+        #    (in place) when a reference to them is needed, e.g., by
+        #    getPayloadRef(). Payloads that are already boxed are
+        #    left boxed.
         #
         #    We do not eliminate explicit zeros in the payloads
         #    so zeros will be preserved.
         #
-        self.coords = [coord for coord in coords]
-        """The list of coordinates of the fiber"""
+        assert storage in ("list", "array", "spa", "bitmap", "chunked"), \
+            f"Unsupported fiber storage: {storage}"
+
+        #
+        # Note: "spa" and "bitmap" storage are set up from list or
+        #       array storage, once the shape and default of the fiber
+        #       are known
+        #
+        self._storage = {"spa": "list", "bitmap": "array"}.get(storage, storage)
+
+        if self._storage == "array":
+            self._setArrayStorage(coords, payloads)
+        elif self._storage == "chunked":
+            self.coords = ChunkedList(coords)
+            self.payloads = ChunkedList(payloads)
+        else:
+            self.coords = [coord for coord in coords]
+            """The list of coordinates of the fiber"""
 
-        self.payloads = [Payload.maybe_box(p) for p in payloads]
-        """The list of payloads of the fiber"""
+            self.payloads = [p for p in payloads]
+            """The list of payloads of the fiber"""
 
         #
         # Check that fiber attributes are satisfied
@@ -285,6 +382,11 @@ class Fiber:
         #
         self._saved_pos = 0
 
+        if storage == "spa":
+            self._toSpaStorage()
+        elif storage == "bitmap":
+            self._toBitmapStorage()
+
         #
         # Clear all stats
         #
@@ -358,8 +460,8 @@ class Fiber:
         Parameters
         ----------
 
-        payload_list: list
-            A nest of lists holding the values of the Fiber.
+        payload_list: list or numpy.ndarray
+            A nest of lists (or an array) holding the values of the Fiber.
 
         kwargs: keyword arguments
             Keyword arguments accepted by `Fiber.__init__()`
@@ -372,8 +474,25 @@ class Fiber:
         out, i.e., they will have no coordinates.  Unless the entire
         input is zeros.
 
+        The non-empty elements of an array are found with vectorized
+        operations, so an array is much faster to convert than the
+        equivalent nest of lists.
+
         """
 
+        if isinstance(payload_list, np.ndarray):
+            if default is None:
+                mask = np.ones(payload_list.shape, dtype=bool)
+            else:
+                mask = payload_list != default
+
+            coord_arrays = np.nonzero(mask)
+
+            return Fiber._makeFiberFromArrays(coord_arrays,
+                                              payload_list[coord_arrays],
+                                              shape=list(payload_list.shape),
+                                              default=default)
+
         f = Fiber._makeFiber(payload_list, default=default)
 
         #
@@ -434,8 +553,161 @@ class Fiber:
         return Fiber(coords, payloads, shape=len(payload_list), default=default)
 
 
+    @staticmethod
+    def _makeFiberFromArrays(coord_arrays, values, shape, default=0, storage="list"):
+        """Make a fibertree out of arrays of coordinates and values
+
+        The coordinates of the elements must be sorted lexicographically
+        and unique. Each fiber at a level is created from a contiguous
+        segment of the elements, whose boundaries are found with
+        vectorized operations.
+
+        Parameters
+        ----------
+
+        coord_arrays: list of numpy.ndarray
+            An array of coordinates for each level of the tree
+
+        values: numpy.ndarray
+            The leaf payloads of the elements
+
+        shape: list
+            The shape of each level of the tree
+
+        default: value, default=0
+            The default (empty) value of the fibers
+
+        storage: str, default="list"
+            The storage used for the fibers. With "array" storage the
+            fibers hold zero-copy views of the (sorted) input arrays.
+
+        """
+
+        def maybe_list(array):
+            return array if storage == "array" else array.tolist()
+
+        depth = len(coord_arrays)
+
+        #
+        # Find the positions where a new element starts at each level,
+        # i.e., where the coordinates of that level or above change
+        #
+        change = np.zeros(len(values), dtype=bool)
+        change[:1] = True
+
+        starts = []
+        for coords in coord_arrays:
+            change = change.copy()
+            change[1:] |= coords[1:] != coords[:-1]
+            starts.append(np.flatnonzero(change))
+
+        #
+        # Build the fibers bottom up, grouping the elements of a level
+        # by the element of the level above they belong to
+        #
+        payloads = maybe_list(np.asarray(values)[starts[-1]])
+
+        for level in range(depth - 1, 0, -1):
+            coords = maybe_list(np.asarray(coord_arrays[level])[starts[level]])
+
+            bounds = np.searchsorted(starts[level], starts[level - 1]).tolist()
+            bounds.append(len(coords))
+
+            payloads = [Fiber(coords[b:e],
+                              payloads[b:e],
+                              shape=shape[level],
+                              default=default,
+                              storage=storage)
+                        for b, e in zip(bounds[:-1], bounds[1:])]
+
+        coords = maybe_list(np.asarray(coord_arrays[0])[starts[0]])
+
+        return Fiber(coords, payloads, shape=shape[0], default=default, storage=storage)
+
+
+    @classmethod
+    def fromCSR(cls, indptr, indices, data, shape=None, default=0):
+        """Construct a two-level fibertree that is a view of a
+        compressed sparse row (CSR) matrix.
+
+        The top-level fiber has a coordinate for each non-empty row
+        of the matrix, and its payloads are a `CompressedFibers`
+        sequence that creates the fiber of a row only when it is
+        accessed, e.g., by iteration or `Fiber.getPayload()`. Each
+        row fiber holds zero-copy views (slices) of `indices` and
+        `data` in "array" storage.
+
+        Parameters
+        ----------
+
+        indptr: array-like
+            The offsets of the elements of each row in `indices` and `data`
+
+        indices: array-like
+            The (column) coordinates of the elements of each row
+
+        data: array-like
+            The values of the elements of each row
+
+        shape: list, default=[number of rows, one more than the largest column]
+            The shape of the matrix
+
+        default: value, default=0
+            The default (empty) value of the fibers
+
+
+        Notes
+        -----
+
+        The arrays are never written. Like other "array" storage
+        fibers, the first mutation of a fiber converts it into list
+        storage (for the top-level fiber, a list of all the rows). A
+        mutated row is kept by the top-level fiber, while the other
+        rows are recreated from the arrays whenever they are accessed
+        (see `CompressedFibers`).
+
+        The coordinates of each row must be sorted, i.e., the matrix
+        must be in canonical form.
+
+        """
+
+        from .compressed_fibers import CompressedFibers
+
+        indptr = np.asarray(indptr)
+        indices = np.asarray(indices)
+        data = np.asarray(data)
+
+        assert indptr.ndim == 1 and len(indptr) > 0, \
+            "Illegal indptr array"
+
+        assert len(indices) == len(data) == indptr[-1], \
+            "The indices and data arrays must match indptr"
+
+        assert CompressedFibers.checkIndices(indptr, indices), \
+            "The coordinates of each row must be increasing"
+
+        if shape is None:
+            shape = [len(indptr) - 1,
+                     int(indices.max()) + 1 if len(indices) else 0]
+
+        #
+        # Create a two-rank compressed fibertree without the empty
+        # rows (whose segments are empty)
+        #
+        rows = np.flatnonzero(np.diff(indptr))
+
+        ranks = [{'segments': np.array([0, len(rows)]),
+                  'coords': rows},
+                 {'segments': np.append(indptr[rows], indptr[-1]),
+                  'coords': indices,
+                  'payloads': data}]
+
+        return CompressedFibers.makeFiber(ranks, 0, 0, shape, default)
+
+
     @classmethod
-    def fromRandom(cls, shape, density, interval=10, seed=None, default=0):
+    def fromRandom(cls, shape, density, interval=10, seed=None, default=0,
+                   storage="list"):
         """Create a fiber populated with random values.
 
         Multi-level fibers are supported by recursively creating
@@ -463,6 +735,9 @@ class Fiber:
         seed: a valid argument for `random.seed`
             A seed to pass to `random.seed`.
 
+        storage: str, default="list"
+            The storage used for the fibers (see `Fiber.getStorage()`)
+
 
         Notes
         =====
@@ -505,7 +780,8 @@ class Fiber:
                     payload = Fiber.fromRandom(shape[1:],
                                                density[1:],
                                                interval,
-                                               default=default)
+                                               default=default,
+                                               storage=storage)
                     if payload.isEmpty():
                         continue
             else:
@@ -517,7 +793,7 @@ class Fiber:
             coords.append(c)
             payloads.append(payload)
 
-        f = Fiber(coords, payloads, default=default)
+        f = Fiber(coords, payloads, default=default, storage=storage)
 
         return f
 
@@ -704,12 +980,55 @@ class Fiber:
         This method should be used in preference to accessing the
         `Fiber.payloads` class instance variable directly.
 
+        The leaf payloads of "list" and "chunked" storage are
+        **boxed** in place (see `Fiber._boxPayloads()`), so they are
+        references that can be used to update the fiber. The payloads
+        of "array" and "bitmap" storage are packed values.
+
         """
         assert not self.isLazy()
 
+        if self._storage in ("list", "chunked"):
+            self._boxPayloads()
+
         return self.payloads
 
 
+    def getStorage(self):
+        """Return the storage used for the coordinates and payloads
+
+        Returns
+        -------
+        storage: str
+            Either "list" (Python lists), "array" (contiguous
+            buffers for the coordinates and scalar payloads), "spa"
+            (a dense scratchpad accumulator), "bitmap" (an
+            occupancy bitmap and packed payloads) or "chunked"
+            (lists of bounded-size blocks)
+
+        Notes
+        -----
+
+        Mutating an "array" or "bitmap" fiber first converts it to
+        "list" storage, and any access to the coordinates and payloads of
+        a "spa" fiber other than an O(1) lookup or update compacts it
+        into "list" storage, so the storage of a fiber may change
+        over its lifetime.
+
+        Iterating over a "list" or "chunked" fiber yields references
+        to its (leaf) payloads, which are **boxed** in place, so they
+        can be used to update the fiber. The payloads of an "array" or
+        "bitmap" fiber are packed values, so iterating over it (or
+        intersecting it with another such fiber) yields copies, and
+        updating them does not change the fiber. Use
+        `Fiber.getPayloadRef()` (which converts the fiber to "list"
+        storage) to update such a fiber.
+
+        """
+
+        return self._storage
+
+
     def isOrdered(self):
         """Return the status of the "ordered" attribute
 
@@ -725,6 +1044,21 @@ class Fiber:
         return self._ordered
 
 
+    def isIndexed(self):
+        """Return the status of the "indexed" attribute
+
+        Returns
+        -------
+        is_indexed: Boolean
+            Set to True if coordinate lookups use a hash index
+
+        Note: this attribute cannot be changed after fiber creation.
+
+        """
+
+        return self._indexed
+
+
     def isUnique(self):
         """Return the status of the "unique" attribute
 
@@ -768,6 +1102,10 @@ class Fiber:
         non-existent element, nothing is created and the `default`
         value is returned.
 
+        The payload of an existing element is returned as a reference
+        (**boxing** it in place if needed), except for fibers with
+        "array" storage, where a copy is returned.
+
         If `start_pos` is specified it is used as a shortcut to start the
         search for the coordinate. And a new position is saved for use in
         a later search. Only works for a one-deep search.
@@ -809,6 +1147,18 @@ class Fiber:
         assert default is None or not allocate
         assert start_pos is None or len(coords) == 1
 
+        if self._storage == "spa" and len(coords) == 1 and start_pos is None \
+                and not Metrics.isCollecting():
+            payload = self._spaPayload(coords[0])
+
+            if payload is not None:
+                return payload
+
+            if allocate:
+                return Payload(self._spa_default)
+
+            return Payload.maybe_box(default)
+
         start_pos = Payload.get(start_pos)
         assert not start_pos or self.coords[start_pos] <= coords[0]
 
@@ -831,7 +1181,10 @@ class Fiber:
             existing = self._coordExists(coord0, index)
 
         if existing:
-            payload = self.payloads[index]
+            if self._storage in ("list", "chunked"):
+                payload = self._boxPayload(index)
+            else:
+                payload = Payload.maybe_box(self.payloads[index])
         elif allocate:
             payload = self._createDefault(addtorank=False)
             const_used = not isinstance(payload, Fiber)
@@ -901,6 +1254,15 @@ class Fiber:
         assert not self.isLazy()
         assert start_pos is None or len(coords) == 1
 
+        #
+        # The reference can be used to update the payload
+        #
+        self._noteMutation()
+
+        if self._storage == "spa" and len(coords) == 1 and start_pos is None \
+                and not Metrics.isCollecting():
+            return self._spaPayloadRef(coords[0])
+
         # TBD: Actually optimize the search
 
         start_pos = Payload.get(start_pos)
@@ -909,7 +1271,7 @@ class Fiber:
         index = self._coord2pos(coords[0], start_pos=start_pos)
 
         if self._coordExists(coords[0], index):
-            payload = self.payloads[index]
+            payload = self._boxPayload(index)
         else:
             payload = self._create_payload(coords[0])
 
@@ -948,9 +1310,13 @@ class Fiber:
         if pos is None:
             pos = self._coord2pos(coord)
 
+        self._toListStorage()
+
         self.coords.insert(pos, coord)
         self.payloads.insert(pos, payload)
 
+        self._indexInsert(pos, coord)
+
         #
         # Get the payload out of the payloads array
         # TBD: Not sure why I felt this was needed
@@ -962,7 +1328,24 @@ class Fiber:
         return payload
 
     def _deletePayload(self, coord):
-        """Remove a payload """
+        """Remove a payload
+
+        Remove the element at `coord` (if any) from the fiber, but not
+        from the owner's rank.
+
+        """
+
+        pos = self._coord2pos(coord)
+
+        if not self._coordExists(coord, pos):
+            return
+
+        self._toListStorage()
+
+        del self.coords[pos]
+        del self.payloads[pos]
+
+        self._indexDelete(pos, coord)
 
 
     def getRange(self,
@@ -1355,17 +1738,21 @@ class Fiber:
 
         payload = Payload.maybe_box(value)
 
+        self._toListStorage()
+
         index = 0
         try:
             index = next(x for x, val in enumerate(self.coords) if val >= coord)
             if self.coords[index] == coord:
-                return self.payloads[index]
+                return self._boxPayload(index)
             self.coords.insert(index, coord)
             self.payloads.insert(index, payload)
+            self._indexInsert(index, coord)
             return self.payloads[index]
         except StopIteration:
             self.coords.append(coord)
             self.payloads.append(payload)
+            self._indexInsert(len(self.coords) - 1, coord)
             return self.payloads[-1]
 
 
@@ -1376,13 +1763,17 @@ class Fiber:
 
         payload = Payload.maybe_box(value)
 
+        self._toListStorage()
+
         try:
             index = next(x for x, val in enumerate(self.coords) if val > coord)
             self.coords.insert(index, coord)
             self.payloads.insert(index, payload)
+            self._indexInsert(index, coord)
         except StopIteration:
             self.coords.append(coord)
             self.payloads.append(payload)
+            self._indexInsert(len(self.coords) - 1, coord)
 
         return None
 
@@ -2085,6 +2476,8 @@ class Fiber:
 
         assert not self.isLazy()
 
+        self._toListStorage()
+
         position = key
 
         #
@@ -2109,12 +2502,13 @@ class Fiber:
                     raise CoordinateError
 
             self.coords[position] = coord
+            self._indexInvalidate()
 
         #
         # A payload of None just updates the coordinate
         #
         if payload is not None:
-            self.payloads[position] = Payload.maybe_box(payload)
+            self.payloads[position] = payload
 
 
     def __len__(self):
@@ -2302,9 +2696,13 @@ class Fiber:
 
         """
 
+        self._toListStorage()
+
         self.coords.clear()
         self.payloads.clear()
 
+        self._indexInvalidate()
+
         # No longer lazy
         self._setIsLazy(False)
 
@@ -2337,7 +2735,7 @@ class Fiber:
 
         The "unique" property is not checked for "unordered" fibers.
 
-        The payload will be optionally be **boxed**.
+        The payload is stored unboxed, unless it already is **boxed**.
 
         """
 
@@ -2347,10 +2745,12 @@ class Fiber:
             assert self.maxCoord() is None or self.maxCoord() < coord, \
                    "Fiber coordinates in 'ordered' fibers must be monotonically increasing"
 
-        payload = Payload.maybe_box(value)
+        self._toListStorage()
 
         self.coords.append(coord)
-        self.payloads.append(payload)
+        self.payloads.append(value)
+
+        self._indexInsert(len(self.coords) - 1, coord)
 
 
     def extend(self, other):
@@ -2392,9 +2792,13 @@ class Fiber:
             assert self.maxCoord() is None or self.maxCoord() < other.coords[0], \
                 "Fiber coordinates in 'ordered' fibers must be monotonically increasing"
 
+        self._toListStorage()
+
         self.coords.extend(other.coords)
         self.payloads.extend(other.payloads)
 
+        self._indexInvalidate()
+
         return None
 
 
@@ -2475,6 +2879,9 @@ class Fiber:
 
         # Update my coordinates
 
+        self._toListStorage()
+        self._indexInvalidate()
+
         no_sort_needed = True
 
         last_coord = None
@@ -2558,6 +2965,8 @@ class Fiber:
                 p.updatePayloads(func, depth=depth - 1)
         else:
             # Update my payloads
+            self._toListStorage()
+
             for i, (c, p) in enumerate(self.iterOccupancy(tick=False)):
                 self.payloads[i] = func(i, c, p)
 
@@ -2999,12 +3408,21 @@ class Fiber:
         assert Payload.contains(other, Fiber)
         assert self._unique
 
-        if len(self.coords) != 0:
+        if self._storage == "chunked":
+            #
+            # Clear out any existing data (keeping the storage)
+            #
+            self.coords = ChunkedList()
+            self.payloads = ChunkedList()
+            self._indexInvalidate()
+        elif len(self.coords) != 0 or self._storage != "list":
             #
             # Clear out any existing data
             #
             self.coords = []
             self.payloads = []
+            self._storage = "list"
+            self._indexInvalidate()
 
         self._setDefault(other.getDefault())
         for c, p in other:
@@ -3297,7 +3715,10 @@ class Fiber:
 
         #
         # Othewise multiply `other` to each element of `self`
+        # (through references to the payloads)
         #
+        self._boxPayloads()
+
         for _, p in self:
             p *= other
 
@@ -3438,7 +3859,7 @@ class Fiber:
         class _SplitterUniform():
 
             def __init__(self, fiber, step, pre_halo, post_halo, relative):
-                self.fiber = fiber
+                self.fiber = fiber._splitSource()
                 self.step = step
                 self.pre_halo = pre_halo
                 self.post_halo = post_halo
@@ -3452,57 +3873,42 @@ class Fiber:
 
                 active_start, active_end = self.fiber.getActive()
 
-                upper_coords = []
-                lower_coords = []
-                lower_payloads = []
+                step = self.step
+                bisect_coords = self.fiber._bisectCoords
 
-                search_start = 0
+                # Find the positions of the coordinates that will be in
+                # some partition
+                lo = bisect_coords(active_start - self.pre_halo)
+                hi = bisect_coords(active_end + self.post_halo, lo)
 
-                for c, p in self.fiber.__iter__(tick=False):
-                    # If the coordinate will not be in any partition, skip it
-                    if c < active_start - self.pre_halo:
-                        continue
+                part = None
+                pos = lo
 
-                    if c >= active_end + self.post_halo:
-                        break
+                while pos < hi:
+                    # Move to the first partition that the coordinate
+                    # at `pos` will be in (in the post-halo), but not
+                    # before the partition holding the active range start
+                    first = (self.fiber.coords[pos] - self.post_halo) // step * step
+                    part = first if part is None else max(part, first)
+                    part = max(part, active_start // step * step)
 
-                    # Start at the partition where the coordinate will be in
-                    # the post-halo
-                    part = (c - self.post_halo) // self.step * self.step
-                    # End at the partition where the coordinate will be in the
-                    # pre-halo
-                    part_end = (c + self.pre_halo) // self.step * self.step + self.step
-
-                    inds = []
-                    while part < part_end:
-                        # Ensure that this partition is within the active range
-                        if part + self.step <= active_start:
-                            part += self.step
-                            continue
-                        elif part >= active_end:
-                            break
-
-                        # Add the coordinate to the partition
-                        if part in upper_coords[search_start:]:
-                            i = upper_coords.index(part)
-                        else:
-                            i = len(upper_coords)
-                            upper_coords.append(part)
-                            lower_coords.append([])
-                            lower_payloads.append([])
+                    if part >= active_end:
+                        break
 
-                        inds.append(i)
-                        lower_coords[i].append(c)
-                        lower_payloads[i].append(p)
+                    # The partition (with its halos) is a contiguous
+                    # range of positions
+                    start = bisect_coords(part - self.pre_halo, lo, hi)
+                    end = bisect_coords(part + step + self.post_halo, start, hi)
 
-                        part += self.step
+                    if start < end:
+                        yield self.build_elem(part, start, end)
 
-                    search_start = min(inds)
+                    part += step
+                    pos = bisect_coords(part - self.pre_halo, pos, hi)
 
-                for uc, lc, lp in zip(upper_coords, lower_coords, lower_payloads):
-                    yield self.build_elem(uc, lc, lp)
+            def build_elem(self, part, start, end):
+                coords, payloads = self.fiber._sliceStorage(start, end)
 
-            def build_elem(self, part, coords, payloads):
                 if relativeCoords:
                     coords = [c - part for c in coords]
 
@@ -3615,7 +4021,7 @@ class Fiber:
         class _SplitterNonUniform_iter():
 
             def __init__(self, fiber, splits, pre_halo, post_halo, relative):
-                self.fiber = fiber
+                self.fiber = fiber._splitSource()
                 self.pre_halo = pre_halo
                 self.post_halo = post_halo
                 self.relative = relative
@@ -3633,60 +4039,37 @@ class Fiber:
 
                 active_start, active_end = self.fiber.getActive()
 
-                lower_coords = [[] for _ in splits]
-                lower_payloads = [[] for _ in splits]
-
-                halo_start = self.sub_pre_halo(active_start)
-                halo_end = self.add_post_halo(active_end)
+                bisect_coords = self.fiber._bisectCoords
 
-                search_start = 0
+                # Find the positions of the coordinates that will be in
+                # some partition
+                lo = bisect_coords(self.sub_pre_halo(active_start))
+                hi = bisect_coords(self.add_post_halo(active_end), lo)
 
-                for c, p in self.fiber.__iter__(tick=False):
-                    if c < halo_start:
+                for i in range(len(splits)):
+                    # Ensure that this partition is within the active range
+                    if self.splits[i + 1] <= active_start:
                         continue
 
-                    if c >= halo_end:
+                    if self.splits[i] >= active_end:
                         break
 
-                    if c < self.sub_pre_halo(self.splits[search_start]):
-                        continue
-
-                    i = search_start
-                    inds = []
+                    # The partition (with its halos) is a contiguous
+                    # range of positions
+                    start = bisect_coords(self.sub_pre_halo(self.splits[i]), lo, hi)
+                    end = bisect_coords(self.add_post_halo(self.splits[i + 1]), start, hi)
 
-                    while i < len(splits):
-                        if self.splits[i + 1] <= active_start:
-                            i += 1
-                            continue
-
-                        elif self.splits[i] >= active_end:
-                            break
-
-                        elif c >= self.add_post_halo(self.splits[i + 1]):
-                            i += 1
-                            continue
-
-                        elif c < self.sub_pre_halo(self.splits[i]):
-                            break
-
-                        inds.append(i)
-                        lower_coords[i].append(c)
-                        lower_payloads[i].append(p)
-
-                        i += 1
-
-                    search_start = min(inds)
-
-                for i, (lc, lp) in enumerate(zip(lower_coords, lower_payloads)):
-                    if lc:
-                        yield self.build_elem(i, lc, lp)
+                    if start < end:
+                        yield self.build_elem(i, start, end)
 
             def add_post_halo(self, coord):
                 if self.post_halo != 0:
                     return coord + self.post_halo
                 return coord
 
-            def build_elem(self, ind, coords, payloads):
+            def build_elem(self, ind, start, end):
+                coords, payloads = self.fiber._sliceStorage(start, end)
+
                 if relative:
                     coords = [c - self.splits[ind] for c in coords]
 
@@ -3750,13 +4133,10 @@ class Fiber:
         class _SplitterEqual():
 
             def __init__(self, fiber, step, pre_halo, post_halo, relative):
-                splits = []
-                for i, (c, _) in enumerate(fiber.iterActive(tick=False)):
-                    if i == 0:
-                        splits.append(fiber.getActive()[0])
-
-                    elif i % step == 0:
-                        splits.append(c)
+                # Every `step`-th active coordinate starts a split
+                splits = fiber._activeCoords()[::step]
+                if splits:
+                    splits[0] = fiber.getActive()[0]
 
                 self.iter = fiber._splitNonUniform_iter(splits, pre_halo, post_halo, relative)
 
@@ -3821,20 +4201,21 @@ class Fiber:
         class _SplitterUnEqual():
 
             def __init__(self, fiber, sizes, pre_halo, post_halo, relative):
+                coords = fiber._activeCoords()
+
                 splits = []
-                j = 0
-                base = 0
-                for i, (c, _) in enumerate(fiber.iterActive(tick=False)):
-                    if j == len(sizes):
+                if coords:
+                    splits.append(fiber.getActive()[0])
+
+                # The active coordinate `size` positions after the start
+                # of a split starts the next split
+                pos = 0
+                for size in sizes:
+                    pos += size
+                    if size <= 0 or pos >= len(coords):
                         break
 
-                    if i == 0:
-                        splits.append(fiber.getActive()[0])
-
-                    elif i - base == sizes[j]:
-                        base = i
-                        j += 1
-                        splits.append(c)
+                    splits.append(coords[pos])
 
                 self.iter = fiber._splitNonUniform_iter(splits, pre_halo, post_halo, relative)
 
@@ -3873,7 +4254,7 @@ class Fiber:
 
         splitter: Iterator
             An iterator that yields 4 element tuples:
-            (partition_coord, coord_list, payload_list, active_range)
+            (partition_coord, coord_slice, payload_slice, active_range)
 
         depth: int
             The depth of the rank to actually partition
@@ -3885,7 +4266,7 @@ class Fiber:
             A fiber like self with the top rank split into two according to the
             splitter
         """
-        fiber = copy.deepcopy(self)
+        fiber = self._cowCopy()
 
         if depth == 0:
             return fiber._splitFiber(splitter)
@@ -3905,7 +4286,7 @@ class Fiber:
 
         splitter: Iterator
             An iterator that yields 4 element tuples:
-            (partition_coord, coord_list, payload_list, active_range)
+            (partition_coord, coord_slice, payload_slice, active_range)
 
         Returns
         -------
@@ -3923,6 +4304,11 @@ class Fiber:
         In light of the above, this method does not copy the fiber (so the
         result may contain references to the payloads of self).
 
+        The coordinates and payloads of each partition are slices of
+        those of self (see `Fiber._sliceStorage()`), so a partition of
+        an "array" storage fiber is a view of its buffers, which is
+        only copied (into "list" storage) if the partition is mutated.
+
         """
         shape = self.getRankAttrs().getShape()
 
@@ -3931,11 +4317,11 @@ class Fiber:
                       shape=shape)
 
         for part, coords, payloads, active_range in splitter(self):
-            lower = Fiber(coords=coords,
-                          payloads=payloads,
-                          active_range=active_range,
-                          default=self.getDefault(),
-                          shape=shape)
+            lower = Fiber._fromSlices(coords,
+                                      payloads,
+                                      active_range=active_range,
+                                      default=self.getDefault(),
+                                      shape=shape)
 
             upper.coords.append(part)
             upper.payloads.append(lower)
@@ -3959,11 +4345,25 @@ class Fiber:
         assert Payload.contains(other, Fiber), \
             "Fiber concatenation must involve two fibers"
 
+        if self._storage == "chunked" and other._storage == "chunked":
+            #
+            # Concatenate the blocks (rather than the elements)
+            #
+            return self._newFiber(coords=self.coords + other.coords,
+                                  payloads=self.payloads + other.payloads)
+
+        #
+        # The concatenated coordinates may not fit in the shape of
+        # a "bitmap" fiber, so (like its mutators) use "list" storage
+        #
+        storage = "list" if self._storage == "bitmap" else None
+
         #
         # TBD: Set default for Fiber
         #
-        return self._newFiber(coords=self.coords + other.coords,
-                              payloads=self.payloads + other.payloads)
+        return self._newFiber(coords=list(self.coords) + list(other.coords),
+                              payloads=list(self.payloads) + list(other.payloads),
+                              storage=storage)
 
 #
 # Iterators
@@ -3987,6 +4387,15 @@ class Fiber:
         """
         return union(*args, **kwargs)
 
+    @staticmethod
+    def unionReduce(*args, **kwargs):
+        """Union a set of fibers, reducing the payloads at each coordinate.
+
+        Note: because we want this to be a static method, we cannot entirely
+        move it to the submodule
+        """
+        return unionReduce(*args, **kwargs)
+
     from .iterators import __and__
     from .iterators import __or__
     from .iterators import __xor__
@@ -4029,8 +4438,8 @@ class Fiber:
         #
         # Flatten the (highest) two ranks
         #
-        # Note: We do not need to deepcopy explicitly, because flattenRanks
-        # does the deepcopy for us
+        # Note: We do not need to copy explicitly, because flattenRanks
+        # does the copy for us
         flattened = self.flattenRanks(style="pair")
 
         # Make sure that the flattened fiber has at least one coordinate
@@ -4199,8 +4608,8 @@ class Fiber:
         if merge_fn is None:
             merge_fn = lambda ps: sum(ps)
 
-        # Ensure that we only deepcopy once
-        copied = copy.deepcopy(self)
+        # Ensure that we only copy once
+        copied = self._cowCopy()
 
         if depth == 0:
             return copied._mergeRanksHelper(levels=levels, style=style, merge_fn=merge_fn)
@@ -4245,8 +4654,9 @@ class Fiber:
                 cur_payloads.append(p._mergeRanksHelper(
                                         levels=levels - 1, style=style, merge_fn=merge_fn))
 
-        coords = []
-        payloads = []
+        from .fiber_builder import FiberBuilder
+
+        builder = FiberBuilder(combine=lambda ps: Fiber._mergeToFibertree(ps, merge_fn))
 
         range_start = None
         range_end = None
@@ -4274,15 +4684,7 @@ class Fiber:
                                                 style=style,
                                                 shape=low_shape)
 
-                j = self._coord2pos(new_coord, coords=coords)
-
-                if j < len(coords) and new_coord == coords[j]:
-                    payloads[j].append(p0)
-                else:
-                    coords.insert(j, new_coord)
-                    payloads.insert(j, [p0])
-
-        merged_payloads = [Fiber._mergeToFibertree(ps, merge_fn) for ps in payloads]
+                builder.add(new_coord, p0)
 
         # Compute the shape
         shape = None
@@ -4317,7 +4719,7 @@ class Fiber:
         elif style == "linear":
             active_range = (0, float("inf"))
 
-        return Fiber(coords, merged_payloads, default=default, active_range=active_range, shape=shape)
+        return builder.build(default=default, active_range=active_range, shape=shape)
 
     @staticmethod
     def _mergeToFibertree(to_merge, merge_fn):
@@ -4572,19 +4974,143 @@ class Fiber:
 # Copy operation
 #
     def copy(self, preserve_owner=True):
-        """Deep copying that allows the owner to not be copied"""
-        if not preserve_owner:
-            owners = self._detach_owner()
+        """Copy-on-write copy that allows the owner to not be copied
 
-        copied = copy.deepcopy(self)
+        The fibers of the copy are owned by copies of the owning
+        ranks of the fibers of `self` (see `Fiber._cowCopy()`), unless
+        `preserve_owner` is False, in which case they have no owners
+        and hold a copy of the attributes of the owning ranks.
+
+        """
+
+        copied = self._cowCopy()
 
         if not preserve_owner:
-            self._attach_owner(owners)
+            owners = copied._detach_owner()
             copied._attach_attrs(owners)
 
         return copied
 
 
+    def _cowCopy(self, ranks=None):
+        """Create a copy-on-write copy of the fibertree
+
+        The copy is a new set of fibers, but the coordinate lists and
+        the leaf payload lists of each fiber are shared with the fiber
+        of `self` until either fiber is mutated, when the mutated fiber
+        first copies the lists (see `Fiber._toListStorage()`). So
+        copying is O(number of fibers) rather than O(number of
+        elements), and the data of fibers that are never mutated is
+        never copied.
+
+        The fibers of the copy are owned by (fiber-less) copies of the
+        owning ranks of the fibers of `self`, so mutating the copy
+        (e.g., adding a fiber or setting the format of a rank) does not
+        change the ranks of `self`.
+
+        Parameters
+        ----------
+        ranks: dict, default=None
+            Map from the id of each owning rank already copied to its
+            copy
+
+        """
+
+        assert not self.isLazy()
+
+        #
+        # Note: accessing the payloads compacts "spa" storage
+        #
+        payloads = self.payloads
+
+        if not isinstance(payloads, (list, ChunkedList, array.array, memoryview)):
+            #
+            # Payloads created lazily (e.g., from compressed arrays)
+            #
+            return copy.deepcopy(self)
+
+        if ranks is None:
+            ranks = {}
+
+        copied = object.__new__(type(self))
+        copied.__dict__.update(self.__dict__)
+
+        copied._rank_attrs = copy.copy(self._rank_attrs)
+        copied._coord_index = None
+        copied.__dict__.pop("_view_of", None)
+
+        if self._owner is not None:
+            if id(self._owner) not in ranks:
+                self._copyOwners(ranks)
+
+            copied._owner = ranks[id(self._owner)]
+            copied._owner.fibers.append(copied)
+
+        if len(payloads) > 0 and Payload.contains(payloads[0], Fiber):
+            copied.payloads = [Payload.get(p)._cowCopy(ranks) for p in payloads]
+        elif isinstance(payloads, (list, ChunkedList)) and Payload in map(type, payloads):
+            #
+            # Boxed payloads are references into the fiber, so the
+            # copy gets its own (unboxed) payloads
+            #
+            copied.payloads = type(payloads)(Payload.get(p) for p in payloads)
+
+        if self._storage in ("list", "chunked"):
+            self._shared = True
+            copied._shared = True
+
+        return copied
+
+
+    def _copyOwners(self, ranks):
+        """Add a copy without fibers of the owning rank of `self` and of
+        each rank below it that is not in `ranks` (a map from the id
+        of each rank to its copy, see `Fiber._cowCopy()`)"""
+
+        owners = []
+        rank = self._owner
+
+        while rank is not None and id(rank) not in ranks:
+            owners.append(rank)
+            rank = rank.getNextRank()
+
+        next_rank = None if rank is None else ranks[id(rank)]
+
+        for rank in reversed(owners):
+            next_rank = rank._emptyCopy(next_rank)
+            ranks[id(rank)] = next_rank
+
+
+    def _unshareStorage(self):
+        """ Copy the coordinate and payload lists that may be shared
+        with a copy-on-write copy (see `Fiber._cowCopy()`) """
+
+        self.coords = self.coords.copy()
+
+        if self._shared is True:
+            self.payloads = self.payloads.copy()
+
+        self._shared = False
+
+
+    def _unsharePayloads(self):
+        """ Copy the payload list that may be shared with a
+        copy-on-write copy (e.g., before boxing its payloads in
+        place), leaving the coordinate list shared
+
+        Since this is done before references to the payloads are
+        handed out (e.g., by iteration), it also records a (possible)
+        mutation of the fiber (see `Fiber._noteMutation()`)
+
+        """
+
+        self._noteMutation()
+
+        if self._shared is True:
+            self.payloads = self.payloads.copy()
+            self._shared = "coords"
+
+
     def __deepcopy__(self, memo):
         """__deepcopy__
 
@@ -4786,7 +5312,7 @@ class Fiber:
 
             str += cond_string(coord_indent * ' ')
             str += f"({format_coord(self.coords[i])} -> "
-            str += f"{format_payload(self.payloads[i])}) "
+            str += f"{format_payload(Payload.maybe_box(self.payloads[i]))}) "
             coord_indent = next_indent
 
         if items > cutoff:
@@ -4806,7 +5332,7 @@ class Fiber:
         # TBD: Owner is not properly reflected in representation
 
         payloads = [Payload.get(r) for r in self.payloads]
-        str = f"Fiber({self.coords!r}, {payloads!r}"
+        str = f"Fiber({list(self.coords)!r}, {payloads!r}"
 
         if self._owner:
             str += f", owner={self._owner.getId()}"
@@ -4905,7 +5431,7 @@ class Fiber:
         assert not self.isLazy()
 
         f = {'fiber':
-             {'coords': self.coords,
+             {'coords': list(self.coords),
               'payloads': [Payload.payload2dict(p) for p in self.payloads]}}
 
         return f
@@ -4921,7 +5447,9 @@ class Fiber:
                   initial=None,
                   max_coord=None,
                   ordered=None,
-                  unique=None):
+                  unique=None,
+                  storage=None,
+                  indexed=None):
         """Create a new fiber carrying over attributes from `self`
 
         Note: Input parameters must be kept in sync with `__init__`,
@@ -4942,6 +5470,12 @@ class Fiber:
         if shape is None:
             shape = self.getRankAttrs().getShape()
 
+        if storage is None:
+            storage = self._storage
+
+        if indexed is None:
+            indexed = self._indexed
+
         return Fiber(coords=coords,
                      payloads=payloads,
                      default=default,
@@ -4949,7 +5483,9 @@ class Fiber:
                      initial=initial,
                      max_coord=max_coord,
                      ordered=ordered,
-                     unique=unique)
+                     unique=unique,
+                     storage=storage,
+                     indexed=indexed)
 
 
     def _coord2pos(self, coord, start_pos=None, coords=None):
@@ -4960,7 +5496,8 @@ class Fiber:
 
         Handles cases where the fiber is "ordered" (using a binary
         search) or "unordered" (using a linear search). Also tries to
-        optimize search by using `start_pos` shortcuts.
+        optimize search by using `start_pos` shortcuts (using a
+        galloping search), or the hash index of "indexed" fibers.
 
         If the coordinate is not found return the index where it
         should be inserted, taking into account whether the fiber is
@@ -4996,28 +5533,61 @@ class Fiber:
         """
 
         if coords is None:
+            if self._storage == "bitmap" and isinstance(coord, int):
+                return self._bitmapRank(coord)
+
             coords = self.coords
 
+        if self._indexed and start_pos is None and coords is self.coords:
+            #
+            # Look up the coordinate in the hash index
+            #
+            try:
+                index = self._getCoordIndex().get(coord)
+            except TypeError:
+                # Unhashable coordinate
+                index = None
+
+            if index is not None:
+                return index
+
+            if not self._ordered:
+                return len(coords)
+
         if self._ordered:
             #
             # Find coordinate in an ordered fiber
             #
-            if start_pos is None:
+            if start_pos is None and isinstance(coords, ChunkedList):
+                #
+                # Do a bisection search of the blocks
+                #
+                index = coords.bisect_left(coord)
+            elif start_pos is None:
                 #
                 # Do a bisection search
                 #
                 index = bisect.bisect_left(coords, coord)
             else:
                 #
-                # Search linearly starting at `start_pos`
-                # Seach ends when the coordinate is found or passed
+                # Do a galloping search starting at `start_pos`, i.e.,
+                # probe at exponentially increasing distances until
+                # the coordinate is passed and then bisect the last
+                # interval. The result is the same as a linear search
+                # that ends when the coordinate is found or passed.
                 #
-                index = len(coords)
+                end = len(coords)
 
-                for i in range(start_pos, len(coords)):
-                    if coords[i] >= coord:
-                        index = i
-                        break
+                low = start_pos
+                probe = start_pos
+                step = 1
+
+                while probe < end and coords[probe] < coord:
+                    low = probe + 1
+                    probe += step
+                    step *= 2
+
+                index = bisect.bisect_left(coords, coord, low, min(probe, end))
         else:
             #
             # Find coordinate in an unordered fiber
@@ -5045,21 +5615,85 @@ class Fiber:
 
         """
 
+        if self._storage == "bitmap" and isinstance(coord, int):
+            return self._bitmapTest(coord)
+
         exists = pos < len(self.coords) and self.coords[pos] == coord
 
         return exists
 
-    def _checkOrdered(self):
-        """ Check that coordinates satisfy the "ordered" attribute """
+    def _getCoordIndex(self):
+        """ _getCoordIndex
 
-        if not self._ordered or len(self.coords) == 0:
-            return True
+        Return the hash index mapping each coordinate to its (first)
+        position, (re)building it if it is missing or out of date
 
-        coords = self.coords
+        """
 
-        last = coords[0]
+        index = self._coord_index
 
-        for c in coords[1:]:
+        if index is None or self._coord_index_size != len(self.coords):
+            index = {}
+            for pos, coord in enumerate(self.coords):
+                index.setdefault(coord, pos)
+
+            self._coord_index = index
+            self._coord_index_size = len(self.coords)
+
+        return index
+
+
+    def _indexInsert(self, pos, coord):
+        """ Update the hash index after inserting `coord` at `pos` """
+
+        if self._coord_index is None:
+            return
+
+        if pos == len(self.coords) - 1:
+            self._coord_index.setdefault(coord, pos)
+            self._coord_index_size += 1
+        else:
+            # Later positions moved, so rebuild on the next lookup
+            self._indexInvalidate()
+
+
+    def _indexDelete(self, pos, coord):
+        """ Update the hash index after deleting `coord` from `pos` """
+
+        if self._coord_index is None:
+            return
+
+        if pos == len(self.coords) and self._coord_index.get(coord) == pos:
+            del self._coord_index[coord]
+            self._coord_index_size -= 1
+        else:
+            # Later positions moved, so rebuild on the next lookup
+            self._indexInvalidate()
+
+
+    def _indexInvalidate(self):
+        """ Discard the hash index """
+
+        self._coord_index = None
+
+
+    def _checkOrdered(self):
+        """ Check that coordinates satisfy the "ordered" attribute """
+
+        if not self._ordered or len(self.coords) == 0:
+            return True
+
+        coords = self.coords
+
+        if isinstance(coords, (array.array, memoryview)):
+            assert (np.diff(np.asarray(coords)) > 0).all(), \
+                "Illegal non-monotonic coordinate"
+
+            return True
+
+        last = coords[0]
+
+        for c in coords[1:]:
             if c <= last:
                 assert False, "Illegal non-monotonic coordinate"
 
@@ -5072,6 +5706,14 @@ class Fiber:
         if not self._unique:
             return True
 
+        if isinstance(self.coords, (array.array, memoryview)):
+            if not self._ordered:
+                assert len(np.unique(np.asarray(self.coords))) == len(self.coords), \
+                    "Illegal repeated coordinate"
+
+            # Ordered buffers were already checked to be strictly increasing
+            return True
+
         if self._ordered:
             coords = self.coords
         else:
@@ -5086,6 +5728,561 @@ class Fiber:
             last = c
 
 
+    def _setArrayStorage(self, coords, payloads):
+        """ Set the coordinates and payloads using "array" storage
+
+        Coordinates and payloads that cannot be packed into a buffer
+        (e.g., tuple coordinates or fiber payloads) are held in a list.
+
+        """
+
+        self.coords = Fiber._toBuffer(coords)
+        if self.coords is None:
+            self.coords = Fiber._toList(coords)
+
+        if not isinstance(payloads, np.ndarray):
+            payloads = [Payload.get(p) for p in payloads]
+
+        self.payloads = Fiber._toBuffer(payloads)
+        if self.payloads is None:
+            self.payloads = Fiber._toList(payloads)
+
+
+    def _toListStorage(self):
+        """ Convert "array", "spa" or "bitmap" storage into (mutable)
+        "list" storage, leaving (mutable) "chunked" storage as is
+
+        Since every mutation of the fiber starts here, this is also
+        where lists shared with a copy-on-write copy are copied and
+        where the mutation is recorded (see `Fiber._noteMutation()`).
+
+        """
+
+        self._noteMutation()
+
+        if self._shared:
+            self._unshareStorage()
+
+        if self._storage in ("list", "chunked"):
+            return
+
+        if self._storage == "spa":
+            self._fromSpaStorage()
+            return
+
+        #
+        # A sub-fiber of a compressed fibertree (see
+        # `CompressedFibers`) is only weakly held by its parent, which
+        # must keep it once it no longer matches the arrays
+        #
+        view_of = self.__dict__.pop("_view_of", None)
+
+        if view_of is not None:
+            view_of[0].pin(view_of[1], self)
+
+        self.coords = list(self.coords)
+        self.payloads = list(self.payloads)
+
+        if self._storage == "bitmap":
+            del self._bitmap
+            del self._bitmap_ranks
+
+        self._storage = "list"
+
+
+    def _noteMutation(self):
+        """ Record a (possible) mutation of the fiber in its owning
+        rank, so the results of the tensor cached before the mutation
+        are not used (see `Tensor._cached()`) """
+
+        owner = self._owner
+
+        if owner is not None:
+            owner._mutations += 1
+
+
+    def _toBitmapStorage(self):
+        """ Convert "array" storage into "bitmap" storage
+
+        Bit `b` of word `w` of the bitmap is set if coordinate `64*w
+        + b` holds an element, and the rank directory holds the number
+        of elements before each word. The payloads are left packed,
+        and the coordinates are only recreated (by
+        `Fiber.__getattr__()`) when they are accessed.
+
+        """
+
+        shape = self.getRankAttrs().getShape()
+
+        assert isinstance(shape, int), "A \"bitmap\" fiber needs a known shape"
+        assert not any(isinstance(p, Fiber) for p in self.payloads), \
+            "A \"bitmap\" fiber must be a leaf fiber"
+        assert self._ordered and self._unique, \
+            "A \"bitmap\" fiber needs ordered, unique coordinates"
+
+        coords = np.asarray(self.coords)
+
+        assert len(coords) == 0 \
+            or (coords.dtype.kind in "iu" and coords[0] >= 0 and coords[-1] < shape), \
+            "A \"bitmap\" fiber needs integer coordinates within its shape"
+
+        bits = np.zeros(-(-shape // 64) * 64, dtype=np.uint8)
+        bits[coords] = 1
+
+        self._bitmap = np.packbits(bits, bitorder="little").view("<u8")
+        self._bitmap_ranks = np.zeros(len(self._bitmap) + 1, dtype=np.int64)
+        np.cumsum(Fiber._popcount(self._bitmap), out=self._bitmap_ranks[1:])
+
+        del self.coords
+        self._indexInvalidate()
+
+        self._storage = "bitmap"
+
+
+    def _bitmapCoords(self):
+        """ Return the coordinates of a "bitmap" fiber as a buffer """
+
+        bits = np.unpackbits(self._bitmap.view(np.uint8), bitorder="little")
+
+        return Fiber._toBuffer(np.flatnonzero(bits))
+
+
+    def _bitmapTest(self, coord):
+        """ Return whether `coord` holds an element of a "bitmap" fiber """
+
+        if not 0 <= coord < 64 * len(self._bitmap):
+            return False
+
+        return bool((int(self._bitmap[coord >> 6]) >> (coord & 63)) & 1)
+
+
+    def _bitmapRank(self, coord):
+        """ Return the number of elements before `coord` in a "bitmap"
+        fiber, i.e., its position (or where it would be inserted) """
+
+        if coord <= 0:
+            return 0
+
+        word = coord >> 6
+
+        if word >= len(self._bitmap):
+            return int(self._bitmap_ranks[-1])
+
+        mask = (1 << (coord & 63)) - 1
+
+        return int(self._bitmap_ranks[word]) + (int(self._bitmap[word]) & mask).bit_count()
+
+
+    def _bitmapSelect(self, pos):
+        """ Return the coordinate of the element at position `pos` of a
+        "bitmap" fiber """
+
+        assert 0 <= pos < self._bitmap_ranks[-1], "Position out of range"
+
+        word = int(np.searchsorted(self._bitmap_ranks, pos, side="right")) - 1
+
+        bits = np.unpackbits(self._bitmap[word:word + 1].view(np.uint8), bitorder="little")
+
+        return 64 * word + int(np.flatnonzero(bits)[pos - self._bitmap_ranks[word]])
+
+
+    @staticmethod
+    def _bitmapRanks(fiber, coords):
+        """ Return, for an array of coordinates, whether each holds an
+        element of a "bitmap" fiber and the position of the element """
+
+        words = coords >> 6
+        bits = (coords & 63).astype(np.uint64)
+
+        values = fiber._bitmap[words]
+
+        present = ((values >> bits) & np.uint64(1)).astype(bool)
+        below = values & ((np.uint64(1) << bits) - np.uint64(1))
+
+        positions = fiber._bitmap_ranks[words] + Fiber._popcount(below)
+
+        return present, positions
+
+
+    @staticmethod
+    def _popcount(words):
+        """ Return the number of bits set in each of an array of
+        (uint64) words, with a byte lookup table if numpy does not
+        provide `np.bitwise_count()` """
+
+        if _bitwise_count is not None:
+            return _bitwise_count(words)
+
+        words = np.ascontiguousarray(words, dtype=np.uint64)
+
+        counts = _byte_popcounts[words.view(np.uint8)]
+
+        return counts.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.int64)
+
+
+    def _toSpaStorage(self):
+        """ Convert the fiber into "spa" storage
+
+        The dense array holds the (possibly unboxed) payload at each
+        coordinate of the shape, the occupancy bitmap marks the
+        coordinates that hold an element and the touched list holds
+        each coordinate that was occupied (possibly more than once).
+
+        """
+
+        shape = self.getRankAttrs().getShape()
+        default = Payload.get(self.getDefault())
+
+        assert isinstance(shape, int), "A \"spa\" fiber needs a known shape"
+        assert not isinstance(default, Fiber) \
+            and not any(isinstance(p, Fiber) for p in self.payloads), \
+            "A \"spa\" fiber must be a leaf fiber"
+        assert self._unique and all(isinstance(c, int) for c in self.coords), \
+            "A \"spa\" fiber needs unique integer coordinates"
+
+        values = shape * [None]
+        occupied = bytearray(shape)
+
+        for coord, payload in zip(self.coords, self.payloads):
+            values[coord] = payload
+            occupied[coord] = 1
+
+        self._spa_values = values
+        self._spa_occupied = occupied
+        self._spa_touched = list(self.coords)
+        self._spa_default = default
+
+        del self.coords
+        del self.payloads
+        self._indexInvalidate()
+
+        self._storage = "spa"
+
+
+    def _fromSpaStorage(self):
+        """ Compact "spa" storage into (sorted) "list" storage """
+
+        values = self._spa_values
+        occupied = self._spa_occupied
+
+        coords = sorted(set(c for c in self._spa_touched if occupied[c]))
+
+        self.coords = coords
+        self.payloads = [values[c] for c in coords]
+
+        del self._spa_values
+        del self._spa_occupied
+        del self._spa_touched
+        del self._spa_default
+
+        self._storage = "list"
+
+
+    def _spaPayload(self, coord):
+        """ Return a reference to the payload at `coord` of a "spa"
+        fiber (**boxing** it in place if needed), or None if there
+        is no element at `coord` """
+
+        if not (isinstance(coord, int) and 0 <= coord < len(self._spa_occupied)) \
+                or not self._spa_occupied[coord]:
+            return None
+
+        payload = self._spa_values[coord]
+
+        if not isinstance(payload, Payload):
+            payload = Payload(payload)
+            self._spa_values[coord] = payload
+
+        return payload
+
+
+    def _spaPayloadRef(self, coord):
+        """ Return a reference to the payload at `coord` of a "spa"
+        fiber, creating an element with a default payload if needed """
+
+        payload = self._spaPayload(coord)
+
+        if payload is not None:
+            return payload
+
+        assert isinstance(coord, int) and 0 <= coord < len(self._spa_occupied), \
+            f"Coordinate {coord} is outside the shape of the fiber"
+
+        payload = Payload(self._spa_default)
+
+        self._spa_values[coord] = payload
+        self._spa_occupied[coord] = 1
+        self._spa_touched.append(coord)
+
+        return payload
+
+
+    def _spaDelete(self, coord):
+        """ Remove the element at `coord` (if any) of a "spa" fiber """
+
+        self._spa_values[coord] = None
+        self._spa_occupied[coord] = 0
+
+
+    def __getattr__(self, name):
+        """ Compact a "spa" fiber when its coordinates or payloads are
+        accessed, and recreate the coordinates of a "bitmap" fiber
+        when they are accessed (`__getattr__()` is only called for
+        attributes that are not found) """
+
+        storage = self.__dict__.get("_storage")
+
+        if name in ("coords", "payloads") and storage == "spa":
+            self._fromSpaStorage()
+            return self.__dict__[name]
+
+        if name == "coords" and storage == "bitmap":
+            self.coords = self._bitmapCoords()
+            return self.coords
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+    def _boxPayload(self, pos):
+        """ Return a reference to the payload at `pos`
+
+        An unboxed payload is **boxed** in place, so the returned
+        `Payload` can be used to update the fiber.
+
+        """
+
+        payload = self.payloads[pos]
+
+        if Payload.is_payload(payload):
+            return payload
+
+        self._toListStorage()
+
+        payload = Payload.maybe_box(payload)
+        self.payloads[pos] = payload
+
+        return payload
+
+
+    def _boxPayloads(self):
+        """ Box all the unboxed payloads of the fiber in place """
+
+        payloads = self.payloads
+
+        if len(payloads) == 0 or Payload.contains(payloads[0], Fiber):
+            return
+
+        if self._storage in ("list", "chunked"):
+            self._unsharePayloads()
+        else:
+            self._toListStorage()
+
+        payloads = self.payloads
+
+        for pos, payload in enumerate(payloads):
+            boxed = Payload.maybe_box(payload)
+
+            if boxed is not payload:
+                payloads[pos] = boxed
+
+
+    @classmethod
+    def _fromBuffers(cls, coords, payloads, **kwargs):
+        """ Create an "array" storage fiber that holds `coords` and
+        `payloads` (without copying arrays or checking the attributes) """
+
+        fiber = cls(storage="array", **kwargs)
+        fiber._setArrayStorage(coords, payloads)
+
+        return fiber
+
+
+    @classmethod
+    def _fromSlices(cls, coords, payloads, **kwargs):
+        """ Create a fiber that holds slices of the (ordered and
+        unique) coordinates and payloads of another fiber (without
+        copying them or checking the attributes)
+
+        Memoryview slices give an "array" storage fiber, i.e., a view
+        of the buffers of the other fiber, `ChunkedList` slices a
+        "chunked" storage fiber, and list slices a "list" storage fiber.
+
+        """
+
+        if isinstance(coords, ChunkedList):
+            storage = "chunked"
+        elif isinstance(coords, memoryview) or isinstance(payloads, memoryview):
+            storage = "array"
+        else:
+            storage = "list"
+
+        fiber = cls(storage=storage, **kwargs)
+        fiber.coords = coords
+        fiber.payloads = payloads
+
+        return fiber
+
+
+    def _hasEmptyPayloads(self):
+        """ Return whether any payload of the fiber is **empty** (so
+        iterating over the fiber skips its element) """
+
+        payloads = _fast_payloads(self)
+
+        if payloads is not None:
+            default = Payload.get(self.getDefault())
+
+            if isinstance(payloads, (array.array, memoryview)):
+                return bool((np.asarray(payloads) == default).any())
+
+            return default in payloads
+
+        if isinstance(self.payloads, (array.array, memoryview)):
+            return True
+
+        default = self.getDefault()
+
+        return any(Payload.isEmpty(p, default=default) for p in self.payloads)
+
+
+    def _activeCoords(self):
+        """ Return a list of the coordinates of the elements yielded
+        by `Fiber.iterActive()`, i.e., the elements in the active range
+        whose payloads are not **empty** """
+
+        if not self._hasEmptyPayloads():
+            active_start, active_end = self.getActive()
+
+            lo = self._bisectCoords(active_start)
+            hi = self._bisectCoords(active_end, lo)
+
+            return list(self.coords[lo:hi])
+
+        return [c for c, _ in self.iterActive(tick=False)]
+
+
+    def _splitSource(self):
+        """ Return a fiber that holds the elements of self that are
+        partitioned by a split, i.e., the elements yielded by iterating
+        over self
+
+        That is self, unless iterating skips elements with **empty**
+        payloads or adds the default elements of an uncompressed fiber.
+
+        """
+
+        if _get_format(self) == "C" and not self._hasEmptyPayloads():
+            return self
+
+        coords = []
+        payloads = []
+
+        for c, p in self.__iter__(tick=False):
+            coords.append(c)
+            payloads.append(p)
+
+        return Fiber._fromSlices(coords,
+                                 payloads,
+                                 active_range=self.getActive(),
+                                 default=self.getDefault(),
+                                 shape=self.getRankAttrs().getShape())
+
+
+    def _sliceStorage(self, start, end):
+        """ Return the coordinates and payloads at the positions from
+        `start` up to (but not including) `end`
+
+        Buffers are sliced with a `memoryview` (so no values are
+        copied), other sequences with a (shallow copying) slice.
+
+        """
+
+        def view(values):
+            if isinstance(values, (array.array, memoryview)):
+                return memoryview(values)[start:end]
+            return values[start:end]
+
+        return view(self.coords), view(self.payloads)
+
+
+    def _bisectCoords(self, coord, lo=0, hi=None):
+        """ Return the position of the first coordinate of an ordered
+        fiber that is not less than `coord`, searching only the
+        positions from `lo` up to (but not including) `hi` """
+
+        coords = self.coords
+
+        if hi is None:
+            hi = len(coords)
+
+        if isinstance(coords, ChunkedList):
+            return min(max(coords.bisect_left(coord), lo), hi)
+
+        return bisect.bisect_left(coords, coord, lo, hi)
+
+
+    @staticmethod
+    def _toBuffer(values):
+        """ Pack a sequence of ints or floats into a contiguous buffer
+
+        Returns None if the values cannot be packed.
+
+        """
+
+        if isinstance(values, (array.array, memoryview)):
+            return values
+
+        if isinstance(values, np.ndarray):
+            if values.ndim != 1 or values.dtype.kind not in "iuf":
+                return None
+
+            return memoryview(np.ascontiguousarray(values))
+
+        kinds = set(map(type, values))
+
+        if kinds <= {int}:
+            typecode = 'q'
+        elif kinds == {float}:
+            typecode = 'd'
+        else:
+            return None
+
+        try:
+            return array.array(typecode, values)
+        except OverflowError:
+            return None
+
+
+    @staticmethod
+    def _toList(values):
+        """ Convert a sequence into a list (of Python scalars) """
+
+        if isinstance(values, np.ndarray):
+            return values.tolist()
+
+        return list(values)
+
+
+    def __getstate__(self):
+        """ Get state for pickling (memoryviews cannot be pickled) """
+
+        if self._storage == "spa":
+            self._fromSpaStorage()
+
+        state = self.__dict__.copy()
+        state.pop("_view_of", None)
+
+        for name in ("coords", "payloads"):
+            buffer = state.get(name)
+            if isinstance(buffer, memoryview):
+                try:
+                    state[name] = array.array(buffer.format, buffer.tobytes())
+                except ValueError:
+                    state[name] = buffer.tolist()
+
+        return state
+
+
     @staticmethod
     def _deprecated(message):
         import warnings
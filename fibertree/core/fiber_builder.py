@@ -0,0 +1,222 @@
+#cython: language_level=3
+"""FiberBuilder
+
+A class used to build a fiber (or a fibertree) from elements given
+in an arbitrary order.
+
+"""
+import logging
+
+from itertools import groupby
+
+from .fiber import Fiber
+
+#
+# Set up logging
+#
+module_logger = logging.getLogger('fibertree.core.fiber_builder')
+
+
+class FiberBuilder:
+    """A class to build a fiber from unordered elements.
+
+    Inserting elements into a fiber one at a time in an arbitrary
+    order, e.g., with `Fiber.getPayloadRef()`, costs a search and a
+    list insertion per element. A `FiberBuilder` instead just collects
+    the elements and then creates the fiber with a single sort when
+    `FiberBuilder.build()` is called.
+
+    Elements with the same coordinate are combined with a
+    user-provided `combine` function.
+
+    A builder with a `depth` greater than one builds a fibertree,
+    where the coordinate of each element is a **point**, i.e., a
+    tuple with a coordinate for each level of the tree.
+
+    Constructor
+    -----------
+
+    Parameters
+    ----------
+
+    depth: integer, default=1
+        The number of levels of the fibertree to build
+
+    combine: function: list of payloads -> payload, default=None
+        A function to combine the payloads of elements with the same
+        coordinate (in the order they were added). If None, repeated
+        coordinates are illegal.
+
+    kwargs: keyword arguments
+        Arguments passed to the `Fiber` constructor of the top-level
+        fiber, e.g., `default`, `shape` or `rank_attrs`
+
+
+    Examples
+    --------
+
+    >>> builder = FiberBuilder(combine=sum)
+    >>> for c, p in [(5, 1), (2, 2), (5, 3)]:
+    ...     builder.add(c, p)
+    >>> builder.build()
+    Fiber([2, 5], [2, 4])
+
+
+    Notes
+    -----
+
+    The lower-level fibers of a fibertree are created with default
+    attributes, so the usual case is to pass a multi-level result to
+    `Tensor.fromFiber()`, which sets up the ranks of the tensor.
+
+    """
+
+    def __init__(self, depth=1, combine=None, **kwargs):
+        """__init__"""
+
+        assert depth >= 1, "A FiberBuilder must have at least one level"
+
+        self._depth = depth
+        self._combine = combine
+        self._kwargs = kwargs
+
+        self._coords = []
+        self._payloads = []
+
+
+    def add(self, coord, payload):
+        """Add an element to the fiber being built
+
+        Parameters
+        ----------
+
+        coord: coordinate or point
+            The coordinate of the element (a point for a `depth`
+            greater than one)
+
+        payload: payload
+            The payload of the element
+
+        Returns
+        -------
+        Nothing
+
+        """
+
+        assert self._depth == 1 or len(coord) == self._depth, \
+            "Point does not match the depth of the builder"
+
+        self._coords.append(coord)
+        self._payloads.append(payload)
+
+
+    def extend(self, coords, payloads):
+        """Add a set of elements to the fiber being built
+
+        Parameters
+        ----------
+
+        coords: list of coordinates or points
+            The coordinates of the elements
+
+        payloads: list of payloads
+            The payloads of the elements
+
+        Returns
+        -------
+        Nothing
+
+        """
+
+        assert len(coords) == len(payloads), \
+            "Coordinates and payloads must be same length"
+
+        for coord, payload in zip(coords, payloads):
+            self.add(coord, payload)
+
+
+    def __len__(self):
+        """Return the number of elements added (before combining)"""
+
+        return len(self._coords)
+
+
+    def build(self, **kwargs):
+        """Build the fiber
+
+        Sort the elements by coordinate, combine the payloads of
+        elements with the same coordinate and create the fiber.
+
+        Parameters
+        ----------
+
+        kwargs: keyword arguments
+            Arguments passed to the `Fiber` constructor of the
+            top-level fiber, overriding those given to the constructor
+
+        Returns
+        -------
+
+        fiber: Fiber
+            The newly created fiber
+
+        Notes
+        -----
+
+        The builder is not cleared, so more elements can be added
+        and a new fiber built.
+
+        """
+
+        #
+        # A stable sort keeps elements with the same coordinate in the
+        # order they were added
+        #
+        order = sorted(range(len(self._coords)), key=self._coords.__getitem__)
+
+        points = [self._coords[i] for i in order]
+        payloads = [self._payloads[i] for i in order]
+
+        coords, payloads = self._buildLevel(points, payloads, 0, 0, len(points))
+
+        return Fiber(coords, payloads, **{**self._kwargs, **kwargs})
+
+
+    def _buildLevel(self, points, payloads, level, start, end):
+        """Create the coordinates and payloads of a level of the tree
+
+        Operates on the sorted elements in positions `start` to `end`
+
+        """
+
+        coords = []
+        new_payloads = []
+
+        is_leaf = (level == self._depth - 1)
+
+        if self._depth == 1:
+            key = points.__getitem__
+        else:
+            key = lambda i: points[i][level]
+
+        for coord, group in groupby(range(start, end), key=key):
+            group = list(group)
+
+            coords.append(coord)
+
+            if not is_leaf:
+                child = self._buildLevel(points,
+                                         payloads,
+                                         level + 1,
+                                         group[0],
+                                         group[-1] + 1)
+                new_payloads.append(Fiber(*child))
+            elif len(group) == 1:
+                new_payloads.append(payloads[group[0]])
+            else:
+                assert self._combine is not None, \
+                    "Repeated coordinate without a combine function"
+
+                new_payloads.append(self._combine([payloads[i] for i in group]))
+
+        return coords, new_payloads
@@ -6,23 +6,43 @@ A module storing the implementations of all of the iterators of the Fiber class
 
 """
 
+import array
 import bisect
+import heapq
+import operator
+from functools import partial
+
+import numpy as np
 
 from .any import ANY
-from .coord_payload import CoordPayload
+from .chunked_list import ChunkedList
+from .coord_payload import CoordPayload, CoordPayloadTuple
 from .metrics import Metrics
 from .payload import Payload
 
 def __iter__(self, tick=True, start_pos=None):
-    """__iter__"""
-    if self.getOwner() is not None:
-        fmt = self.getOwner().getFormat()
-    elif self.getRankAttrs() is not None:
-        fmt = self.getRankAttrs().getFormat()
-    else:
-        fmt = "C"
+    """__iter__
+
+    Note: when metrics are not being collected (checked when the
+    iterator is created) and the fiber holds leaf payloads, the
+    elements are created by a fast path that yields a lightweight
+    `CoordPayloadTuple` for each element (see `_fast_elements()`)
+
+    Note: the payloads of a "list" or "chunked" storage fiber are
+    references to the payloads of the fiber (see `_payload_ref()`),
+    while those of "array" and "bitmap" storage are copies of the
+    packed values
+
+    """
+    fmt = _get_format(self)
 
     if fmt == "C":
+        if start_pos is None and not Metrics.isCollecting():
+            payloads = _fast_payloads(self)
+
+            if payloads is not None:
+                return _fast_elements(self, payloads)
+
         return self.iterOccupancy(tick, start_pos=start_pos)
     elif fmt == "U":
         return self.iterShape(tick)
@@ -30,14 +50,158 @@ def __iter__(self, tick=True, start_pos=None):
         raise ValueError("Unknown format")
 
 
+def _get_format(fiber):
+    """Return the format ("C" or "U") used to iterate over a fiber"""
+
+    if fiber.getOwner() is not None:
+        return fiber.getOwner().getFormat()
+    elif fiber.getRankAttrs() is not None:
+        return fiber.getRankAttrs().getFormat()
+
+    return "C"
+
+#
+# Create a `CoordPayloadTuple` from a (coord, payload) tuple without
+# running any Python code
+#
+_make_element = partial(tuple.__new__, CoordPayloadTuple)
+
+
+def _fast_payloads(fiber):
+    """Return the payloads of a fiber if iteration can skip the
+    per-element checks of `iterRange()`, otherwise None
+
+    That is the case when the fiber is eager and holds leaf payloads
+    (in a list or a packed buffer) with a scalar default
+
+    """
+
+    if fiber.isLazy():
+        return None
+
+    payloads = fiber.payloads
+
+    if len(payloads) == 0:
+        return payloads
+
+    if isinstance(payloads, (array.array, memoryview)):
+        if not isinstance(Payload.get(fiber.getDefault()), (int, float)):
+            return None
+
+        return payloads
+
+    if not isinstance(payloads, (list, ChunkedList)) \
+       or Payload.contains(payloads[0], type(fiber)):
+        return None
+
+    return payloads
+
+
+def _fast_elements(fiber, payloads):
+    """Generate the elements of a fiber whose payloads were returned
+    by `_fast_payloads()`
+
+    Elements whose payload is the default are skipped as they are
+    reached, so no pass over the payloads is needed up front. Leaf
+    payloads of "list" and "chunked" storage are **boxed** in place
+    (see `_payload_ref()`), and packed payloads are boxed into fresh
+    `Payload`s
+
+    """
+
+    coords = fiber.coords
+    default = Payload.get(fiber.getDefault())
+
+    in_place = isinstance(payloads, (list, ChunkedList))
+
+    if in_place:
+        #
+        # Copy a list shared with a copy-on-write copy before
+        # boxing in place
+        #
+        fiber._unsharePayloads()
+        payloads = fiber.payloads
+
+    box = Payload._fastBox
+
+    for pos, payload in enumerate(payloads):
+        if type(payload) is Payload:
+            if payload.value == default:
+                continue
+        else:
+            if payload == default:
+                continue
+
+            payload = box(payload)
+
+            if in_place:
+                payloads[pos] = payload
+
+        yield _make_element((coords[pos], payload))
+
+
+def _payload_ref(fiber):
+    """Return a function that returns the payload at a position of an
+    eager fiber
+
+    For the leaf payloads of "list" and "chunked" storage, the function
+    **boxes** an unboxed payload in place the first time it is reached
+    (see `Fiber._boxPayload()`), so the payload it returns is a
+    reference that can be used to update the fiber. The packed
+    payloads of "array" and "bitmap" storage are returned as **boxed**
+    copies
+
+    """
+
+    payloads = fiber.payloads
+
+    if isinstance(payloads, (array.array, memoryview)):
+        return partial(_box_copy, payloads)
+
+    if not isinstance(payloads, (list, ChunkedList)) \
+       or len(payloads) == 0 \
+       or Payload.contains(payloads[0], type(fiber)):
+        return payloads.__getitem__
+
+    #
+    # Copy a list shared with a copy-on-write copy before boxing in place
+    #
+    fiber._unsharePayloads()
+
+    return partial(_box_in_place, fiber.payloads)
+
+
+def _box_in_place(payloads, pos):
+    """Return the payload at `pos`, **boxing** it in place if needed"""
+
+    payload = payloads[pos]
+
+    if type(payload) is not Payload:
+        boxed = Payload._fastBox(payload)
+
+        if boxed is not payload:
+            payloads[pos] = boxed
+
+        return boxed
+
+    return payload
+
+
+def _box_copy(payloads, pos):
+    """Return a **boxed** copy of the packed payload at `pos`"""
+
+    return Payload._fastBox(payloads[pos])
+
+
 def __reversed__(self):
     """Return reversed fiber"""
 
     assert not self.isLazy()
 
-    for coord, payload in zip(reversed(self.coords),
-                              reversed(self.payloads)):
-        yield CoordPayload(coord, payload)
+    ref = _payload_ref(self)
+
+    for pos in reversed(range(len(self.coords))):
+        yield CoordPayload(self.coords[pos], ref(pos))
 
 def iterOccupancy(self, tick=True, start_pos=None):
     """Iterate over non-default elements of the fiber
@@ -152,7 +316,9 @@ def iterRange(self, start, end, tick=True, start_pos=None):
         else:
             i = 0
 
-        iter_ = ((self.coords[j], self.payloads[j])
+        ref = _payload_ref(self)
+
+        iter_ = ((self.coords[j], ref(j))
                   for j in range(i, len(self.coords)))
 
     is_collecting, rank = _prep_metrics_inc(self)
@@ -160,6 +326,9 @@ def iterRange(self, start, end, tick=True, start_pos=None):
     if is_collecting and tick:
         Metrics.registerRank(rank)
 
+    # Get the default once, since it is a fresh copy on each call
+    default = self.getDefault()
+
     for j, (coord, payload) in enumerate(iter_):
         # If we are outside the range, stop
         if end is not None and coord >= end:
@@ -167,7 +336,7 @@ def iterRange(self, start, end, tick=True, start_pos=None):
 
         # If we are within the range, emit the non-default elements
         elif start is None or coord >= start:
-            if not Payload.isEmpty(payload, default=self.getDefault()):
+            if not Payload.isEmpty(payload, default=default):
                 if start_pos is not None:
                     self.setSavedPos(i + j, distance=j)
 
@@ -393,14 +562,71 @@ def coiterRangeShape(fibers, start, end, step=1):
         step_ = step
 
         def __iter__(self):
-            for c in range(self.start_, self.end_, self.step_):
-                payloads = tuple(fiber.getPayload(c) for fiber in self.fibers_)
+            shape_range = range(self.start_, self.end_, self.step_)
+
+            cursors = [_shape_payloads(fiber, shape_range) for fiber in self.fibers_]
+
+            for c, payloads in zip(shape_range, zip(*cursors)):
                 yield CoordPayload(c, payloads)
 
     fiber = fibers[0].fromIterator(coiter_range_shape_iterator, active_range=(start, end))
     fiber.getRankAttrs().setId(fibers[0].getRankAttrs().getId())
     return fiber
 
+def _shape_payloads(fiber, shape_range):
+    """Generate the payload of a fiber at each coordinate of a range
+
+    The payloads are the same as those returned by `fiber.getPayload(c)`
+    (i.e., a default payload for an empty coordinate), but for an
+    ordered fiber they are found with a single cursor that advances
+    monotonically through the fiber's coordinates, rather than a search
+    per coordinate. So the fiber must not be changed while the
+    generator is active.
+
+    """
+
+    coords = fiber.coords
+
+    if (not fiber._ordered
+            or not fiber._unique
+            or (len(coords) > 0 and isinstance(coords[0], tuple))
+            or shape_range.step <= 0):
+        for c in shape_range:
+            yield fiber.getPayload(c)
+
+        return
+
+    is_list = fiber.getStorage() in ("list", "chunked")
+
+    #
+    # A (fresh) scalar default payload can be boxed directly rather
+    # than instantiated by `_createDefault()` at each empty coordinate
+    #
+    default = fiber._createDefault(addtorank=False)
+
+    if isinstance(default, Payload) and isinstance(default.v(), (bool, float, int, str)):
+        default_value = default.v()
+    else:
+        default_value = None
+
+    num_coords = len(coords)
+    pos = fiber._coord2pos(shape_range.start) if num_coords > 0 else 0
+
+    for c in shape_range:
+        while pos < num_coords and coords[pos] < c:
+            pos += 1
+
+        if pos < num_coords and coords[pos] == c:
+            if is_list:
+                yield fiber._boxPayload(pos)
+            else:
+                yield Payload._fastBox(fiber.payloads[pos])
+        elif default_value is not None:
+            yield Payload._fastBox(default_value)
+        else:
+            yield fiber._createDefault(addtorank=False)
+
+
 def coiterRangeShapeRef(fibers, start, end, step=1):
     """Co-iterate in a dense manner over the given fibers using the given
     range, inserting any implicit payloads
@@ -466,8 +692,10 @@ def intersection(*args, **kwargs):
 
     kwargs: dict
         style:
-        - "two-finger" - combining fibers sequentially
+        - "two-finger" - stepping through the fibers one element at a time
         - "leader-follower" - where the leader is the first arg
+        - "skip-ahead" - galloping between two fibers
+        - "leapfrog" - galloping between all the fibers together
 
     Returns
     -------
@@ -481,6 +709,26 @@ def intersection(*args, **kwargs):
 
     Currently only supported for "ordered", "unique" fibers.
 
+    The "leapfrog" style (as in a leapfrog triejoin) advances a cursor
+    in each fiber, galloping (see `Fiber._coord2pos()`) each cursor in
+    turn to the largest coordinate seen until all the cursors are at
+    the same coordinate, and yields the flat tuple of payloads
+    directly. For two fibers of lengths m <= n this takes O(m log(n/m))
+    steps. The "skip-ahead" style is the leapfrog intersection of two
+    fibers, and the "two-finger" style advances the cursors one
+    element at a time, which takes O(m + n) steps.
+
+    The "two-finger", "skip-ahead" and "leapfrog" styles all produce
+    the same result. When metrics are being collected (or the fibers
+    cannot be merged directly, e.g., they are unordered) they all use a
+    sequence of two-operand intersections and record their
+    `intersect_*` metrics traces, e.g., the traces consumed by the
+    `SkipAheadIntersector` model.
+
+    As for `Fiber.__and__()`, the payloads of the elements are
+    references to the payloads of the input fibers (see
+    `Fiber.__iter__()`), so they can be used to update the fibers.
+
     """
 
     if "style" in kwargs:
@@ -488,7 +736,90 @@ def intersection(*args, **kwargs):
     else:
         style = "two-finger"
 
-    if style == "two-finger":
+    if style == "skip-ahead":
+        assert len(args) == 2, \
+            "The skip-ahead intersection only supports two fibers"
+
+    merge = style in ["two-finger", "skip-ahead", "leapfrog"] \
+            and not Metrics.isCollecting() \
+            and _can_merge(args)
+
+    if merge:
+
+        class intersection_iterator:
+            fibers = args
+            gallop = style != "two-finger"
+
+            def __iter__(self):
+                num_fibers = len(self.fibers)
+
+                #
+                # Note: getting the references may copy a payload list
+                # shared with a copy-on-write copy
+                #
+                refs = [_payload_ref(fiber) for fiber in self.fibers]
+
+                coords = [fiber.coords for fiber in self.fibers]
+                payloads = [fiber.payloads for fiber in self.fibers]
+                defaults = [fiber.getDefault() for fiber in self.fibers]
+                lengths = [len(c) for c in coords]
+
+                if min(lengths) == 0:
+                    return
+
+                pos = [0] * num_fibers
+
+                #
+                # Visit the fibers round robin, galloping each one
+                # ahead to the largest coordinate seen (the target)
+                # until all the fibers are at the target
+                #
+                target = coords[0][0]
+                matched = 0
+                i = 0
+
+                while True:
+                    coord = coords[i][pos[i]]
+
+                    if coord < target:
+                        if self.gallop:
+                            pos[i] = self.fibers[i]._coord2pos(target, start_pos=pos[i])
+                        else:
+                            while pos[i] < lengths[i] and coords[i][pos[i]] < target:
+                                pos[i] += 1
+
+                        if pos[i] == lengths[i]:
+                            return
+
+                        coord = coords[i][pos[i]]
+
+                    if coord > target:
+                        target = coord
+                        matched = 1
+                    else:
+                        matched += 1
+
+                    if matched == num_fibers:
+                        #
+                        # Skip elements with explicit default payloads,
+                        # which iteration over the fibers would skip
+                        #
+                        if not any(Payload.isEmpty(payloads[j][pos[j]], default=defaults[j])
+                                   for j in range(num_fibers)):
+                            yield CoordPayload(target,
+                                               tuple(refs[j](pos[j]) for j in range(num_fibers)))
+
+                        pos[i] += 1
+
+                        if pos[i] == lengths[i]:
+                            return
+
+                        target = coords[i][pos[i]]
+                        matched = 1
+
+                    i = (i + 1) % num_fibers
+
+    elif style in ["two-finger", "skip-ahead", "leapfrog"]:
         nested_result = args[0] & args[1]
 
         for arg in args[2:]:
@@ -547,6 +878,35 @@ def intersection(*args, **kwargs):
     fiber.getRankAttrs().setId(args[0].getRankAttrs().getId())
     return fiber
 
+def _can_merge(fibers):
+    """Check if a set of fibers can be merged (e.g., intersected by
+    galloping) directly on their coordinates and payloads rather than
+    by iterating over them"""
+
+    coord_kind = None
+
+    for fiber in fibers:
+        if (fiber.isLazy()
+                or not fiber._ordered
+                or not fiber._unique
+                or _get_format(fiber) != "C"):
+            return False
+
+        #
+        # Fibers with coordinates of different depths are intersected
+        # by projecting them (see `Fiber.__and__()`)
+        #
+        if len(fiber.coords) > 0:
+            coord = fiber.coords[0]
+            kind = len(coord) if isinstance(coord, tuple) else None
+
+            if coord_kind is not None and kind != coord_kind[0]:
+                return False
+
+            coord_kind = (kind,)
+
+    return True
+
 def union(*args):
     """Union a set of fibers.
 
@@ -576,45 +936,218 @@ def union(*args):
 
     Currently only supported for "ordered", "unique" fibers.
 
+    When metrics are not being collected (and the fibers allow it, see
+    `Fiber.intersection()`), the fibers are merged together with a
+    heap of cursors, one per fiber, which takes O(n log k)
+    comparisons for k fibers with n elements in total. Otherwise, the
+    fibers are combined with a sequence of two-operand unions, which
+    record their `union_*` metrics traces. Either way, the non-empty
+    payloads are references to the payloads of the input fibers (see
+    `Fiber.__iter__()`), so they can be used to update the fibers.
+
     """
 
-    nested_result = args[0] | args[1]
+    if not Metrics.isCollecting() and _can_merge(args):
 
-    for arg in args[2:]:
-        nested_result = nested_result | arg
+        class union_iterator:
+            fibers = args
 
-    # Lazy implementation
-    class union_iterator:
-        nested = nested_result
-        num_args = len(args)
+            def __iter__(self):
+                for c, present, payloads in _heap_merge(self.fibers):
+                    p = [None] * (len(self.fibers) + 1)
 
-        def __iter__(self):
-            for c, np in self.nested:
-                p = [None] * (self.num_args + 1)
+                    # This is the mask
+                    p[0] = "".join(chr(ord("A") + i) for i in present)
 
-                # This is the mask
-                p[0] = ""
-                for i in range(self.num_args - 1, 0, -1):
-                    if isinstance(np, Payload):
-                        np = np.v()
+                    for i, fiber in enumerate(self.fibers):
+                        if payloads[i] is None:
+                            p[i + 1] = fiber._createDefault()
+                        else:
+                            p[i + 1] = payloads[i]
 
-                    ab_mask = np[0]
-                    if "B" in ab_mask:
-                        p[0] = chr(ord("A") + i) + p[0]
+                    yield CoordPayload(c, tuple(p))
+
+    else:
+        nested_result = args[0] | args[1]
 
-                    p[i + 1] = np[2]
-                    np = np[1]
+        for arg in args[2:]:
+            nested_result = nested_result | arg
 
-                if "A" in ab_mask:
-                    p[0] = "A" + p[0]
+        # Lazy implementation
+        class union_iterator:
+            nested = nested_result
+            num_args = len(args)
 
-                p[1] = np
-                yield CoordPayload(c, tuple(p))
+            def __iter__(self):
+                for c, np in self.nested:
+                    p = [None] * (self.num_args + 1)
+
+                    # This is the mask
+                    p[0] = ""
+                    for i in range(self.num_args - 1, 0, -1):
+                        if isinstance(np, Payload):
+                            np = np.v()
+
+                        ab_mask = np[0]
+                        if "B" in ab_mask:
+                            p[0] = chr(ord("A") + i) + p[0]
+
+                        p[i + 1] = np[2]
+                        np = np[1]
+
+                    if "A" in ab_mask:
+                        p[0] = "A" + p[0]
+
+                    p[1] = np
+                    yield CoordPayload(c, tuple(p))
 
     fiber = args[0].fromIterator(union_iterator, active_range=args[0].getActive())
     fiber._setDefault(tuple([""]+[arg.getDefault() for arg in args]))
     fiber.getRankAttrs().setId(args[0].getRankAttrs().getId())
     return fiber
+
+def unionReduce(*args, func=None):
+    """Union a set of fibers, reducing the payloads at each coordinate.
+
+    Create a new fiber containing the coordinates that exist in
+    **any** of the fibers in `args` and for each of those coordinates
+    a payload that is the reduction (with `func`) of the non-empty
+    payloads of the input fibers at that coordinate, e.g., to merge a
+    set of partial sums.
+
+    Parameters
+    ----------
+
+    args: list of Fibers
+        The set of fibers to union
+
+    func: function: (payload, payload) -> payload, default=addition
+        The function used to combine the payloads (in the order of
+        the fibers)
+
+    Returns
+    -------
+
+    result: Fiber
+        A fiber containing the reduced union of all the input fibers.
+
+    Note
+    ----
+
+    The payloads are reduced on the fly as the fibers are merged (see
+    `Fiber.union()`).
+
+    """
+
+    if func is None:
+        func = operator.add
+
+    if not Metrics.isCollecting() and _can_merge(args):
+
+        class union_reduce_iterator:
+            fibers = args
+
+            def __iter__(self):
+                for c, present, payloads in _heap_merge(self.fibers):
+                    result = payloads[present[0]]
+
+                    for i in present[1:]:
+                        result = func(result, payloads[i])
+
+                    yield CoordPayload(c, result)
+
+    else:
+        merged = union(*args) if len(args) > 1 else args[0]
+
+        class union_reduce_iterator:
+            fibers = args
+
+            def __iter__(self):
+                if len(self.fibers) == 1:
+                    yield from merged
+                    return
+
+                for c, (mask, *payloads) in merged:
+                    present = [ord(m) - ord("A") for m in Payload.get(mask)]
+
+                    result = payloads[present[0]]
+
+                    for i in present[1:]:
+                        result = func(result, payloads[i])
+
+                    yield CoordPayload(c, result)
+
+    fiber = args[0].fromIterator(union_reduce_iterator, active_range=args[0].getActive())
+    fiber._setDefault(args[0].getDefault())
+    fiber.getRankAttrs().setId(args[0].getRankAttrs().getId())
+    return fiber
+
+def _heap_merge(fibers):
+    """Merge a set of fibers with a heap of cursors
+
+    Yields a `(coord, present, payloads)` tuple for each coordinate in
+    any of the fibers, where `present` is the list of (the indices
+    of) the fibers with a non-empty payload at that coordinate and
+    `payloads` is a list of references to their payloads (see
+    `_payload_ref()`), or None for the other fibers.
+
+    """
+
+    #
+    # Note: getting the references may copy a payload list shared
+    # with a copy-on-write copy
+    #
+    refs = [_payload_ref(fiber) for fiber in fibers]
+
+    coords = [fiber.coords for fiber in fibers]
+    payloads = [fiber.payloads for fiber in fibers]
+    defaults = [fiber.getDefault() for fiber in fibers]
+
+    def next_pos(i, pos):
+        """Skip elements with explicit default payloads, which
+        iteration over the fiber would skip"""
+
+        while pos < len(coords[i]) and Payload.isEmpty(payloads[i][pos], default=defaults[i]):
+            pos += 1
+
+        return pos
+
+    #
+    # The heap holds a (coord, fiber index, position) cursor for each
+    # fiber that is not exhausted, so equal coordinates are popped in
+    # the order of the fibers
+    #
+    heap = []
+
+    for i in range(len(fibers)):
+        pos = next_pos(i, 0)
+
+        if pos < len(coords[i]):
+            heap.append((coords[i][pos], i, pos))
+
+    heapq.heapify(heap)
+
+    while heap:
+        coord = heap[0][0]
+
+        present = []
+        element = [None] * len(fibers)
+
+        while heap and heap[0][0] == coord:
+            _, i, pos = heap[0]
+
+            present.append(i)
+            element[i] = refs[i](pos)
+
+            pos = next_pos(i, pos + 1)
+
+            if pos < len(coords[i]):
+                heapq.heapreplace(heap, (coords[i][pos], i, pos))
+            else:
+                heapq.heappop(heap)
+
+        yield coord, present, element
+
 #
 # Private functions for used in merge methods
 #
@@ -628,6 +1161,153 @@ def _get_next(iter_):
 
     return CoordPayload(coord, payload)
 
+def _packed_arrays(fiber):
+    """Return the coordinates and payloads of the non-empty elements
+    of a fiber as numpy arrays, or None if the fiber does not hold
+    (compressed) coordinates and payloads in packed buffers"""
+
+    if fiber.isLazy() or fiber.getStorage() not in ("array", "bitmap"):
+        return None
+
+    buffers = (array.array, memoryview)
+
+    if not isinstance(fiber.coords, buffers) or not isinstance(fiber.payloads, buffers):
+        return None
+
+    if _get_format(fiber) != "C":
+        return None
+
+    coords = np.asarray(fiber.coords)
+    payloads = np.asarray(fiber.payloads)
+
+    #
+    # Iteration skips elements with an (explicit) default payload
+    #
+    nonempty = payloads != Payload.get(fiber.getDefault())
+
+    if not nonempty.all():
+        coords = coords[nonempty]
+        payloads = payloads[nonempty]
+
+    return coords, payloads
+
+
+def _bitmap_arrays(a_fiber, b_fiber, intersect=False):
+    """Merge two "bitmap" fibers using word-wide operations
+
+    Returns the coordinates in the union (OR), or the intersection
+    (AND) if `intersect` is True, of the bitmaps, whether
+    each coordinate holds a non-empty element of each fiber and the
+    payload of each fiber at each coordinate (which is meaningless
+    where the element is empty) as numpy arrays, or None if either
+    fiber is not a "bitmap" fiber with packed payloads
+
+    """
+
+    buffers = (array.array, memoryview)
+
+    for fiber in (a_fiber, b_fiber):
+        if (fiber.isLazy()
+                or fiber.getStorage() != "bitmap"
+                or not isinstance(fiber.payloads, buffers)
+                or _get_format(fiber) != "C"):
+            return None
+
+    a_words = a_fiber._bitmap
+    b_words = b_fiber._bitmap
+
+    if intersect:
+        num_words = min(len(a_words), len(b_words))
+
+        words = a_words[:num_words] & b_words[:num_words]
+    else:
+        num_words = max(len(a_words), len(b_words))
+
+        words = np.zeros(num_words, dtype="<u8")
+        words[:len(a_words)] |= a_words
+        words[:len(b_words)] |= b_words
+
+    coords = np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little"))
+
+    result = [coords]
+    present = []
+    payloads = []
+
+    for fiber in (a_fiber, b_fiber):
+        in_range = coords < 64 * len(fiber._bitmap)
+
+        fiber_present, positions = type(fiber)._bitmapRanks(fiber, coords[in_range])
+
+        fiber_payloads = np.asarray(fiber.payloads)
+        values = np.zeros(len(coords), dtype=fiber_payloads.dtype)
+
+        #
+        # Iteration skips elements with an (explicit) default payload
+        #
+        positions[~fiber_present] = 0
+        if len(fiber_payloads) > 0:
+            values[in_range] = fiber_payloads[positions]
+
+        is_present = np.zeros(len(coords), dtype=bool)
+        is_present[in_range] = fiber_present
+        is_present &= values != Payload.get(fiber.getDefault())
+
+        present.append(is_present)
+        payloads.append(values)
+
+    return tuple(result + present + payloads)
+
+
+def _intersect_packed(a_fiber, b_fiber):
+    """Intersect two fibers using vectorized operations
+
+    Returns the coordinates of the intersection and the payloads of
+    each fiber at those coordinates as numpy arrays, or None if
+    either fiber does not hold its elements in packed buffers (see
+    `_packed_arrays()`)
+
+    """
+
+    bitmaps = _bitmap_arrays(a_fiber, b_fiber, intersect=True)
+    if bitmaps is not None:
+        coords, a_present, b_present, a_payloads, b_payloads = bitmaps
+
+        match = a_present & b_present
+
+        return coords[match], a_payloads[match], b_payloads[match]
+
+    a_arrays = _packed_arrays(a_fiber)
+    if a_arrays is None:
+        return None
+
+    b_arrays = _packed_arrays(b_fiber)
+    if b_arrays is None:
+        return None
+
+    (a_coords, a_payloads), (b_coords, b_payloads) = a_arrays, b_arrays
+
+    #
+    # Search for each coordinate of the shorter fiber in the longer
+    # fiber, i.e., O(m log n) for fibers of length m <= n
+    #
+    swap = len(a_coords) > len(b_coords)
+    if swap:
+        a_coords, a_payloads, b_coords, b_payloads = b_coords, b_payloads, a_coords, a_payloads
+
+    b_pos = np.searchsorted(b_coords, a_coords)
+    b_pos[b_pos == len(b_coords)] = 0
+
+    match = np.flatnonzero(b_coords[b_pos] == a_coords) if len(b_coords) else b_pos
+
+    b_pos = b_pos[match]
+
+    result = (a_coords[match], a_payloads[match], b_payloads[b_pos])
+
+    if swap:
+        result = (result[0], result[2], result[1])
+
+    return result
+
 #
 # Merge methods
 #
@@ -674,6 +1354,11 @@ def __and__(self, other):
 
     Currently only supported for "ordered", "unique" fibers.
 
+    When neither fiber is lazy and both hold their coordinates and
+    payloads in packed buffers (see `Fiber.getStorage()`), the
+    matching elements are found with vectorized operations, unless
+    metrics are being collected.
+
     """
 
     assert self._ordered and self._unique
@@ -687,6 +1372,16 @@ def __and__(self, other):
             Iterator simulating the intersection operator
             """
             is_collecting = Metrics.isCollecting()
+
+            if not is_collecting:
+                packed = _intersect_packed(self.a_fiber, self.b_fiber)
+
+                if packed is not None:
+                    for coord, a_payload, b_payload in zip(*(p.tolist() for p in packed)):
+                        yield coord, (Payload(a_payload), Payload(b_payload))
+
+                    return
+
             a_traced = False
             b_traced = False
             if is_collecting:
@@ -864,6 +1559,14 @@ def __or__(self, other):
 
         def __iter__(self):
             is_collecting = Metrics.isCollecting()
+
+            if not is_collecting:
+                bitmaps = _bitmap_arrays(self.a_fiber, self.b_fiber)
+
+                if bitmaps is not None:
+                    yield from _union_bitmaps(self.a_fiber, self.b_fiber, bitmaps)
+                    return
+
             a_traced = False
             b_traced = False
             if is_collecting:
@@ -947,6 +1650,36 @@ def __or__(self, other):
     return result
 
 
+def _union_bitmaps(a_fiber, b_fiber, bitmaps):
+    """Generate the union of two "bitmap" fibers from their merged
+    bitmaps (see `_bitmap_arrays()`)"""
+
+    coords, a_present, b_present, a_payloads, b_payloads = bitmaps
+
+    keep = a_present | b_present
+
+    #
+    # The (fresh) default payloads of leaf fibers are boxed directly
+    # rather than instantiated by `_createDefault()`
+    #
+    a_default = Payload.get(a_fiber.getDefault())
+    b_default = Payload.get(b_fiber.getDefault())
+
+    box = Payload._fastBox
+
+    for coord, in_a, in_b, a_payload, b_payload in zip(coords[keep].tolist(),
+                                                       a_present[keep].tolist(),
+                                                       b_present[keep].tolist(),
+                                                       a_payloads[keep].tolist(),
+                                                       b_payloads[keep].tolist()):
+        if in_a and in_b:
+            yield coord, ("AB", box(a_payload), box(b_payload))
+        elif in_a:
+            yield coord, ("A", box(a_payload), box(b_default))
+        else:
+            yield coord, ("B", box(a_default), box(b_payload))
+
+
 def __xor__(self, other):
     """__xor__
 
@@ -1039,6 +1772,32 @@ def __xor__(self, other):
 
 
 
+def _spa_lshift(a_fiber, b_fiber):
+    """Populate a fiber with "spa" storage (see `__lshift__()`)
+
+    Each element of `b_fiber` finds (or creates) its element in
+    `a_fiber` in O(1), and a created element that is left with the
+    default payload is removed again.
+
+    """
+
+    default = a_fiber._spa_default
+
+    for b_coord, b_payload in b_fiber.__iter__(tick=False):
+        a_payload = a_fiber._spaPayload(b_coord)
+
+        if a_payload is not None:
+            yield b_coord, (a_payload, b_payload)
+            continue
+
+        a_payload = a_fiber._spaPayloadRef(b_coord)
+
+        yield b_coord, (a_payload, b_payload)
+
+        if a_payload == default:
+            a_fiber._spaDelete(b_coord)
+
+
 def __lshift__(self, other, start_pos=None):
     """Fiber assignment
 
@@ -1088,6 +1847,10 @@ def __lshift__(self, other, start_pos=None):
     """
     assert not self.isLazy()
 
+    # Populating mutates `self`, which requires list (or spa) storage
+    if self.getStorage() != "spa":
+        self._toListStorage()
+
     self.setActive(other.getActive())
 
     class lshift_iterator:
@@ -1100,6 +1863,11 @@ def __lshift__(self, other, start_pos=None):
             Iterator simulating the populate operator
             """
 
+            if self.a_fiber.getStorage() == "spa" and self.spec_pos is None \
+                    and not Metrics.isCollecting():
+                yield from _spa_lshift(self.a_fiber, self.b_fiber)
+                return
+
             is_collecting = Metrics.isCollecting()
             a_read_traced = False
             a_write_traced = False
@@ -1185,6 +1953,10 @@ def __lshift__(self, other, start_pos=None):
 
                 new_a_payload = a_payload is None
 
+                if not new_a_payload:
+                    # Get a reference to the existing payload
+                    a_payload = self.a_fiber._boxPayload(a_pos)
+
                 if new_a_payload:
                     # Do not actually insert the payload into the tensor
                     a_payload = self.a_fiber._create_payload(b_coord, pos=a_pos)
@@ -1207,9 +1979,7 @@ def __lshift__(self, other, start_pos=None):
                         (not isinstance(a_payload, type(self.a_fiber)) and \
                         a_payload == self.a_fiber.getDefault()):
                     # Clear the fiber
-                    index = bisect.bisect_left(self.a_fiber.coords, b_coord)
-                    del self.a_fiber.coords[index]
-                    del self.a_fiber.payloads[index]
+                    self.a_fiber._deletePayload(b_coord)
 
                     # Remove the payload from its owning rank (if relevant)
                     if self.a_fiber.getOwner() is not None and \
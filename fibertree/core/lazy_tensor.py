@@ -0,0 +1,468 @@
+#cython: language_level=3
+"""LazyTensor
+
+A class used to record a chain of transforms of a tensor and apply
+them on demand (see `Tensor.lazy()`).
+
+"""
+import inspect
+import logging
+
+from .fiber import Fiber
+from .payload import Payload
+from .tensor import Tensor
+
+#
+# Set up logging
+#
+module_logger = logging.getLogger('fibertree.core.lazy_tensor')
+
+
+class LazyTensor:
+    """A tensor whose transforms are applied lazily.
+
+    A `LazyTensor` records a chain of transforms of a tensor (e.g.,
+    `LazyTensor.splitUniform()` followed by `LazyTensor.swizzleRanks()`
+    and `LazyTensor.flattenRanks()`) without applying them. Each
+    transform returns a new `LazyTensor` with the transform appended to
+    the chain.
+
+    The result of the chain is built by `LazyTensor.materialize()`,
+    which fuses compatible transforms rather than building every
+    intermediate tensor:
+
+    - a run of `swizzleRanks()` and `swapRanks()` is done as a single
+      swizzle, and
+
+    - a `splitUniform()` (without halos or relative coordinates)
+      followed by such a run is done as a single sort of the arrays of
+      the coordinates of the ranks (see
+      `Tensor._splitUniformSwizzle()`).
+
+    Alternatively, the root fiber of the result (see
+    `LazyTensor.getRoot()`) is a lazy fiber. The transforms up to the
+    last one that changes the top rank are applied when it is created,
+    and the remaining transforms are applied to each sub-fiber of the
+    root fiber when iteration reaches it. So iterating over part of the
+    result only transforms that part.
+
+    The rank ids and shape of the result are found without applying
+    the transforms to the tensor: the lists of the rank ids and shape
+    are split, permuted or grouped directly by each transform (see
+    `LazyTensor._shadowStep()`).
+
+    Constructor
+    -----------
+
+    Parameters
+    ----------
+
+    tensor: Tensor
+        The tensor to transform
+
+    steps: tuple, default=()
+        The transforms, as (method name, args, kwargs) tuples
+
+    """
+
+    #
+    # The transforms that can be recorded, and those that just
+    # reorder the ranks (so a run of them can be fused into a swizzle)
+    #
+    _transforms = ("splitUniform",
+                   "splitNonUniform",
+                   "splitEqual",
+                   "splitUnEqual",
+                   "swizzleRanks",
+                   "swapRanks",
+                   "flattenRanks",
+                   "mergeRanks",
+                   "unflattenRanks")
+
+    _reorders = ("swizzleRanks", "swapRanks")
+
+
+    def __init__(self, tensor, steps=()):
+        """__init__"""
+
+        self._tensor = tensor
+        self._steps = tuple(steps)
+
+        self._shadows = None
+
+
+    def _addStep(self, name, args, kwargs):
+        """Return a lazy tensor with the transform `name` appended"""
+
+        assert name in LazyTensor._transforms
+
+        return LazyTensor(self._tensor, self._steps + ((name, args, kwargs),))
+
+#
+# Transform methods
+#
+# Note: all these methods return a new lazy tensor
+#
+    def splitUniform(self, *args, **kwargs):
+        """Record a `Tensor.splitUniform()`"""
+
+        return self._addStep("splitUniform", args, kwargs)
+
+
+    def splitNonUniform(self, *args, **kwargs):
+        """Record a `Tensor.splitNonUniform()`"""
+
+        return self._addStep("splitNonUniform", args, kwargs)
+
+
+    def splitEqual(self, *args, **kwargs):
+        """Record a `Tensor.splitEqual()`"""
+
+        return self._addStep("splitEqual", args, kwargs)
+
+
+    def splitUnEqual(self, *args, **kwargs):
+        """Record a `Tensor.splitUnEqual()`"""
+
+        return self._addStep("splitUnEqual", args, kwargs)
+
+
+    def swizzleRanks(self, *args, **kwargs):
+        """Record a `Tensor.swizzleRanks()`"""
+
+        return self._addStep("swizzleRanks", args, kwargs)
+
+
+    def swapRanks(self, *args, **kwargs):
+        """Record a `Tensor.swapRanks()`"""
+
+        return self._addStep("swapRanks", args, kwargs)
+
+
+    def flattenRanks(self, *args, **kwargs):
+        """Record a `Tensor.flattenRanks()`"""
+
+        return self._addStep("flattenRanks", args, kwargs)
+
+
+    def mergeRanks(self, *args, **kwargs):
+        """Record a `Tensor.mergeRanks()`"""
+
+        return self._addStep("mergeRanks", args, kwargs)
+
+
+    def unflattenRanks(self, *args, **kwargs):
+        """Record a `Tensor.unflattenRanks()`"""
+
+        return self._addStep("unflattenRanks", args, kwargs)
+
+#
+# Accessor methods
+#
+    def getTensor(self):
+        """Return the (untransformed) tensor"""
+
+        return self._tensor
+
+
+    def getSteps(self):
+        """Return the transforms, as (method name, args, kwargs) tuples"""
+
+        return self._steps
+
+
+    def getRankIds(self):
+        """Return the rank ids of the result"""
+
+        return self._getShadows()[-1].getRankIds()
+
+
+    def getShape(self, *args, **kwargs):
+        """Return the shape of the result (see `Tensor.getShape()`)"""
+
+        return self._getShadows()[-1].getShape(*args, **kwargs)
+
+
+    def _getShadows(self):
+        """Return a list of empty tensors with the ranks of the tensor
+        before each transform and after the last transform"""
+
+        if self._shadows is None:
+            tensor = self._tensor
+
+            shadow = Tensor(rank_ids=tensor.getRankIds(),
+                            shape=tensor.getShape(authoritative=True),
+                            default=tensor.getDefault())
+
+            shadows = [shadow]
+
+            for step in self._steps:
+                shadow = LazyTensor._shadowStep(step, shadow)
+                shadows.append(shadow)
+
+            self._shadows = shadows
+
+        return self._shadows
+
+
+    @staticmethod
+    def _shadowStep(step, shadow):
+        """Return an empty tensor with the ranks of the result of the
+        transform `step` of the empty tensor `shadow`
+
+        The rank ids and shape of a split (see `Tensor._splitGeneric()`)
+        or a reorder are found from the lists of `shadow`, and those of
+        a flatten, merge or unflatten are found as by the transform
+        (see `Tensor._flattenRankIdsShape()` and
+        `Tensor._unflattenRankIdsShape()`), so no transform is applied
+        to `shadow`.
+
+        """
+
+        name, args, kwargs = step
+
+        rank_ids = shadow.getRankIds()
+        shape = shadow.getShape(authoritative=True)
+
+        if name.startswith("split"):
+            depth = LazyTensor._bindStep(step, shadow)["depth"]
+            split_id = rank_ids[depth]
+
+            guide = list(range(depth + 1)) + list(range(depth, len(rank_ids)))
+
+            rank_ids = rank_ids[:depth] \
+                + [f"{split_id}.1", f"{split_id}.0"] \
+                + rank_ids[depth + 1:]
+
+        elif name == "swapRanks":
+            depth = LazyTensor._bindStep(step, shadow)["depth"]
+
+            guide = list(range(len(rank_ids)))
+            guide[depth], guide[depth + 1] = depth + 1, depth
+
+            rank_ids = [rank_ids[g] for g in guide]
+
+        elif name == "swizzleRanks":
+            new_rank_ids = LazyTensor._bindStep(step, shadow)["rank_ids"]
+
+            guide = [rank_ids.index(rank_id) for rank_id in new_rank_ids]
+
+            rank_ids = list(new_rank_ids)
+
+        elif name in ("flattenRanks", "mergeRanks"):
+            arguments = LazyTensor._bindStep(step, shadow)
+
+            rank_ids, shape = shadow._flattenRankIdsShape(arguments["depth"],
+                                                          arguments["levels"],
+                                                          arguments["coord_style"])
+            guide = None
+
+        elif name == "unflattenRanks":
+            arguments = LazyTensor._bindStep(step, shadow)
+
+            rank_ids, shape = shadow._unflattenRankIdsShape(arguments["depth"],
+                                                            arguments["levels"],
+                                                            arguments["style"])
+            guide = None
+
+        else:
+            return getattr(shadow, name)(*args, **kwargs)
+
+        if shape and guide is not None:
+            shape = [shape[g] for g in guide]
+
+        return Tensor(rank_ids=rank_ids,
+                      shape=shape,
+                      default=shadow.getDefault())
+
+#
+# Materialize methods
+#
+    def materialize(self):
+        """Apply the transforms (fusing compatible transforms)
+
+        Returns
+        -------
+
+        tensor: Tensor
+            The transformed tensor
+
+        """
+
+        tensor = self._tensor
+        steps = self._steps
+        shadows = self._getShadows()
+
+        i = 0
+
+        while i < len(steps):
+            name, args, kwargs = steps[i]
+
+            #
+            # Find the run of reordering transforms starting at `i`
+            # (or after a split at `i`)
+            #
+            start = i + 1 if name == "splitUniform" else i
+
+            end = start
+            while end < len(steps) and steps[end][0] in LazyTensor._reorders:
+                end += 1
+
+            rank_ids = shadows[end].getRankIds()
+
+            if name == "splitUniform" and end > start:
+                arguments = self._bindStep(steps[i], shadows[i])
+
+                if arguments["pre_halo"] == 0 and arguments["post_halo"] == 0 \
+                   and not arguments["relativeCoords"]:
+                    result = tensor._splitUniformSwizzle(arguments["step"],
+                                                         arguments["depth"],
+                                                         rank_ids)
+
+                    if result is not None:
+                        tensor = result
+                        i = end
+                        continue
+
+            if start == i and end - start > 1:
+                tensor = tensor.swizzleRanks(rank_ids)
+                i = end
+                continue
+
+            tensor = getattr(tensor, name)(*args, **kwargs)
+            i += 1
+
+        if tensor is self._tensor:
+            tensor = tensor._cowCopy()
+
+        return tensor
+
+
+    @staticmethod
+    def _bindStep(step, shadow):
+        """Return the arguments of a transform by name (with the depth
+        of a transform given by a rank id)"""
+
+        name, args, kwargs = step
+
+        if name.startswith("split"):
+            method = getattr(Fiber, name)
+        else:
+            method = getattr(Tensor, name)
+
+        bound = inspect.signature(method).bind(None, *args, **kwargs)
+        bound.apply_defaults()
+
+        arguments = dict(bound.arguments)
+        del arguments[next(iter(arguments))]
+
+        if arguments.get("rankid") is not None:
+            arguments["depth"] = shadow.getRankIds().index(arguments["rankid"])
+
+        arguments.pop("rankid", None)
+
+        return arguments
+
+#
+# Lazy root methods
+#
+    def getRoot(self):
+        """Return the root fiber of the result
+
+        The transforms up to the last one that changes the top rank
+        are applied (see `LazyTensor.materialize()`), and if there are
+        others a lazy fiber is returned, which applies them to each of
+        its sub-fibers as iteration reaches it.
+
+        Returns
+        -------
+
+        root: Fiber
+            The root fiber of the result
+
+        """
+
+        steps = self._steps
+        shadows = self._getShadows()
+
+        #
+        # Find the transforms below the top rank
+        #
+        sub_steps = []
+
+        for step, shadow in zip(reversed(steps), reversed(shadows[:-1])):
+            sub_step = LazyTensor._subStep(step, shadow)
+
+            if sub_step is None:
+                break
+
+            sub_steps.insert(0, sub_step)
+
+        top = LazyTensor(self._tensor, steps[:len(steps) - len(sub_steps)]).materialize()
+
+        if not sub_steps:
+            return top.getRoot()
+
+        root = top.getRoot()
+
+        rank_ids = top.getRankIds()[1:]
+        shape = top.getShape(authoritative=True)
+        shape = shape[1:] if shape else None
+
+        class transform_iterator:
+            def __iter__(self):
+                for c, p in root.__iter__(tick=False):
+                    sub_tensor = Tensor.fromFiber(rank_ids,
+                                                  Payload.get(p),
+                                                  shape,
+                                                  default=top.getDefault())
+
+                    yield c, LazyTensor(sub_tensor, sub_steps).materialize().getRoot()
+
+        result = Fiber.fromIterator(transform_iterator,
+                                    active_range=root.getActive(),
+                                    shape=root.getRankAttrs().getShape())
+        result._setDefault(root.getDefault())
+        result.getRankAttrs().setId(self.getRankIds()[0])
+
+        return result
+
+
+    @staticmethod
+    def _subStep(step, shadow):
+        """Return the transform of a sub-fiber of the root fiber that
+        does the transform `step` of the tensor `shadow` (or None if
+        the transform changes the top rank)"""
+
+        name = step[0]
+
+        arguments = LazyTensor._bindStep(step, shadow)
+
+        if name == "swizzleRanks":
+            rank_ids = arguments["rank_ids"]
+
+            if rank_ids[0] != shadow.getRankIds()[0]:
+                return None
+
+            return (name, (rank_ids[1:],), {})
+
+        if arguments["depth"] == 0:
+            return None
+
+        arguments["depth"] -= 1
+
+        return (name, (), arguments)
+
+
+    def __iter__(self):
+        """Iterate over the root fiber of the result"""
+
+        return self.getRoot().__iter__()
+
+
+    def __repr__(self):
+        """__repr__"""
+
+        steps = ", ".join(name for name, _, _ in self._steps)
+
+        return f"LazyTensor({self._tensor.getName()}, [{steps}])"
@@ -101,9 +101,9 @@ class Payload:
         #
         # Just handle regular Payload creation
         #
-        self = super(Payload, cls).__new__(cls)
-        self.__init__(value=value)
-        return self
+        # Note: __init__() is invoked automatically on the result
+        #
+        return super(Payload, cls).__new__(cls)
 
 
     def __init__(self, value=None):
@@ -265,6 +265,24 @@ class Payload:
         return value
 
 
+    @staticmethod
+    def _fastBox(value):
+        """Selectively **box** a value (see `Payload.maybe_box()`)
+
+        Creates the `Payload` without going through `__init__()` and
+        `__setattr__()`, which dominate the cost of boxing the values
+        of a fiber one at a time, e.g., during iteration.
+
+        """
+
+        if isinstance(value, (bool, float, int, str, tuple, frozenset)):
+            payload = object.__new__(Payload)
+            payload.__dict__["value"] = value
+            return payload
+
+        return value
+
+
     @staticmethod
     def is_payload(payload):
         """Check if argument is a payload.
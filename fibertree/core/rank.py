@@ -6,6 +6,7 @@ A class used to implement a rank (or dimension) of a tensor.
 
 """
 
+import copy
 import logging
 import pickle
 
@@ -92,6 +93,12 @@ class Rank:
 
         self.fibers = []
 
+        #
+        # Count of the (possible) mutations of the fibers of the rank
+        # (see `Fiber._noteMutation()`)
+        #
+        self._mutations = 0
+
 #
 # Accessor methods
 #
@@ -590,6 +597,17 @@ class Rank:
         """
         return pickle.loads(pickle.dumps(self))
 
+    def _emptyCopy(self, next_rank=None):
+        """Return a copy of the rank attributes in a rank without fibers"""
+
+        rank = copy.copy(self)
+
+        rank._attrs = copy.deepcopy(self._attrs)
+        rank.next_rank = next_rank
+        rank.fibers = []
+
+        return rank
+
 #
 # Utility functions
 #
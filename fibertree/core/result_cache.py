@@ -0,0 +1,175 @@
+#cython: language_level=3
+"""ResultCache
+
+A class used to hold the results of operations on a tensor (see
+`Tensor.setCacheSize()`).
+
+"""
+import logging
+
+from collections import OrderedDict
+
+#
+# Set up logging
+#
+module_logger = logging.getLogger('fibertree.core.result_cache')
+
+
+class ResultCache:
+    """A size-bounded least recently used (LRU) cache of results.
+
+    A `ResultCache` maps a key, made from the name of an operation,
+    its arguments and the version of the tensor it was applied to (see
+    `ResultCache.makeKey()`), to the result of the operation. When the
+    cache is full, adding a result evicts the least recently used
+    result.
+
+    Counts of the hits, misses, evictions and invalidations of the
+    cache are kept, see `ResultCache.getStats()`.
+
+    Constructor
+    -----------
+
+    Parameters
+    ----------
+
+    maxsize: integer
+        The maximum number of results held
+
+    """
+
+    def __init__(self, maxsize):
+        """__init__"""
+
+        assert maxsize > 0, "A ResultCache must hold at least one result"
+
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+
+    @staticmethod
+    def makeKey(operation, args, kwargs, version):
+        """Make the key of a result
+
+        Parameters
+        ----------
+
+        operation: str
+            The name of the operation
+
+        args: tuple
+            The positional arguments of the operation
+
+        kwargs: dict
+            The keyword arguments of the operation
+
+        version: integer
+            The version of the tensor the operation is applied to
+
+        Returns
+        -------
+
+        key: tuple
+            The key, or None if the arguments cannot be hashed
+
+        """
+
+        def freeze(value):
+            if isinstance(value, (list, tuple)):
+                return tuple(freeze(v) for v in value)
+            return value
+
+        key = (operation,
+               freeze(args),
+               tuple(sorted((name, freeze(value)) for name, value in kwargs.items())),
+               version)
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+
+    def get(self, key):
+        """Return the result for `key` (or None if there is none)"""
+
+        result = self._entries.get(key)
+
+        if result is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+
+        return result
+
+
+    def put(self, key, result):
+        """Add the result for `key`, evicting the least recently used
+        results if the cache is full"""
+
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+
+        self._evict()
+
+
+    def invalidate(self):
+        """Drop all the results (e.g., when the tensor is mutated)"""
+
+        if self._entries:
+            self._invalidations += 1
+
+        self._entries.clear()
+
+
+    def setMaxsize(self, maxsize):
+        """Change the maximum number of results held"""
+
+        assert maxsize > 0, "A ResultCache must hold at least one result"
+
+        self._maxsize = maxsize
+
+        self._evict()
+
+
+    def _evict(self):
+        """Evict the least recently used results over the maximum size"""
+
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+
+    def __len__(self):
+        """Return the number of results held"""
+
+        return len(self._entries)
+
+
+    def getStats(self):
+        """Return the counters of the cache
+
+        Returns
+        -------
+
+        stats: dict
+            The "hits", "misses", "evictions" and "invalidations" of
+            the cache, and its current "size" and "maxsize"
+
+        """
+
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+                "maxsize": self._maxsize}
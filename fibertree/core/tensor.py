@@ -10,19 +10,33 @@ import logging
 from sys import exit
 
 import copy
+import json
 import pickle
+import time
 import yaml
-from copy import deepcopy
+
+import numpy as np
 
 from .rank    import Rank
 from .fiber   import Fiber
+from .chunked_list import ChunkedList
+from .compressed_fibers import CompressedFibers
+from .fiber_builder import FiberBuilder
 from .payload import Payload
+from .result_cache import ResultCache
 
 #
 # Set up logging
 #
 module_logger = logging.getLogger('fibertree.core.tensor')
 
+#
+# Binary tensor file format (see `Tensor.save()`)
+#
+_FILE_MAGIC = b"FIBRTREE"
+_FILE_VERSION = 1
+_FILE_ALIGN = 64
+
 
 class Tensor:
     """Tensor Class
@@ -131,6 +145,13 @@ class Tensor:
 
         self.yamlfile = yamlfile
 
+        #
+        # Results of operations on the tensor (see setCacheSize())
+        #
+        self._cache = None
+        self._version = 0
+        self._mutations = 0
+
         # TBD: Encourage use of Tensor.fromYAMLfile instead...
 
         if (yamlfile != ""):
@@ -238,6 +259,107 @@ class Tensor:
         return Tensor.fromFiber(rank_ids, root, shape=shape)
 
 
+    @classmethod
+    def fromFile(cls, filename, storage="array", mmap=False):
+        """Construct a tensor from a binary tensor file
+
+        This constructor creates a Tensor from a file written by
+        `Tensor.save()`. The whole file is read with a single call and
+        the fibers are created from segments of the (flat) arrays of
+        each rank, so with "array" storage there is no per-element
+        Python work and the fibers hold zero-copy views of the data
+        read.
+
+        Alternatively, the file can be memory mapped, e.g., for
+        tensors larger than memory. Then only the root fiber is
+        created, and the other fibers are created (as views of the
+        mapped file) when they are accessed (see `CompressedFibers`).
+        Such fibers are not added to the ranks of the tensor, so they
+        are dropped when no longer referenced, and the operating
+        system can evict the pages of the file under memory pressure.
+        A fiber that is mutated (which converts it into "list"
+        storage) is kept by its parent fiber, so the mutation is not
+        lost (the file is never written).
+
+        Parameters
+        -----------
+
+        filename: string
+            Filename of a binary tensor file
+
+        storage: str, default="array"
+            The storage used for the fibers (see `Fiber.getStorage()`)
+
+        mmap: Boolean, default=False
+            Memory map the file and create the fibers lazily (requires
+            "array" storage)
+
+        """
+
+        assert not mmap or storage == "array", \
+            "A memory-mapped tensor must use array storage"
+
+        if mmap:
+            buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+        else:
+            buffer = np.fromfile(filename, dtype=np.uint8)
+
+        header, rank_arrays = Tensor._parseFile(buffer)
+
+        rank_ids = header['rank_ids']
+        shape = header['shape']
+        default = header['default']
+
+        if len(rank_ids) == 0:
+            t = Tensor(rank_ids=[], shape=shape, name=header['name'])
+            t.setColor(header['color'])
+            t.setMutable(False)
+            t._root = Payload(header['root'])
+            return t
+
+        if mmap:
+            root = CompressedFibers.makeFiber(rank_arrays, 0, 0, shape, default)
+
+            return Tensor.fromFiber(rank_ids,
+                                    root,
+                                    shape=shape,
+                                    name=header['name'],
+                                    color=header['color'],
+                                    default=default)
+
+        #
+        # Build the fibers bottom up, each fiber of a rank is a
+        # segment of the rank's arrays
+        #
+        payloads = rank_arrays[-1]['payloads']
+
+        for level in range(len(rank_ids) - 1, -1, -1):
+            segments = rank_arrays[level]['segments'].tolist()
+            coords = rank_arrays[level]['coords']
+
+            if storage == "array":
+                make = Fiber._fromBuffers
+            else:
+                make = Fiber
+                coords = coords.tolist()
+
+                if level == len(rank_ids) - 1:
+                    payloads = payloads.tolist()
+
+            payloads = [make(coords[start:end],
+                             payloads[start:end],
+                             shape=shape[level],
+                             default=default)
+                        for start, end in zip(segments[:-1], segments[1:])]
+
+        return Tensor.fromFiber(rank_ids,
+                                payloads[0],
+                                shape=shape,
+                                name=header['name'],
+                                color=header['color'],
+                                default=default)
+
+
     @classmethod
     def fromUncompressed(cls,
                          rank_ids=None,
@@ -254,9 +376,9 @@ class Tensor:
         rank_ids: list, default=["Rn", "Rn-1", ... "R0"]
             List containing names of ranks.
 
-        root: list of lists
-            A list of lists with an uncompressed represenation of the
-            tensor, zero values are assumed empty.
+        root: list of lists or numpy.ndarray
+            A list of lists (or an array) with an uncompressed
+            represenation of the tensor, zero values are assumed empty.
 
         shape: list, default=(calculated from shape of "root")
             A list of shapes of the ranks
@@ -271,7 +393,10 @@ class Tensor:
 
         assert(root is not None)
 
-        if not isinstance(root, list):
+        if isinstance(root, np.ndarray) and root.ndim == 0:
+            root = root.item()
+
+        if not isinstance(root, (list, np.ndarray)):
             # Handle a rank zero tensor
             t = Tensor(rank_ids=[], shape=[])
             t._root = Payload(root)
@@ -282,8 +407,11 @@ class Tensor:
         fiber = Fiber.fromUncompressed(root, default=default)
 
         if shape is None:
-            # TBD: Maybe this is not needed because fibers get a max_coord...
-            shape = Tensor._calc_shape(root)
+            if isinstance(root, np.ndarray):
+                shape = list(root.shape)
+            else:
+                # TBD: Maybe this is not needed because fibers get a max_coord...
+                shape = Tensor._calc_shape(root)
 
         return Tensor.fromFiber(rank_ids,
                                 fiber,
@@ -376,6 +504,250 @@ class Tensor:
         return tensor
 
 
+    @classmethod
+    def fromCOO(cls,
+                rank_ids,
+                coord_arrays,
+                values,
+                shape=None,
+                default=0,
+                name="",
+                color="red",
+                storage="list"):
+        """Construct a tensor from coordinate (COO) format arrays
+
+        The elements are sorted lexicographically by coordinate (with
+        the first rank most significant), so they may be given in any
+        order, and all the ranks are then built in one pass over the
+        sorted arrays. The values of repeated coordinates are summed.
+
+        Parameters
+        ----------
+
+        rank_ids: list
+            List containing names of ranks.
+
+        coord_arrays: list of array-like
+            An array of coordinates for each rank (top to bottom)
+
+        values: array-like
+            The value of each element
+
+        shape: list, default=(one more than the largest coordinate of each rank)
+            A list of shapes of the ranks
+
+        default: value, default=0
+            The default (empty) value of the tensor
+
+        name: string, default=""
+            A name for the tensor
+
+        color: string, default="red"
+            The color to paint values when displaying the tensor
+
+        storage: str, default="list"
+            The storage used for the fibers (see `Fiber.getStorage()`)
+
+
+        Notes
+        -----
+
+        Values equal to `default` are **not** removed.
+
+        """
+
+        coord_arrays = [np.asarray(coords) for coords in coord_arrays]
+        values = np.asarray(values)
+
+        assert len(rank_ids) > 0 and len(coord_arrays) == len(rank_ids), \
+            "There must be an array of coordinates for each rank"
+
+        assert all(len(coords) == len(values) for coords in coord_arrays), \
+            "Coordinate and value arrays must be same length"
+
+        if len(values) > 0:
+            #
+            # Sort the elements, preferably using a single linearized
+            # key for each point
+            #
+            keys = Tensor._linearizeCoords(coord_arrays)
+
+            if keys is None:
+                # Note: the last key given to lexsort is the most significant
+                order = np.lexsort(coord_arrays[::-1])
+            elif (keys[1:] >= keys[:-1]).all():
+                order = None
+            else:
+                order = np.argsort(keys, kind="stable")
+
+            if order is not None:
+                coord_arrays = [coords[order] for coords in coord_arrays]
+                values = values[order]
+
+                if keys is not None:
+                    keys = keys[order]
+
+            #
+            # Sum the values of repeated coordinates
+            #
+            new_point = np.zeros(len(values), dtype=bool)
+            new_point[0] = True
+
+            if keys is not None:
+                new_point[1:] = keys[1:] != keys[:-1]
+            else:
+                for coords in coord_arrays:
+                    new_point[1:] |= coords[1:] != coords[:-1]
+
+            if not new_point.all():
+                starts = np.flatnonzero(new_point)
+
+                coord_arrays = [coords[starts] for coords in coord_arrays]
+                values = np.add.reduceat(values, starts)
+
+        if shape is None:
+            shape = [int(coords.max()) + 1 if len(coords) else 0
+                     for coords in coord_arrays]
+
+        fiber = Fiber._makeFiberFromArrays(coord_arrays,
+                                           values,
+                                           shape=shape,
+                                           default=default,
+                                           storage=storage)
+
+        return Tensor.fromFiber(rank_ids,
+                                fiber,
+                                shape=shape,
+                                name=name,
+                                color=color,
+                                default=default)
+
+
+    @staticmethod
+    def _linearizeCoords(coord_arrays):
+        """Return a single (row-major) integer key for each point, or
+        None if the coordinates cannot be linearized into an int64"""
+
+        dims = []
+
+        for coords in coord_arrays:
+            if coords.dtype.kind not in "iu" or coords.min() < 0:
+                return None
+
+            dims.append(int(coords.max()) + 1)
+
+        size = 1
+        for dim in dims:
+            size *= dim
+
+        if size >= 2**63:
+            return None
+
+        return np.ravel_multi_index(coord_arrays, dims)
+
+
+    @classmethod
+    def fromCSR(cls,
+                rank_ids,
+                indptr,
+                indices,
+                data,
+                shape=None,
+                default=0,
+                name="",
+                color="red"):
+        """Construct a tensor that is a view of a compressed sparse
+        row (CSR) matrix
+
+        The three arrays of the matrix are wrapped without copying
+        them, and the fiber of a row is only created (as a view of
+        the arrays) when it is accessed. See `Fiber.fromCSR()` for
+        details.
+
+        Parameters
+        ----------
+
+        rank_ids: list
+            List containing names of the (row and column) ranks.
+
+        indptr: array-like
+            The offsets of the elements of each row in `indices` and `data`
+
+        indices: array-like
+            The (column) coordinates of the elements of each row
+
+        data: array-like
+            The values of the elements of each row
+
+        shape: list, default=[number of rows, one more than the largest column]
+            A list of shapes of the ranks
+
+        default: value, default=0
+            The default (empty) value of the tensor
+
+        name: string, default=""
+            A name for the tensor
+
+        color: string, default="red"
+            The color to paint values when displaying the tensor
+
+
+        Notes
+        -----
+
+        Only the root fiber is added to the tensor's ranks, the row
+        fibers are owned by the lower rank but are not added to it.
+
+        """
+
+        assert len(rank_ids) == 2, "A CSR matrix has two ranks"
+
+        fiber = Fiber.fromCSR(indptr, indices, data, shape=shape, default=default)
+
+        return Tensor.fromFiber(rank_ids,
+                                fiber,
+                                shape=fiber.getShape(),
+                                name=name,
+                                color=color,
+                                default=default)
+
+
+    @classmethod
+    def fromCSC(cls,
+                rank_ids,
+                indptr,
+                indices,
+                data,
+                shape=None,
+                default=0,
+                name="",
+                color="red"):
+        """Construct a tensor that is a view of a compressed sparse
+        column (CSC) matrix
+
+        The `rank_ids` and `shape` are given in (row, column) order,
+        as for the matrix. Since the matrix is compressed by column
+        the ranks of the tensor are in (column, row) order, e.g., a
+        CSC matrix with `rank_ids=["M", "K"]` becomes a tensor with
+        ranks ["K", "M"]. See `Tensor.fromCSR()` for details.
+
+        """
+
+        assert len(rank_ids) == 2, "A CSC matrix has two ranks"
+
+        if shape is not None:
+            shape = shape[::-1]
+
+        return Tensor.fromCSR(rank_ids[::-1],
+                              indptr,
+                              indices,
+                              data,
+                              shape=shape,
+                              default=default,
+                              name=name,
+                              color=color)
+
+
     @classmethod
     def fromRandom(cls,
                    rank_ids=None,
@@ -385,7 +757,8 @@ class Tensor:
                    seed=None,
                    name="",
                    color="red",
-                   default=0):
+                   default=0,
+                   storage="list"):
         """Create a random tensor
 
         Parameters
@@ -411,9 +784,17 @@ class Tensor:
         seed: a valid argument for `random.seed`
             A seed to pass to `random.seed`
 
+        storage: str, default="list"
+            The storage used for the fibers (see `Fiber.getStorage()`)
+
         """
 
-        f = Fiber.fromRandom(shape, density, interval, seed, default=default)
+        f = Fiber.fromRandom(shape,
+                             density,
+                             interval,
+                             seed,
+                             default=default,
+                             storage=storage)
 
         return Tensor.fromFiber(rank_ids=rank_ids,
                                 fiber=f,
@@ -708,7 +1089,7 @@ class Tensor:
         # Note: shapes and owners will be overwritten in _addFiber()
         #
         if root.getOwner() is not None:
-            root = deepcopy(root.copy(preserve_owner=False))
+            root = root.copy(preserve_owner=False)
 
         self._root = root
 
@@ -720,6 +1101,8 @@ class Tensor:
 
         self._addFiber(root)
 
+        self._invalidateCache()
+
     def _addFiber(self, fiber, level=0):
         """Recursively fill in ranks from "fiber"."""
 
@@ -744,11 +1127,22 @@ class Tensor:
 
         self.ranks[level].append(fiber)
 
+        if level + 1 == len(self.ranks):
+            # Payloads of the leaf rank are not fibers
+            return
+
+        payloads = fiber.getPayloads()
+
+        if not isinstance(payloads, (list, ChunkedList)):
+            # Payloads in "array" storage are all scalars, other
+            # payload sequences create their fibers lazily
+            return
+
         # Note: The code below handles the (probably abandoned)
         #       transistion from raw fibers as payloads to fibers in
         #       Payload
 
-        for p in fiber.getPayloads():
+        for p in payloads:
             if Payload.contains(p, Fiber):
                 self._addFiber(Payload.get(p), level + 1)
 
@@ -909,6 +1303,8 @@ class Tensor:
         #
         self.ranks[-1].setDefault(value)
 
+        self._invalidateCache()
+
         return self
 
 
@@ -967,6 +1363,8 @@ class Tensor:
 
         self._mutable = value
 
+        self._invalidateCache()
+
         return self
 
 
@@ -992,7 +1390,125 @@ class Tensor:
 
         return self._mutable
 
-    def setFormat(self, rank_id, fmt):
+#
+# Result cache methods
+#
+    def setCacheSize(self, size):
+        """Set the size of the cache of results of the tensor
+
+        Opt-in to caching the results of `Tensor.swizzleRanks()`,
+        `Tensor.splitUniform()` and `Tensor.splitEqual()`, so
+        repeating one of those operations with the same arguments
+        returns a copy-on-write copy of the cached result (see
+        `Tensor._cowCopy()`), which is O(number of fibers) rather than
+        a new computation. The cache holds up to `size` results and
+        evicts the least recently used result when it is full.
+
+        Parameters
+        ----------
+        size: integer
+            The maximum number of results held, or 0 to disable (and
+            drop) the cache
+
+        Returns
+        -------
+        self: Tensor
+            So method can be used in a chain
+
+        Notes
+        -----
+
+        Since each caller gets its own copy, mutating a result does
+        not change the cached result (or the results of other
+        callers), and results keep the mutability of the tensor (see
+        `Tensor.setMutable()`).
+
+        The cache is invalidated when the tensor is mutated through
+        `Tensor.getPayloadRef()` or `Tensor.__setitem__()`, when its
+        root, default or mutability are set, or when one of its fibers
+        is mutated (e.g., with `Fiber.getPayloadRef()`, the `<<`
+        operator or `Fiber.append()`, see `Fiber._noteMutation()`).
+        Since the payloads yielded by iterating over the leaf fibers
+        of a tensor can be used to update it, such iteration also
+        invalidates the cache.
+
+        """
+
+        if not size:
+            self._cache = None
+        elif self._cache is None:
+            self._cache = ResultCache(size)
+        else:
+            self._cache.setMaxsize(size)
+
+        return self
+
+
+    def getCacheStats(self):
+        """Return the counters of the cache of results of the tensor
+
+        Returns
+        -------
+        stats: dict
+            The "hits", "misses", "evictions" and "invalidations" of
+            the cache, and its current "size" and "maxsize" (or None
+            if caching is disabled, see `Tensor.setCacheSize()`)
+
+        """
+
+        if self._cache is None:
+            return None
+
+        return self._cache.getStats()
+
+
+    def _cached(self, operation, compute, *args, **kwargs):
+        """Return the (cached) result of `compute(*args, **kwargs)`"""
+
+        cache = self._cache
+
+        if cache is None:
+            return compute(*args, **kwargs)
+
+        #
+        # Check for mutations made directly on the fibers of the
+        # tensor (see `Fiber._noteMutation()`)
+        #
+        mutations = sum(rank._mutations for rank in self.ranks)
+
+        if mutations != self._mutations:
+            self._mutations = mutations
+            self._invalidateCache()
+
+        key = ResultCache.makeKey(operation, args, kwargs, self._version)
+
+        if key is None:
+            return compute(*args, **kwargs)
+
+        result = cache.get(key)
+
+        if result is None:
+            result = compute(*args, **kwargs)
+
+            cache.put(key, result)
+
+        #
+        # Each caller gets its own copy-on-write copy, so mutating it
+        # does not change the cached result
+        #
+        return result._cowCopy()
+
+
+    def _invalidateCache(self):
+        """Record that the tensor (may have) changed"""
+
+        self._version += 1
+
+        if self._cache is not None:
+            self._cache.invalidate()
+
+
+    def setFormat(self, rank_id, fmt, threshold=0.5):
         """Set the format for the given rank
 
         Sets the format of the rank specified by the `rank_id` to the given
@@ -1005,7 +1521,13 @@ class Tensor:
             The ID of the rank whose format to modify
 
         fmt: string
-            The format of the rank; "C" = compressed, "U" = uncompressed
+            The format of the rank; "C" = compressed, "U" = uncompressed,
+            "auto" = selected by the density of the rank (see
+            `Tensor.setFormatsByDensity()`, including how the format
+            changes what iteration yields)
+
+        threshold: float, default=0.5
+            The density at or above which "auto" selects "U"
 
         Returns
         -------
@@ -1024,64 +1546,190 @@ class Tensor:
         """
 
         rank_ids = self.getRankIds()
-        self.ranks[rank_ids.index(rank_id)].setFormat(fmt)
+        depth = rank_ids.index(rank_id)
 
-    def getFormat(self, rank_id):
-        """Get the format of the given rank
+        if fmt == "auto":
+            fmt = self._rankStats(depth, threshold)["format"]
 
-        Gets the format of the rank specified by the `rank_id`
+        self.ranks[depth].setFormat(fmt)
+
+
+    def setFormatsByDensity(self, threshold=0.5, verbose=False):
+        """Set the format of each rank with a density heuristic
+
+        The density of a rank is the number of elements held by the
+        fibers of the rank divided by the number of coordinates in
+        the shape of those fibers. Each rank whose density is at or
+        above `threshold` is set to format "U" (uncompressed), and
+        every other rank is set to format "C" (compressed). The
+        storage of the fibers (see `Fiber.getStorage()`) is not
+        changed.
 
         Parameters
         ----------
 
-        rank_id: string
-            The ID of the rank whose format to modify
+        threshold: float, default=0.5
+            The density at or above which a rank is set to "U"
+
+        verbose: Bool, default=False
+            Print the report
 
         Returns
         -------
 
-        fmt: string
-            The format of the rank; "C" = compressed, "U" = uncompressed
+        report: list of dicts
+            For each rank, its "rank_id", number of "fibers", number
+            of elements ("occupancy"), "density", selected "format",
+            for each format the "estimated_memory" (in words, see
+            below) and the measured "time" (in seconds) to iterate
+            over all the fibers of the rank
 
+        Notes
+        -----
 
-        Raises
-        ------
+        The format of a rank selects how its fibers are iterated (and
+        modeled), not how they are stored (see `Fiber.getStorage()`).
+        So a rank set to "U" yields an element, with a default payload
+        if it is empty, for every coordinate of its shape, where "C"
+        only yields the non-empty elements. The values computed by
+        loops that combine the elements (e.g., with `&` or `<<`) are
+        unchanged, since default payloads contribute nothing, but code
+        that counts the elements or looks at the empty ones sees the
+        difference.
+
+        The "estimated_memory" is a model of a representation of the
+        rank in each format, with "C" holding a coordinate and a
+        payload per element and "U" a payload per coordinate. It is
+        not a measurement of the fibers, whose memory the format does
+        not change, and the default threshold is where the estimates
+        for the "C" and "U" formats break even.
 
-        ValueError
-            rank_id is not a named rank in the tensor
         """
 
-        rank_ids = self.getRankIds()
-        return self.ranks[rank_ids.index(rank_id)].getFormat()
+        report = []
 
+        for depth in range(self.getDepth()):
+            stats = self._rankStats(depth, threshold, timing=True)
+            self.ranks[depth].setFormat(stats["format"])
 
-#
-#  Comparison operations
-#
-    def __eq__(self, other):
-        """__eq__
+            report.append(stats)
 
-        Check for equivalence of two tensors by matching their rank
-        ids and root fiber.
+        if verbose:
+            print(f"{'rank':>6} {'density':>8} {'format':>6}"
+                  f" {'est mem C':>9} {'est mem U':>9} {'time C (s)':>10} {'time U (s)':>10}")
 
-        Note: The tenor's names and colors do not need to match
+            for stats in report:
+                print(f"{stats['rank_id']:>6} {stats['density']:8.3f} {stats['format']:>6}"
+                      f" {stats['estimated_memory']['C']:9d} {stats['estimated_memory']['U']:9d}"
+                      f" {stats['time']['C']:10.4f} {stats['time']['U']:10.4f}")
 
-        """
-        rankid_match = (self.getRankIds() == other.getRankIds())
-        fiber_match = (self.getRoot() == other.getRoot())
+        return report
 
-        return rankid_match and fiber_match
 
+    def _rankStats(self, depth, threshold, timing=False):
+        """Measure the occupancy of the rank at `depth` and select its
+        format (see `Tensor.setFormatsByDensity()`)"""
 
-#
-# Tensor equivalent of Fiber methods where operating on the
-# root fiber is the logical activity
-#
-    def getPayload(self, *args, **kwargs):
-        """Get payload at a point
+        #
+        # Collect the fibers of the rank from the tree, since lazily
+        # created fibers (e.g., see `Tensor.fromCSR()`) are not held
+        # by the rank
+        #
+        fibers = [self.getRoot()]
 
-        Tensor-level version of method that operates on the root
-        fiber of the tensor. See `Fiber.getPayload()` for details.
+        for _ in range(depth):
+            fibers = [p for fiber in fibers for p in fiber.payloads if isinstance(p, Fiber)]
+
+        shape = self.getShape()[depth]
+
+        occupancy = sum(len(fiber) for fiber in fibers)
+        coords = len(fibers) * shape
+        density = occupancy / coords if coords > 0 else 0.0
+
+        stats = {"rank_id": self.getRankIds()[depth],
+                 "fibers": len(fibers),
+                 "occupancy": occupancy,
+                 "density": density,
+                 "format": "U" if density >= threshold else "C",
+                 "estimated_memory": {"C": 2 * occupancy, "U": coords}}
+
+        if timing:
+            rank = self.ranks[depth]
+            fmt = rank.getFormat()
+
+            stats["time"] = {}
+
+            for timed_fmt in ["C", "U"]:
+                rank.setFormat(timed_fmt)
+
+                start = time.perf_counter()
+
+                for fiber in fibers:
+                    for _ in fiber.__iter__(tick=False):
+                        pass
+
+                stats["time"][timed_fmt] = time.perf_counter() - start
+
+            rank.setFormat(fmt)
+
+        return stats
+
+    def getFormat(self, rank_id):
+        """Get the format of the given rank
+
+        Gets the format of the rank specified by the `rank_id`
+
+        Parameters
+        ----------
+
+        rank_id: string
+            The ID of the rank whose format to modify
+
+        Returns
+        -------
+
+        fmt: string
+            The format of the rank; "C" = compressed, "U" = uncompressed
+
+
+        Raises
+        ------
+
+        ValueError
+            rank_id is not a named rank in the tensor
+        """
+
+        rank_ids = self.getRankIds()
+        return self.ranks[rank_ids.index(rank_id)].getFormat()
+
+
+#
+#  Comparison operations
+#
+    def __eq__(self, other):
+        """__eq__
+
+        Check for equivalence of two tensors by matching their rank
+        ids and root fiber.
+
+        Note: The tenor's names and colors do not need to match
+
+        """
+        rankid_match = (self.getRankIds() == other.getRankIds())
+        fiber_match = (self.getRoot() == other.getRoot())
+
+        return rankid_match and fiber_match
+
+
+#
+# Tensor equivalent of Fiber methods where operating on the
+# root fiber is the logical activity
+#
+    def getPayload(self, *args, **kwargs):
+        """Get payload at a point
+
+        Tensor-level version of method that operates on the root
+        fiber of the tensor. See `Fiber.getPayload()` for details.
 
         """
 
@@ -1102,6 +1750,8 @@ class Tensor:
 
         """
 
+        self._invalidateCache()
+
         root = self.getRoot()
 
         if isinstance(root, Payload):
@@ -1111,6 +1761,104 @@ class Tensor:
         return root.getPayloadRef(*args, **kwargs)
 
 
+    def toCOO(self, dtype=None):
+        """Convert the tensor to coordinate (COO) format arrays
+
+        The fibertree is traversed once to find the leaf fibers and
+        their number of elements, and then the contents of each leaf
+        fiber are copied into preallocated arrays.
+
+        Parameters
+        ----------
+
+        dtype: numpy dtype, default=(inferred from the values)
+            The type of the array of values
+
+        Returns
+        -------
+
+        coord_arrays: list of numpy.ndarray
+            An array of coordinates for each rank (top to bottom)
+
+        values: numpy.ndarray
+            The value of each element (in lexicographic coordinate order)
+
+
+        Notes
+        -----
+
+        All elements held in the leaf fibers, including explicit
+        default values, are output.
+
+        """
+
+        root = self.getRoot()
+        depth = self.getDepth()
+
+        if depth == 0:
+            return [], np.asarray([Payload.get(root)], dtype=dtype)
+
+        #
+        # Find the leaf fibers (in order) and the coordinates above them
+        #
+        leaves = []
+        count = 0
+
+        stack = [((), root)]
+        while stack:
+            prefix, fiber = stack.pop()
+
+            if len(prefix) == depth - 1:
+                leaves.append((prefix, fiber))
+                count += len(fiber.coords)
+                continue
+
+            for c, p in zip(reversed(fiber.coords), reversed(fiber.payloads)):
+                stack.append((prefix + (c,), Payload.get(p)))
+
+        #
+        # Fill in the arrays
+        #
+        coord_arrays = [np.empty(count, dtype=np.int64) for _ in range(depth)]
+        values = None
+
+        pos = 0
+        for prefix, leaf in leaves:
+            if len(leaf.coords) == 0:
+                continue
+
+            end = pos + len(leaf.coords)
+
+            for coords, c in zip(coord_arrays, prefix):
+                coords[pos:end] = c
+
+            coord_arrays[-1][pos:end] = leaf.coords
+
+            if leaf.getStorage() == "array":
+                leaf_values = np.asarray(leaf.payloads)
+            else:
+                leaf_values = np.asarray([Payload.get(p) for p in leaf.payloads],
+                                         dtype=dtype)
+
+            if values is None:
+                values = np.empty(count, dtype=dtype or leaf_values.dtype)
+            elif dtype is None:
+                #
+                # Widen the values array if needed, e.g., from ints to floats
+                #
+                new_dtype = np.result_type(values.dtype, leaf_values.dtype)
+                if new_dtype != values.dtype:
+                    values = values.astype(new_dtype)
+
+            values[pos:end] = leaf_values
+            pos = end
+
+        if values is None:
+            values = np.empty(0, dtype=dtype)
+
+        return coord_arrays, values
+
+
     def countValues(self):
         """Get count on non-empty values in tensor
 
@@ -1153,6 +1901,8 @@ class Tensor:
 
         """
 
+        self._invalidateCache()
+
         self.getRoot().__setitem__(key, newvalue)
 
 
@@ -1164,7 +1914,7 @@ class Tensor:
 
         """
 
-        new_tensor = copy.deepcopy(self)
+        new_tensor = self._cowCopy()
 
         new_tensor.getRoot().updateCoords(func, depth=depth, **kwargs)
 
@@ -1179,7 +1929,7 @@ class Tensor:
 
         """
 
-        new_tensor = copy.deepcopy(self)
+        new_tensor = self._cowCopy()
 
         new_tensor.getRoot().updatePayloads(func, depth=depth, **kwargs)
 
@@ -1230,9 +1980,11 @@ class Tensor:
 
         """
 
-        return self._splitGeneric(Fiber.splitUniform,
-                                  *args,
-                                  **kwargs)
+        return self._cached("splitUniform",
+                            self._splitGeneric,
+                            Fiber.splitUniform,
+                            *args,
+                            **kwargs)
 
     def splitNonUniform(self, *args, **kwargs):
         """Split tensor's fibertree non-uniformly in coordinate space
@@ -1277,9 +2029,11 @@ class Tensor:
 
         """
 
-        return self._splitGeneric(Fiber.splitEqual,
-                                  *args,
-                                  **kwargs)
+        return self._cached("splitEqual",
+                            self._splitGeneric,
+                            Fiber.splitEqual,
+                            *args,
+                            **kwargs)
 
 
     def splitUnEqual(self, *args, **kwargs):
@@ -1369,7 +2123,8 @@ class Tensor:
         """Swizzle the ranks of the tensor
 
         Re-arrange (swizzle) the ranks of the tensor so they match the
-        given `rank_ids`. This is accompished via a series of rank swaps.
+        given `rank_ids`. The result may be cached (see
+        `Tensor.setCacheSize()`).
 
         Parameters
         ----------
@@ -1384,15 +2139,34 @@ class Tensor:
         swizzled_tensor: Tensor
             New tensor with ranks swizzed
 
+
+        Notes
+        -----
+
+        Only the top ranks that move are swizzled, the sub-fibers below
+        them are moved as a whole. With integer coordinates, the
+        elements of the moving ranks are flattened into an array of
+        coordinates per rank, sorted with a single (stable)
+        lexicographic sort on the new rank order and the new ranks are
+        built from the boundaries of the segments of equal coordinates
+        (see `Fiber._makeFiberFromArrays()`).
+
         """
+
+        return self._cached("swizzleRanks", self._swizzleRanks, rank_ids)
+
+
+    def _swizzleRanks(self, rank_ids):
+        """Swizzle the ranks of the tensor (see `Tensor.swizzleRanks()`)"""
+
         # Ensure that these old and new rank_ids are permutations of each other
         old_rank_ids = self.getRankIds()
         assert sorted(old_rank_ids) == sorted(rank_ids)
 
         old_name = self.getName()
-        copied = copy.deepcopy(self)
 
         if old_rank_ids == rank_ids:
+            copied = self._cowCopy()
             copied.setName(f"{old_name}+swizzled")
             return copied
 
@@ -1408,74 +2182,238 @@ class Tensor:
         for rank_id in rank_ids:
             guide.append(old_rank_ids.index(rank_id))
 
-        coords = []
-        payloads = {}
-        frontier = [(copied.getRoot(), None, -1)]
-        frontier_coords = [None] * swiz_len
+        old_shape = self.getShape(authoritative=True)
 
-        # Depth-first search through the fibertree and extract the coordinate
-        # payload pairs
-        while frontier:
-            head, coord, depth = frontier.pop()
-            if coord is not None:
-                frontier_coords[depth] = coord
+        root = self._swizzleArrays(guide[:swiz_len], old_shape)
 
-            # If this is the last point we need to swizzle, save the payload
-            if depth == swiz_len - 1:
-                new_c = tuple(frontier_coords[guide[i]] for i in range(swiz_len))
+        if root is None:
+            root = self._swizzleBuilder(guide[:swiz_len])
 
-                coords.append(new_c)
-                payloads[new_c] = head
-                continue
+        # Build the new tensor
+        kwargs = {"name": f"{old_name}+swizzled",
+                  "rank_ids": rank_ids,
+                  "default": self.getDefault(),
+                  "fiber": root,
+                  "color": self.getColor()
+                  }
 
-            # Otherwise, add this fiber to the frontier
-            for c, p in zip(head.coords, head.payloads):
-                frontier.append((p, c, depth + 1))
+        if old_shape:
+            new_shape = [old_shape[guide[i]] for i in range(swiz_len)] \
+                + old_shape[swiz_len:]
+            kwargs["shape"] = new_shape
 
-        # Sort the coordinates
-        coords.sort(reverse=True)
+        swizzled = Tensor.fromFiber(**kwargs)
 
+        return swizzled
 
-        # Add back all of the payloads
-        root = Fiber()
-        fibers = [root] + [None] * (swiz_len - 1)
-        last_coord = (None,) * swiz_len
-        while coords:
-            coord = coords.pop()
 
-            # Reuse the payloads we have gotten so far
-            same = True
-            for i, c in enumerate(coord[:-1]):
-                same = same and c == last_coord[i]
+    def _swizzleArrays(self, guide, old_shape):
+        """Swizzle the top `len(guide)` ranks of the tensor with a sort
+        of the arrays of their coordinates (see `Tensor.swizzleRanks()`)
 
-                # Get a new payload if we are on a new tree
-                if not same:
-                    child = Fiber()
-                    fibers[i].append(c, child)
-                    fibers[i + 1] = child
+        Returns None if the coordinates of the ranks are not integers.
 
-            # Append the payload
-            fibers[-1].append(coord[-1], payloads[coord])
+        """
 
-            last_coord = coord
+        swiz_len = len(guide)
 
-        # Build the new tensor
-        kwargs = {"name": f"{old_name}+swizzled",
+        arrays = self._coordArrays(swiz_len)
+
+        if arrays is None:
+            return None
+
+        coord_arrays, values = arrays
+
+        #
+        # Sort the elements on the new rank order (np.lexsort() sorts
+        # on the last key first)
+        #
+        new_arrays = [coord_arrays[g] for g in guide]
+
+        order = np.lexsort(new_arrays[::-1])
+
+        if old_shape:
+            new_shape = [old_shape[g] for g in guide]
+        else:
+            new_shape = [None] * swiz_len
+
+        return Fiber._makeFiberFromArrays([a[order] for a in new_arrays],
+                                          values[order],
+                                          new_shape,
+                                          default=self.getDefault())
+
+
+    def _splitUniformSwizzle(self, step, depth, rank_ids):
+        """Split a rank of the tensor uniformly in coordinate space
+        (see `Tensor.splitUniform()`) and swizzle the ranks of the
+        split tensor into the order `rank_ids` (see
+        `Tensor.swizzleRanks()`) in a single sort of the arrays of the
+        coordinates of the ranks (see `LazyTensor.materialize()`)
+
+        The upper coordinate of each element of the split rank is
+        computed from the array of the coordinates of that rank, so the
+        split tensor is never built. Returns None if the coordinates
+        are not integers or are outside the active range of a fiber of
+        the split rank.
+
+        """
+
+        old_rank_ids = self.getRankIds()
+        split_id = old_rank_ids[depth]
+
+        split_rank_ids = old_rank_ids[:depth] \
+            + [f"{split_id}.1", f"{split_id}.0"] \
+            + old_rank_ids[depth + 1:]
+
+        assert len(rank_ids) == len(split_rank_ids) \
+            and all(rank_id in split_rank_ids for rank_id in rank_ids)
+
+        # Find the point after which the two lists are the same, but
+        # always include both ranks of the split
+        swiz_len = len(rank_ids)
+        while swiz_len > depth + 2 and \
+              rank_ids[swiz_len - 1] == split_rank_ids[swiz_len - 1]:
+            swiz_len -= 1
+
+        if any(fiber._active_range is not None for fiber in self.ranks[depth].fibers):
+            return None
+
+        arrays = self._coordArrays(swiz_len - 1)
+
+        if arrays is None:
+            return None
+
+        coord_arrays, values = arrays
+
+        old_shape = self.getShape(authoritative=True)
+
+        coords = coord_arrays[depth]
+
+        if len(coords) == 0 or coords.min() < 0 \
+           or (old_shape and coords.max() >= old_shape[depth]):
+            return None
+
+        #
+        # Split the coordinates of the rank, and sort the elements on
+        # the new rank order (np.lexsort() sorts on the last key first)
+        #
+        split_arrays = coord_arrays[:depth] \
+            + [coords // step * step, coords] \
+            + coord_arrays[depth + 1:]
+
+        guide = [split_rank_ids.index(rank_id) for rank_id in rank_ids]
+
+        new_arrays = [split_arrays[g] for g in guide[:swiz_len]]
+
+        order = np.lexsort(new_arrays[::-1])
+
+        if old_shape:
+            # The shape of both ranks of the split is the shape of the
+            # split rank (see `Tensor._splitGeneric()`)
+            split_shape = list(old_shape)
+            split_shape.insert(depth + 1, split_shape[depth])
+
+            new_shape = [split_shape[g] for g in guide]
+        else:
+            new_shape = None
+
+        root = Fiber._makeFiberFromArrays([a[order] for a in new_arrays],
+                                          values[order],
+                                          new_shape[:swiz_len] if new_shape else [None] * swiz_len,
+                                          default=self.getDefault())
+
+        kwargs = {"name": f"{self.getName()}+split+swizzled",
                   "rank_ids": rank_ids,
                   "default": self.getDefault(),
                   "fiber": root,
                   "color": self.getColor()
                   }
 
-        old_shape = self.getShape(authoritative=True)
-        if old_shape:
-            new_shape = [old_shape[guide[i]] for i in range(swiz_len)] \
-                + old_shape[swiz_len:]
+        if new_shape:
             kwargs["shape"] = new_shape
 
-        swizzled = Tensor.fromFiber(**kwargs)
+        return Tensor.fromFiber(**kwargs)
 
-        return swizzled
+
+    def _coordArrays(self, levels):
+        """Flatten the top `levels` ranks of the tensor into an array
+        of coordinates per rank (with an entry per element of the
+        lowest of those ranks) and an array of the payloads of those
+        elements
+
+        Only the payloads are copied (and sub-fibers are copied on
+        write). Returns None if the coordinates of the ranks are not
+        integers.
+
+        """
+
+        fibers = [self.getRoot()]
+        coord_arrays = []
+
+        for level in range(levels):
+            lengths = [len(fiber.coords) for fiber in fibers]
+
+            coords = [np.asarray(fiber.coords) for fiber in fibers if len(fiber.coords)]
+            coords = np.concatenate(coords) if coords else np.zeros(0, dtype=np.int64)
+
+            if coords.ndim != 1 or coords.dtype.kind not in "iu":
+                return None
+
+            coord_arrays = [np.repeat(c, lengths) for c in coord_arrays]
+            coord_arrays.append(coords)
+
+            payloads = [Payload.get(p) for fiber in fibers for p in fiber.payloads]
+
+            if level < levels - 1:
+                fibers = payloads
+
+        values = np.empty(len(payloads), dtype=object)
+
+        for i, p in enumerate(payloads):
+            values[i] = p._cowCopy() if isinstance(p, Fiber) else p
+
+        return coord_arrays, values
+
+
+    def _swizzleBuilder(self, guide):
+        """Swizzle the top `len(guide)` ranks of the tensor with a
+        `FiberBuilder` (see `Tensor.swizzleRanks()`)"""
+
+        swiz_len = len(guide)
+
+        builder = FiberBuilder(depth=swiz_len)
+        frontier = [(self.getRoot(), None, -1)]
+        frontier_coords = [None] * swiz_len
+
+        # Depth-first search through the fibertree and extract the coordinate
+        # payload pairs
+        while frontier:
+            head, coord, depth = frontier.pop()
+            if coord is not None:
+                frontier_coords[depth] = coord
+
+            # If this is the last point we need to swizzle, save the payload
+            if depth == swiz_len - 1:
+                new_c = tuple(frontier_coords[guide[i]] for i in range(swiz_len))
+
+                #
+                # Only the payloads that are moved are copied (and
+                # sub-fibers are copied on write)
+                #
+                if isinstance(head, Fiber):
+                    head = head._cowCopy()
+                else:
+                    head = Payload.get(head)
+
+                builder.add(new_c, head)
+                continue
+
+            # Otherwise, add this fiber to the frontier
+            for c, p in zip(head.coords, head.payloads):
+                frontier.append((p, c, depth + 1))
+
+        # Sort the coordinates and add back all of the payloads
+        return builder.build()
 
 
     def swapRanks(self, depth=0):
@@ -1511,9 +2449,10 @@ class Tensor:
         #
         # Create new shape list
         #
-        # TBD: Create shape
-        #
-        shape = None
+        shape = self.getShape(authoritative=True)
+
+        if shape:
+            shape[depth], shape[depth + 1] = shape[depth + 1], shape[depth]
 
         # Only call Fiber.swapRanks if there are actually payloads to swap
         if not all(fiber.isEmpty() for fiber in self.ranks[depth].fibers):
@@ -1521,7 +2460,7 @@ class Tensor:
                                     Fiber.swapRanksBelow,
                                     depth=depth)
         else:
-            root = copy.deepcopy(self.getRoot())
+            root = self.getRoot()._cowCopy()
 
         #
         # Create Tensor from rank_ids and root fiber
@@ -1810,7 +2749,7 @@ class Tensor:
         #
         # Create new root fiber
         #
-        root_copy = copy.deepcopy(self.getRoot())
+        root_copy = self.getRoot()._cowCopy()
         if depth == 0:
             root = func(root_copy, **kwargs)
         else:
@@ -1822,6 +2761,38 @@ class Tensor:
         #
         return root
 
+#
+# Lazy transform methods
+#
+    def lazy(self):
+        """Return a lazy version of the tensor
+
+        The transforms (splits, swizzles, flattens, etc.) applied to
+        the returned `LazyTensor` are only recorded, and are applied
+        when the result is materialized or iterated over (see
+        `LazyTensor`).
+
+        Returns
+        -------
+
+        lazy_tensor: LazyTensor
+            A lazy tensor with no transforms
+
+        """
+
+        from .lazy_tensor import LazyTensor
+
+        return LazyTensor(self)
+
+
+    def materialize(self):
+        """Return the tensor (which is always materialized), so code
+        can materialize a `Tensor` or a `LazyTensor` alike (see
+        `LazyTensor.materialize()`)"""
+
+        return self
+
+
     def clearStats(self):
         """clearStats
         NDN: add comment
@@ -1975,7 +2946,12 @@ class Tensor:
 
 
     def dump(self, filename):
-        """Dump a tensor to a file in YAML format"""
+        """Dump a tensor to a file in YAML format
+
+        The YAML format is meant for small (human-edited) tensors, see
+        `Tensor.save()` for a compact binary format for large tensors.
+
+        """
 
         root = self.getRoot()
 
@@ -1993,6 +2969,217 @@ class Tensor:
         with open(filename, 'w') as file:
             yaml.dump(tensor_dict, file)
 
+#
+# Binary input/output methods
+#
+
+    def save(self, filename):
+        """Save a tensor to a file in a binary format
+
+        Unlike the YAML format (see `Tensor.dump()`), which is meant
+        for small human-edited tensors, the binary format is compact
+        and fast to load with `Tensor.fromFile()`.
+
+        Parameters
+        ----------
+
+        filename: string
+            The name of the file to write
+
+        Returns
+        -------
+        Nothing
+
+        Notes
+        -----
+
+        The file holds a magic number, a version, the length of a
+        JSON header and the header itself, followed (at an aligned
+        offset) by the arrays of the file. For each rank the arrays are:
+
+        - **segments**: the offsets of the fibers of the rank in the
+          other arrays of the rank (i.e., `len(segments)` is one more
+          than the number of fibers in the rank)
+
+        - **coords**: the coordinates of all the fibers of the rank
+
+        - **payloads**: (leaf rank only) the values of all the fibers
+          of the rank. The payloads of the other ranks are implicitly
+          the fibers of the rank below, in order.
+
+        The header records the dtype, offset and length of each
+        (little-endian) array, and each array is aligned to 64 bytes
+        so it can be used in place, e.g., when memory mapped.
+
+        Only tensors with integer coordinates and numeric (or
+        boolean) leaf payloads can be saved.
+
+        """
+
+        root = self.getRoot()
+
+        header = {'rank_ids': self.getRankIds(),
+                  'shape': self.getShape(),
+                  'name': self.getName(),
+                  'color': self.getColor(),
+                  'default': 0,
+                  'ranks': []}
+
+        arrays = []
+
+        if isinstance(root, Payload):
+            header['root'] = Payload.get(root)
+        else:
+            header['default'] = Payload.get(self.getDefault())
+
+            for level, rank_arrays in enumerate(Tensor._rankArrays(root, self.getDepth())):
+                header['ranks'].append({})
+
+                for name, array in rank_arrays.items():
+                    header['ranks'][level][name] = len(arrays)
+                    arrays.append(array.astype(array.dtype.newbyteorder('<'), copy=False))
+
+        #
+        # Lay out the arrays, with offsets relative to the (aligned)
+        # end of the header
+        #
+        header['arrays'] = []
+        offset = 0
+
+        for array in arrays:
+            header['arrays'].append({'dtype': array.dtype.str,
+                                     'length': len(array),
+                                     'offset': offset})
+
+            offset = Tensor._alignOffset(offset + array.nbytes)
+
+        header_bytes = json.dumps(header).encode()
+
+        with open(filename, 'wb') as file:
+            file.write(_FILE_MAGIC)
+            file.write(np.array([_FILE_VERSION, len(header_bytes)], dtype='<u8').tobytes())
+            file.write(header_bytes)
+
+            start = Tensor._alignOffset(file.tell())
+
+            for info, array in zip(header['arrays'], arrays):
+                file.write(bytes(start + info['offset'] - file.tell()))
+                file.write(np.ascontiguousarray(array).tobytes())
+
+
+    @staticmethod
+    def _rankArrays(root, depth):
+        """Return the (segments, coords and payloads) arrays of each
+        rank of a fibertree, see `Tensor.save()`"""
+
+        result = []
+        fibers = [root]
+
+        for level in range(depth):
+            lengths = [len(fiber.coords) for fiber in fibers]
+
+            segments = np.zeros(len(fibers) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=segments[1:])
+
+            coords = [np.asarray(fiber.coords) for fiber in fibers if len(fiber.coords)]
+            coords = np.concatenate(coords) if coords else np.zeros(0, dtype=np.int64)
+
+            assert coords.dtype.kind in "iu", \
+                "Only integer coordinates can be saved"
+
+            rank_arrays = {'segments': segments,
+                           'coords': coords.astype(np.int64, copy=False)}
+
+            if level < depth - 1:
+                fibers = [Payload.get(p) for fiber in fibers for p in fiber.payloads]
+            else:
+                payloads = [Tensor._leafValues(fiber) for fiber in fibers if len(fiber.coords)]
+                payloads = np.concatenate(payloads) if payloads else np.zeros(0)
+
+                assert payloads.dtype.kind in "biuf", \
+                    "Only numeric payloads can be saved"
+
+                rank_arrays['payloads'] = payloads
+
+            result.append(rank_arrays)
+
+        return result
+
+
+    @staticmethod
+    def _leafValues(fiber):
+        """Return the payloads of a leaf fiber as an array"""
+
+        values = np.asarray(fiber.payloads)
+
+        if values.dtype == object:
+            values = np.asarray([Payload.get(p) for p in fiber.payloads])
+
+        return values
+
+
+    @staticmethod
+    def _alignOffset(offset):
+        """Round a file offset up to the alignment of the arrays"""
+
+        return -(-offset // _FILE_ALIGN) * _FILE_ALIGN
+
+
+    @staticmethod
+    def _parseFile(buffer):
+        """Parse the contents of a binary tensor file
+
+        Parameters
+        ----------
+
+        buffer: numpy.ndarray
+            The contents of the file as an array of bytes (possibly
+            memory mapped)
+
+        Returns
+        -------
+
+        header: dict
+            The header of the file
+
+        rank_arrays: list of dicts
+            The (named) arrays of each rank, which are views of `buffer`
+
+        """
+
+        start = len(_FILE_MAGIC)
+
+        assert buffer[:start].tobytes() == _FILE_MAGIC, \
+            "Not a binary tensor file"
+
+        version, length = buffer[start:start + 16].view('<u8').tolist()
+
+        assert version <= _FILE_VERSION, \
+            f"Unsupported tensor file version: {version}"
+
+        start += 16
+        header = json.loads(buffer[start:start + length].tobytes())
+
+        start = Tensor._alignOffset(start + length)
+        arrays = []
+
+        for info in header['arrays']:
+            dtype = np.dtype(info['dtype'])
+            offset = start + info['offset']
+
+            array = buffer[offset:offset + info['length'] * dtype.itemsize].view(dtype)
+
+            if not dtype.isnative:
+                array = array.astype(dtype.newbyteorder('='))
+
+            arrays.append(array)
+
+        rank_arrays = [{name: arrays[index] for name, index in rank.items()}
+                       for rank in header['ranks']]
+
+        return header, rank_arrays
+
+
 #
 # Copy operation
 #
@@ -2005,6 +3192,46 @@ class Tensor:
         """
         return pickle.loads(pickle.dumps(self))
 
+
+    def __getstate__(self):
+        """Get state for pickling (the cache of results is not copied)"""
+
+        state = self.__dict__.copy()
+        state['_cache'] = None
+
+        return state
+
+
+    def _cowCopy(self):
+        """Create a copy-on-write copy of the tensor
+
+        The copy has its own ranks and fibers, but the fibers share
+        their coordinates and payloads with the fibers of `self` until
+        they are mutated (see `Fiber._cowCopy()`).
+
+        """
+
+        root = self._root
+
+        if not isinstance(root, Fiber):
+            return copy.deepcopy(self)
+
+        copied = copy.copy(self)
+
+        copied.ranks = []
+        next_rank = None
+
+        for rank in reversed(self.ranks):
+            next_rank = rank._emptyCopy(next_rank)
+            copied.ranks.insert(0, next_rank)
+
+        root = root._cowCopy()
+        root.setOwner(None)
+
+        copied.setRoot(root)
+
+        return copied
+
 #
 # Utility methods
 #
@@ -1165,6 +1165,27 @@ class TestFiber(unittest.TestCase):
         with self.assertRaises(AssertionError):
             Fiber.coiterActiveShape([a, b])
 
+    def test_coiterRangeShape_cursor(self):
+        """Test coiterRangeShape matches getPayload at every coordinate"""
+
+        a = Fiber.fromRandom([100], 0.1, seed=3)
+        b = Fiber.fromRandom([100], 0.5, seed=4)
+        c = Fiber(b.coords, b.payloads, storage="array")
+        d = Fiber([3, 7, 50], [Fiber([1], [2]), Fiber([], []), Fiber([0, 4], [5, 6])])
+
+        fibers = [a, b, c, d]
+
+        for start, end, step in [(0, 100, 1), (5, 60, 3), (99, 120, 1), (40, 20, 1)]:
+            with self.subTest(test=f"Range ({start}, {end}, {step})"):
+                result = list(Fiber.coiterRangeShape(fibers, start, end, step))
+                ref = [(c, tuple(f.getPayload(c) for f in fibers))
+                       for c in range(start, end, step)]
+
+                self.assertEqual([c for c, _ in result], [c for c, _ in ref])
+
+                for (_, p), (_, p_ref) in zip(result, ref):
+                    self.assertEqual(p, p_ref)
+
     def test_coiterActiveShapeRef(self):
         """Test coiterActiveShapeRef"""
         c0 = [1, 4, 8, 9]
@@ -1692,6 +1713,56 @@ class TestFiber(unittest.TestCase):
         self.assertEqual(b.getSavedPos(), 0)
 
 
+    def test_getPayload_start_pos_gallop(self):
+        """Get payload with a distant shortcut"""
+        coords = list(range(0, 200, 2))
+        payloads = [c + 1 for c in coords]
+        a = Fiber(coords, payloads)
+
+        for start_pos in [0, 3, 17, 99]:
+            for coord in range(coords[start_pos], 202):
+                with self.subTest(start_pos=start_pos, coord=coord):
+                    index = next((i for i in range(start_pos, len(coords))
+                                  if coords[i] >= coord),
+                                 len(coords))
+
+                    self.assertEqual(a._coord2pos(coord, start_pos=start_pos), index)
+
+        # Distance is still reported as the number of positions moved
+        self.assertEqual(a.getPayload(150, start_pos=3), 151)
+        self.assertEqual(a.getSavedPosStats(), (1, 72))
+        self.assertEqual(a.getSavedPos(), 75)
+
+
+    def test_getPayloadRef_unordered(self):
+        """Accumulate into an unordered (indexed) fiber"""
+        a = Fiber(ordered=False)
+
+        self.assertTrue(a.isIndexed())
+        self.assertFalse(Fiber().isIndexed())
+
+        for c, v in [(5, 1), (2, 2), (5, 3), (9, 4), (2, 5)]:
+            ref = a.getPayloadRef(c)
+            ref += v
+
+        self.assertEqual(a.getCoords(), [5, 2, 9])
+        self.assertEqual(a.getPayload(2), 7)
+        self.assertEqual(a.getPayload(5), 4)
+        self.assertEqual(a.getPayload(3), 0)
+
+        a.append(1, 6)
+        self.assertEqual(a.getPayload(1), 6)
+
+        a._deletePayload(2)
+        self.assertEqual(a.getCoords(), [5, 9, 1])
+        self.assertEqual(a.getPayload(9), 4)
+        self.assertEqual(a.getPosition(1), 2)
+
+        a._deletePayload(1)
+        self.assertEqual(a.getPosition(1), None)
+        self.assertEqual(a.getPayload(5), 4)
+
+
     def test_getPayload_start_pos_only_one_coord(self):
         """Ensure that getPayload only works if one coordinate is passed"""
         a = Fiber(default=Fiber)
@@ -3403,6 +3474,92 @@ class TestFiber(unittest.TestCase):
         with self.assertRaises(AssertionError):
             Fiber._transCoord("foo", lambda c: c + "bar")
 
+    def test_copy_on_write(self):
+        """Test copies share the fiber lists until they are mutated"""
+
+        f = Fiber([0, 2, 3],
+                  [Fiber([0, 1], [1, 2]),
+                   Fiber([1, 4], [3, 4]),
+                   Fiber([2], [5])])
+        f_ref = Fiber([0, 2, 3],
+                      [Fiber([0, 1], [1, 2]),
+                       Fiber([1, 4], [3, 4]),
+                       Fiber([2], [5])])
+
+        f_copy = f.copy()
+
+        self.assertEqual(f_copy, f)
+        self.assertIsNot(f_copy.payloads[0], f.payloads[0])
+        self.assertIs(f_copy.payloads[0].coords, f.payloads[0].coords)
+
+        ref = f_copy.getPayloadRef(0, 1)
+        ref += 10
+        ref = f_copy.getPayloadRef(2, 3)
+        ref <<= 6
+        f_copy[1] = f_copy[1]
+        f_copy.payloads[2].updatePayloads(lambda i, c, p: p + 1)
+
+        self.assertEqual(f, f_ref)
+        self.assertEqual(f_copy.getPayload(0, 1), 12)
+        self.assertEqual(f_copy.getPayload(2, 3), 6)
+        self.assertEqual(f_copy.getPayload(3, 2), 6)
+
+        f_copy = f.copy()
+
+        ref = f.getPayloadRef(2, 1)
+        ref += 10
+        f.payloads[0].append(2, 7)
+
+        self.assertEqual(f_copy, f_ref)
+
+        #
+        # Boxed payloads are not shared
+        #
+        ref = f.getPayloadRef(0, 0)
+        f_copy = f.copy()
+        ref += 1
+
+        self.assertEqual(f_copy.getPayload(0, 0), 1)
+        self.assertEqual(f.getPayload(0, 0), 2)
+
+    def test_copy_owners(self):
+        """Test copies do not share the owning ranks of the fibers"""
+
+        t = Tensor.fromUncompressed(["M", "K"], [[1, 0, 2], [0, 0, 0], [3, 4, 0]])
+        t.setDefault(7)
+        ref = Tensor.fromUncompressed(["M", "K"], [[1, 0, 2], [0, 0, 0], [3, 4, 0]])
+
+        f = t.getRoot()
+        k_rank = f.payloads[0].getOwner()
+
+        f_copy = f.copy()
+
+        self.assertIsNot(f_copy.getOwner(), f.getOwner())
+        self.assertIsNot(f_copy.payloads[0].getOwner(), k_rank)
+        self.assertEqual(f_copy.getRankIds(), ["M", "K"])
+        self.assertEqual(f_copy.payloads[0].getDefault(), 7)
+
+        #
+        # Insert a row into the copy
+        #
+        ref_k = f_copy.getPayloadRef(1, 1)
+        ref_k += 5
+
+        self.assertEqual(len(k_rank.getFibers()), 2)
+        self.assertEqual(f_copy.payloads[1].getOwner(), f_copy.payloads[0].getOwner())
+
+        #
+        # Set the format through the copy
+        #
+        f_copy.payloads[0].getRankAttrs().setFormat("U")
+
+        self.assertEqual(k_rank.getFormat(), "C")
+        self.assertEqual(f.payloads[0].getRankAttrs().getFormat(), "C")
+
+        self.assertEqual(f, ref.getRoot())
+        self.assertEqual(t.getDefault(), 7)
+
+
     def test_trace(self):
         """Test that a fiber is traced correctly"""
         A_KM = Tensor.fromUncompressed(rank_ids=["K", "M"], root=[[1, 0, 0, 4, 5, 6, 7], [1, 2, 0, 0, 0, 6, 0]])
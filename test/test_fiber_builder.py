@@ -0,0 +1,85 @@
+import unittest
+
+from fibertree import Payload
+from fibertree import Fiber
+from fibertree import FiberBuilder
+from fibertree import RankAttrs
+
+
+class TestFiberBuilder(unittest.TestCase):
+
+    def test_build_empty(self):
+        """Test building an empty fiber"""
+
+        f = FiberBuilder().build()
+
+        self.assertEqual(f, Fiber())
+
+
+    def test_build_unordered(self):
+        """Test building from unordered elements"""
+
+        builder = FiberBuilder()
+        builder.extend([7, 1, 4, 0], [70, 10, 40, 5])
+
+        self.assertEqual(len(builder), 4)
+        self.assertEqual(builder.build(), Fiber([0, 1, 4, 7], [5, 10, 40, 70]))
+
+
+    def test_build_combine(self):
+        """Test combining repeated coordinates"""
+
+        builder = FiberBuilder(combine=lambda ps: tuple(ps))
+
+        for c, p in [(5, 1), (2, 2), (5, 3), (2, 4), (8, 5)]:
+            builder.add(c, p)
+
+        f = builder.build()
+
+        self.assertEqual(f.getCoords(), [2, 5, 8])
+        self.assertEqual([Payload.get(p) for p in f.getPayloads()],
+                         [(2, 4), (1, 3), 5])
+
+
+    def test_build_repeated(self):
+        """Test repeated coordinates without a combine function"""
+
+        builder = FiberBuilder()
+        builder.extend([1, 1], [2, 3])
+
+        with self.assertRaises(AssertionError):
+            builder.build()
+
+
+    def test_build_attrs(self):
+        """Test building with fiber attributes"""
+
+        attrs = RankAttrs("K", shape=20)
+
+        builder = FiberBuilder(rank_attrs=attrs)
+        builder.extend([3, 2], [1, 1])
+
+        f = builder.build(default=-1)
+
+        self.assertEqual(f.getRankAttrs().getId(), "K")
+        self.assertEqual(f.getShape(), [20])
+        self.assertEqual(f.getDefault(), -1)
+
+
+    def test_build_tree(self):
+        """Test building a fibertree from points"""
+
+        builder = FiberBuilder(depth=2)
+
+        for point, p in [((2, 1), 21), ((0, 3), 3), ((2, 0), 20), ((0, 1), 1)]:
+            builder.add(point, p)
+
+        f = builder.build()
+
+        f_ref = Fiber([0, 2], [Fiber([1, 3], [1, 3]), Fiber([0, 1], [20, 21])])
+
+        self.assertEqual(f, f_ref)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2131,6 +2131,48 @@ class TestFiberSplit(unittest.TestCase):
 
         Metrics.endCollect()
 
+    def test_split_views(self):
+        """Test that splits of an array storage fiber are views"""
+        c = [0, 1, 9, 10, 12, 31, 41]
+        p = [1, 10, 20, 100, 120, 310, 410]
+
+        f = Fiber(c, p, storage="array")
+        f_ref = Fiber(c, p)
+
+        splits = [lambda f: f.splitUniform(10, pre_halo=2, post_halo=1),
+                  lambda f: f.splitNonUniform([0, 5, 12, 40], pre_halo=1),
+                  lambda f: f.splitEqual(3, post_halo=2),
+                  lambda f: f.splitUnEqual([1, 2, 4])]
+
+        for split in splits:
+            with self.subTest(test=split):
+                split_f = split(f)
+
+                self.assertEqual(split_f, split(f_ref))
+
+                for part in split_f.payloads:
+                    self.assertEqual(part.getStorage(), "array")
+                    self.assertIsInstance(part.coords, memoryview)
+                    self.assertIsInstance(part.payloads, memoryview)
+
+        #
+        # Mutating a partition converts it to list storage, without
+        # changing the fiber or the other partitions (that share
+        # coordinates in their halos)
+        #
+        split_f = f.splitUniform(10, pre_halo=2)
+        part0 = split_f.getPayload(0)
+        part1 = split_f.getPayload(10)
+
+        ref = part1.getPayloadRef(9)
+        ref <<= 99
+
+        self.assertEqual(part1.getStorage(), "list")
+        self.assertEqual(part1.getPayload(9), 99)
+        self.assertEqual(part0.getPayload(9), 20)
+        self.assertEqual(f.getPayload(9), 20)
+        self.assertEqual(f, f_ref)
+
 
     @staticmethod
     def _make_fiber_a():
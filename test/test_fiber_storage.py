@@ -0,0 +1,652 @@
+import array
+import bisect
+import copy
+import os
+import pickle
+import random
+import unittest
+
+import numpy as np
+
+from fibertree import CoordPayload
+from fibertree import CoordPayloadTuple
+from fibertree import Payload
+from fibertree import Fiber
+from fibertree import Metrics
+from fibertree import Tensor
+
+from fibertree.core import fiber as fiber_module
+from fibertree.core.chunked_list import ChunkedList
+
+
+class TestFiberStorage(unittest.TestCase):
+
+    def setUp(self):
+        # Make sure that no metrics are being collected, unless explicitly
+        # desired by the test
+        Metrics.endCollect()
+
+        # Make sure we have a tmp directory to write to
+        if not os.path.exists("tmp"):
+            os.makedirs("tmp")
+
+        self.coords = [0, 2, 4, 5, 8]
+        self.payloads = [3, 1, 4, 1, 5]
+
+
+    def test_default_storage(self):
+        """Test default storage is a list"""
+
+        f = Fiber(self.coords, self.payloads)
+
+        self.assertEqual(f.getStorage(), "list")
+        self.assertIsInstance(f.coords, list)
+
+
+    def test_unboxed_payloads(self):
+        """Test leaf payloads are only boxed for references"""
+
+        f = Fiber(self.coords, self.payloads)
+
+        self.assertNotIsInstance(f.payloads[1], Payload)
+
+        ref = f.getPayloadRef(2)
+        ref <<= 10
+
+        self.assertIs(f.payloads[1], ref)
+        self.assertEqual(f.getPayload(2), 10)
+
+        for c, p in f:
+            self.assertIsInstance(p, Payload)
+            self.assertIs(p, f.payloads[f.coords.index(c)])
+
+        self.assertIsInstance(f.getPayloads()[0], Payload)
+
+
+    def test_unboxed_iteration_refs(self):
+        """Test updating unboxed leaf payloads through iteration"""
+
+        for storage in ["list", "chunked"]:
+            with self.subTest(storage=storage):
+                f = Fiber(self.coords, self.payloads, storage=storage)
+
+                for c, p in f:
+                    p += 1
+
+                self.assertEqual(f, Fiber(self.coords, [4, 2, 5, 2, 6]))
+
+                for c, p in f.iterRange(3, 9):
+                    p += 1
+
+                self.assertEqual(f, Fiber(self.coords, [4, 2, 6, 3, 7]))
+
+                z_f = Fiber([0, 4, 8], [1, 1, 1], storage=storage)
+                a_f = Fiber(self.coords, self.payloads)
+
+                for c, (z, a) in z_f & a_f:
+                    z += a
+
+                self.assertEqual(z_f, Fiber([0, 4, 8], [4, 5, 6]))
+
+                #
+                # Boxing in place does not change a copy-on-write copy
+                #
+                z_copy = z_f._cowCopy()
+
+                for c, z in z_f:
+                    z += 1
+
+                self.assertEqual(z_copy, Fiber([0, 4, 8], [4, 5, 6]))
+                self.assertEqual(z_f, Fiber([0, 4, 8], [5, 6, 7]))
+
+
+    def test_unboxed_populate(self):
+        """Test populating a fiber with unboxed payloads"""
+
+        z = Fiber([0, 2], [1, 2])
+        a = Fiber([0, 1, 2], [4, 5, 6])
+
+        for c, (z_ref, a_val) in z << a:
+            z_ref += a_val
+
+        self.assertEqual(z, Fiber([0, 1, 2], [5, 5, 8]))
+
+
+    def test_array_storage(self):
+        """Test array storage"""
+
+        f = Fiber(self.coords, self.payloads, storage="array")
+
+        self.assertEqual(f.getStorage(), "array")
+        self.assertIsInstance(f.coords, array.array)
+        self.assertIsInstance(f.payloads, array.array)
+
+        self.assertEqual(f, Fiber(self.coords, self.payloads))
+        self.assertEqual(repr(f), repr(Fiber(self.coords, self.payloads)))
+        self.assertEqual(str(f), str(Fiber(self.coords, self.payloads)))
+
+
+    def test_array_storage_numpy(self):
+        """Test array storage of numpy arrays"""
+
+        coords = np.array(self.coords)
+        payloads = np.array(self.payloads, dtype=np.float64)
+
+        f = Fiber(coords, payloads, storage="array")
+
+        self.assertIsInstance(f.coords, memoryview)
+        self.assertEqual(f.getPayload(4), 4.0)
+        self.assertEqual(f.getPayload(3), 0)
+
+        f_copy = copy.deepcopy(f)
+        self.assertEqual(f_copy, f)
+
+
+    def test_array_storage_fallback(self):
+        """Test array storage of non-scalar payloads"""
+
+        f = Fiber([0, 1], [Fiber([1], [2]), Fiber([0], [3])], storage="array")
+
+        self.assertIsInstance(f.coords, array.array)
+        self.assertIsInstance(f.payloads, list)
+
+        f = Fiber([(0, 1), (1, 0)], [1, 2], storage="array")
+
+        self.assertIsInstance(f.coords, list)
+
+
+    def test_array_storage_checks(self):
+        """Test array storage attribute checks"""
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 2, 1], [1, 2, 3], storage="array")
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 2, 2], [1, 2, 3], ordered=False, storage="array")
+
+
+    def test_array_storage_iter(self):
+        """Test iteration over array storage"""
+
+        f = Fiber(self.coords, self.payloads, storage="array")
+
+        for (c, p), c_ref, p_ref in zip(f, self.coords, self.payloads):
+            self.assertEqual(c, c_ref)
+            self.assertIsInstance(p, Payload)
+            self.assertEqual(p, p_ref)
+
+
+    def test_fast_iter(self):
+        """Test the fast path of iteration"""
+
+        for storage in ["list", "array"]:
+            f = Fiber(self.coords, self.payloads, storage=storage)
+
+            result = list(f)
+
+            self.assertEqual([type(e) for e in result], [CoordPayloadTuple] * 5)
+            self.assertEqual([e.coord for e in result], self.coords)
+            self.assertEqual([e.payload for e in result], self.payloads)
+            self.assertEqual(result, list(f.iterOccupancy()))
+
+            for c, p in f:
+                self.assertIsInstance(p, Payload)
+
+            e = result[2]
+
+            self.assertEqual(e + 1, 5)
+            self.assertEqual(2 * e, 8)
+            self.assertEqual(e, CoordPayload(4, 4))
+            self.assertLess(result[1], e)
+            self.assertEqual(max(result), CoordPayload(8, 5))
+
+
+    def test_fast_iter_update(self):
+        """Test updating a boxed payload through the fast path"""
+
+        f = Fiber(self.coords, self.payloads)
+
+        ref = f.getPayloadRef(2)
+
+        for e in f:
+            if e.coord == 2:
+                self.assertIs(e.payload, ref)
+
+                e += 10
+                e.payload <<= e.payload + 1
+
+        self.assertEqual(f.getPayload(2), 12)
+
+        with self.assertRaises(AttributeError):
+            e.payload = Payload(1)
+
+
+    def test_fast_iter_defaults(self):
+        """Test the fast path skips explicit default payloads"""
+
+        for storage in ["list", "chunked", "array"]:
+            with self.subTest(storage=storage):
+                f = Fiber([0, 1, 2, 3], [4, 0, 5, 0], storage=storage)
+
+                self.assertEqual([c for c, _ in f], [0, 2])
+                self.assertIsInstance(next(iter(f)), CoordPayloadTuple)
+
+                if storage == "array":
+                    continue
+
+                #
+                # Payloads that become the default after the iterator
+                # is created are skipped too
+                #
+                f = Fiber([0, 1, 2], [4, 6, 5], storage=storage)
+                elements = iter(f)
+
+                self.assertEqual(next(elements), CoordPayload(0, 4))
+
+                ref = f.getPayloadRef(2)
+                ref <<= 0
+
+                self.assertEqual([c for c, _ in elements], [1])
+
+
+    def test_fast_iter_fallback(self):
+        """Test iteration falls back to the checked path"""
+
+        f = Fiber(self.coords, self.payloads)
+
+        Metrics.beginCollect("tmp/test_fast_iter_fallback")
+
+        self.assertIsInstance(next(iter(f)), CoordPayload)
+
+        Metrics.endCollect()
+
+        a = Fiber([0, 1], [Fiber([0], [1]), Fiber([1], [2])])
+
+        self.assertIsInstance(next(iter(a)), CoordPayload)
+
+
+    def test_array_storage_iteration_copies(self):
+        """Test iterating over array storage yields copies"""
+
+        f = Fiber(self.coords, self.payloads, storage="array")
+
+        for c, p in f:
+            p += 1
+
+        self.assertEqual(f, Fiber(self.coords, self.payloads))
+        self.assertEqual(f.getStorage(), "array")
+
+        f = Fiber(self.coords, self.payloads, storage="chunked")
+
+        for c, p in f:
+            p += 1
+
+        self.assertEqual(f, Fiber(self.coords, [4, 2, 5, 2, 6]))
+        self.assertEqual(f.getStorage(), "chunked")
+
+
+    def test_array_storage_mutate(self):
+        """Test mutation of array storage"""
+
+        f = Fiber(self.coords, self.payloads, storage="array")
+
+        ref = f.getPayloadRef(2)
+        ref += 10
+
+        self.assertEqual(f.getStorage(), "list")
+        self.assertEqual(f, Fiber(self.coords, [3, 11, 4, 1, 5]))
+
+        f = Fiber(self.coords, self.payloads, storage="array")
+        f.append(9, 2)
+
+        self.assertEqual(f, Fiber(self.coords + [9], self.payloads + [2]))
+
+
+    def test_array_storage_tensor(self):
+        """Test fromRandom with array storage"""
+
+        args = (["M", "K"], [10, 20], [1.0, 0.4])
+
+        t_list = Tensor.fromRandom(*args, seed=10)
+        t_array = Tensor.fromRandom(*args, seed=10, storage="array")
+
+        self.assertEqual(t_array.getRoot().getStorage(), "array")
+        self.assertEqual(t_array, t_list)
+
+
+    def test_spa_storage(self):
+        """Test spa storage"""
+
+        f = Fiber([2, 5, 8], [2, 3, 1], shape=10, storage="spa")
+
+        self.assertEqual(f.getStorage(), "spa")
+
+        ref = f.getPayloadRef(2)
+        ref += 10
+
+        self.assertIs(f.getPayloadRef(2), ref)
+        self.assertEqual(f.getPayload(5), 3)
+        self.assertEqual(f.getPayload(4), 0)
+        self.assertIsNone(f.getPayload(4, allocate=False))
+
+        new_ref = f.getPayloadRef(0)
+        new_ref <<= 7
+
+        self.assertEqual(f.getStorage(), "spa")
+
+        self.assertEqual(f, Fiber([0, 2, 5, 8], [7, 12, 3, 1]))
+        self.assertEqual(f.getStorage(), "list")
+
+        ref += 1
+        self.assertEqual(f.getPayload(2), 13)
+
+
+    def test_spa_storage_checks(self):
+        """Test spa storage checks"""
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 1], [1, 2], storage="spa")
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 1], [Fiber([0], [1]), Fiber([0], [1])], shape=2, storage="spa")
+
+        f = Fiber(shape=4, storage="spa")
+
+        with self.assertRaises(AssertionError):
+            f.getPayloadRef(4)
+
+        self.assertEqual(f.getPayload(-1), 0)
+
+
+    def test_spa_storage_lshift(self):
+        """Test populating a fiber with spa storage"""
+
+        a = Fiber([1, 3, 5, 7], [1, 2, 0, 4])
+        b = Fiber([0, 3, 7, 9], [2, 3, -4, 0])
+
+        z_ref = Fiber()
+        z = Fiber(shape=10, storage="spa")
+
+        for z_k in [z_ref, z]:
+            for a_k in [a, b]:
+                for k, (z_val, a_val) in z_k << a_k:
+                    z_val += a_val
+
+        self.assertEqual(z.getStorage(), "spa")
+
+        self.assertEqual(z, z_ref)
+        self.assertEqual(z.coords, [0, 1, 3, 7])
+
+
+    def test_spa_storage_metrics(self):
+        """Test populating a fiber with spa storage with metrics"""
+
+        a = Fiber([1, 3, 5, 7], [1, 2, 3, 4])
+
+        z = Fiber(shape=10, storage="spa")
+
+        Metrics.beginCollect("tmp/test_spa_storage_metrics")
+
+        for k, (z_val, a_val) in z << a:
+            z_val += a_val
+
+        Metrics.endCollect()
+
+        self.assertEqual(z.getStorage(), "list")
+        self.assertEqual(z, a)
+
+
+    def test_spa_storage_copy(self):
+        """Test copying a fiber with spa storage"""
+
+        f = Fiber([2, 4], [1, 2], shape=6, storage="spa")
+
+        self.assertEqual(copy.deepcopy(f), Fiber([2, 4], [1, 2]))
+
+
+    def test_bitmap_storage(self):
+        """Test bitmap storage"""
+
+        coords = [1, 5, 63, 64, 70, 200]
+        payloads = [1, 2, 3, 4, 5, 6]
+
+        f = Fiber(coords, payloads, shape=256, storage="bitmap")
+        f_ref = Fiber(coords, payloads)
+
+        self.assertEqual(f.getStorage(), "bitmap")
+
+        for c in [-1, 0, 1, 63, 64, 65, 70, 200, 255, 300]:
+            with self.subTest(test=f"Coordinate {c}"):
+                self.assertEqual(f._coordExists(c, f._coord2pos(c)),
+                                 f_ref._coordExists(c, f_ref._coord2pos(c)))
+                self.assertEqual(f._coord2pos(c), f_ref._coord2pos(c))
+                self.assertEqual(f.getPayload(c), f_ref.getPayload(c))
+
+        for pos, c in enumerate(coords):
+            self.assertEqual(f._bitmapSelect(pos), c)
+
+        # Lookups do not recreate the coordinates
+        self.assertNotIn("coords", f.__dict__)
+
+        self.assertEqual(f, f_ref)
+        self.assertEqual(list(f.coords), coords)
+
+        ref = f.getPayloadRef(3)
+        ref <<= 9
+
+        self.assertEqual(f.getStorage(), "list")
+        self.assertEqual(f, Fiber([1, 3, 5, 63, 64, 70, 200], [1, 9, 2, 3, 4, 5, 6]))
+
+
+    def test_bitmap_storage_checks(self):
+        """Test bitmap storage checks"""
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 1], [1, 2], storage="bitmap")
+
+        with self.assertRaises(AssertionError):
+            Fiber([0, 4], [1, 2], shape=4, storage="bitmap")
+
+
+    def test_bitmap_popcount(self):
+        """Test the population count of bitmap words without numpy's"""
+
+        words = np.array([0, 1, 0xff00, 2**63, 2**64 - 1], dtype=np.uint64)
+
+        self.assertEqual(Fiber._popcount(words).tolist(), [0, 1, 8, 1, 64])
+
+        bitwise_count = fiber_module._bitwise_count
+        fiber_module._bitwise_count = None
+
+        try:
+            self.assertEqual(Fiber._popcount(words).tolist(), [0, 1, 8, 1, 64])
+            self.assertEqual(Fiber._popcount(words[1:4:2]).tolist(), [1, 1])
+
+            coords = [1, 5, 63, 64, 70, 200]
+            f = Fiber(coords, [1, 2, 3, 4, 5, 6], shape=256, storage="bitmap")
+
+            self.assertEqual([f._coord2pos(c) for c in coords], list(range(6)))
+            self.assertEqual(f.getPayload(70), 5)
+        finally:
+            fiber_module._bitwise_count = bitwise_count
+
+
+    def test_bitmap_concat(self):
+        """Test concatenating a bitmap fiber past its shape"""
+
+        a = Fiber([0, 3], [1, 2], shape=8, storage="bitmap")
+        b = Fiber([9, 12], [3, 4])
+
+        c = a.concat(b)
+
+        self.assertEqual(c.getStorage(), "list")
+        self.assertEqual(c, Fiber([0, 3], [1, 2], shape=8).concat(b))
+        self.assertEqual(c, Fiber([0, 3, 9, 12], [1, 2, 3, 4]))
+
+
+    def test_bitmap_storage_and_or(self):
+        """Test intersection and union of bitmap fibers"""
+
+        a = Fiber([0, 2, 3, 5, 70, 100], [1, 2, 0, 4, 5, 6])
+        b = Fiber([1, 2, 3, 4, 70, 130], [1.5, 2.5, 3.5, 4.5, 5.5, 6.5])
+
+        a_k = Fiber(a.coords, a.payloads, shape=101, storage="bitmap")
+        b_k = Fiber(b.coords, b.payloads, shape=131, storage="bitmap")
+
+        result = [(c, (a_val, b_val)) for c, (a_val, b_val) in a_k & b_k]
+
+        self.assertEqual(result, [(c, (a_val, b_val)) for c, (a_val, b_val) in a & b])
+        self.assertEqual(result, [(2, (2, 2.5)), (70, (5, 5.5))])
+
+        result = [(c, (ab, a_val, b_val)) for c, (ab, a_val, b_val) in a_k | b_k]
+
+        self.assertEqual(result,
+                         [(c, (ab, a_val, b_val)) for c, (ab, a_val, b_val) in a | b])
+
+        for _, (_, a_val, b_val) in a_k | b_k:
+            self.assertIsInstance(a_val, Payload)
+            self.assertIsInstance(b_val, Payload)
+
+        self.assertNotIn("coords", a_k.__dict__)
+        self.assertNotIn("coords", b_k.__dict__)
+
+
+    def test_chunked_list(self):
+        """Test a chunked list behaves like a list"""
+
+        c = ChunkedList(range(10), load=2)
+        ref = list(range(10))
+
+        for pos, value in [(0, -1), (5, 50), (100, 99), (-2, 98), (7, 70)]:
+            c.insert(pos, value)
+            ref.insert(pos, value)
+
+        self.assertEqual(c, ref)
+        self.assertEqual(len(c), len(ref))
+        self.assertEqual([c[i] for i in range(-len(ref), len(ref))], ref + ref)
+
+        del c[3]
+        del ref[3]
+        c[4] = 40
+        ref[4] = 40
+
+        self.assertEqual(c, ref)
+        self.assertEqual(c[2:9], ref[2:9])
+        self.assertIsInstance(c[2:9], ChunkedList)
+        self.assertEqual(list(reversed(c)), ref[::-1])
+        self.assertEqual(c + c, ref + ref)
+        self.assertIn(70, c)
+
+        with self.assertRaises(IndexError):
+            c[len(ref)]
+
+        s = ChunkedList(sorted(ref), load=2)
+
+        for value in range(-2, 102):
+            self.assertEqual(s.bisect_left(value), bisect.bisect_left(sorted(ref), value))
+
+
+    def test_chunked_storage(self):
+        """Test out-of-order insertion into chunked storage fibers"""
+
+        coords = list(range(0, 6000, 2))
+        random.Random(10).shuffle(coords)
+
+        a = Fiber()
+        a_k = Fiber(storage="chunked")
+
+        for c in coords:
+            for f in (a, a_k):
+                ref = f.getPayloadRef(c)
+                ref <<= c + 1
+
+        self.assertEqual(a_k.getStorage(), "chunked")
+        self.assertIsInstance(a_k.coords, ChunkedList)
+        self.assertGreater(len(a_k.coords._blocks), 1)
+
+        self.assertEqual(a_k, a)
+        self.assertEqual(a_k.coords, list(range(0, 6000, 2)))
+        self.assertEqual(a_k.getPayload(4000), 4001)
+        self.assertEqual(a_k.getPayload(4001), 0)
+        self.assertEqual(list(a_k), list(a))
+
+        self.assertEqual(a_k[3:5], a[3:5])
+
+
+    def test_chunked_storage_concat_split(self):
+        """Test concatenating and splitting chunked storage fibers"""
+
+        a = Fiber(list(range(0, 2000, 2)), list(range(1000)))
+        b = Fiber(list(range(2000, 3000)), list(range(1000)))
+
+        a_k = Fiber(a.coords, a.payloads, storage="chunked")
+        b_k = Fiber(b.coords, b.payloads, storage="chunked")
+
+        ab_k = a_k.concat(b_k)
+
+        self.assertEqual(ab_k.getStorage(), "chunked")
+        self.assertEqual(ab_k, a.concat(b))
+
+        self.assertEqual(ab_k.splitUniform(500), a.concat(b).splitUniform(500))
+        self.assertEqual(ab_k.splitEqual(700), a.concat(b).splitEqual(700))
+
+        self.assertEqual(copy.deepcopy(ab_k), ab_k)
+        self.assertEqual(pickle.loads(pickle.dumps(ab_k)), ab_k)
+
+
+    def test_array_storage_and(self):
+        """Test intersection of array storage fibers"""
+
+        a = Fiber([0, 2, 3, 5, 7, 8], [1, 2, 0, 4, 5, 6])
+        b = Fiber([1, 2, 3, 4, 7, 9], [1.5, 2.5, 3.5, 4.5, 5.5, 6.5])
+
+        ref = [(c, (a_val, b_val)) for c, (a_val, b_val) in a & b]
+
+        for a_k, b_k in [(Fiber(a.coords, a.payloads, storage="array"),
+                          Fiber(b.coords, b.payloads, storage="array")),
+                         (Fiber(np.array(a.coords), np.array(a.payloads), storage="array"),
+                          Fiber(np.array(b.coords), np.array(b.payloads), storage="array"))]:
+
+            result = [(c, (a_val, b_val)) for c, (a_val, b_val) in a_k & b_k]
+
+            self.assertEqual(result, ref)
+            self.assertEqual(result, [(2, (2, 2.5)), (7, (5, 5.5))])
+
+            for c, (a_val, b_val) in a_k & b_k:
+                self.assertIsInstance(a_val, Payload)
+                self.assertIsInstance(b_val, Payload)
+
+            self.assertEqual(list(a_k & Fiber([], [], storage="array")), [])
+
+
+    def test_array_storage_and_metrics(self):
+        """Test intersection of array storage fibers with metrics"""
+
+        a_k = Fiber([0, 2, 3, 5], [1, 2, 3, 4], storage="array")
+        b_k = Fiber([2, 5, 6], [1, 2, 3], storage="array")
+
+        a_k.getRankAttrs().setId("K")
+        b_k.getRankAttrs().setId("K")
+
+        Metrics.beginCollect("tmp/test_array_storage_and_metrics")
+        Metrics.trace("K", type_="intersect_0")
+
+        for _ in a_k & b_k:
+            pass
+
+        Metrics.endCollect()
+
+        corr = [
+            "K_pos,K,fiber_pos\n",
+            "0,0,0\n",
+            "1,2,1\n",
+            "2,3,2\n",
+            "3,5,3\n"
+        ]
+
+        with open("tmp/test_array_storage_and_metrics-K-intersect_0.csv", "r") as f:
+            self.assertEqual(f.readlines(), corr)
+
+
+if __name__ == '__main__':
+    unittest.main()
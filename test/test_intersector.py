@@ -56,6 +56,27 @@ class TestIntersector(unittest.TestCase):
 
         self.assertEqual(intersector.getNumIntersects(), 3)
 
+    def test_num_isect_skip_ahead_style(self):
+        """ Test SkipAheadIntersector on a skip-ahead intersection"""
+        a_k = Fiber.fromUncompressed([1, 0, 0, 0, 0, 0, 0, 8, 4])
+        a_k.getRankAttrs().setId("K")
+        b_k = Fiber.fromUncompressed([0, 2, 3, 4, 6, 0, 0, 4, 0])
+        b_k.getRankAttrs().setId("K")
+
+        intersector = SkipAheadIntersector()
+
+        Metrics.beginCollect()
+        Metrics.trace("K", "intersect_0", consumable=True)
+        Metrics.trace("K", "intersect_1", consumable=True)
+        for _ in Fiber.intersection(a_k, b_k, style="skip-ahead"):
+            pass
+        intersector.addTraces(
+            Metrics.consumeTrace("K", "intersect_0"),
+            Metrics.consumeTrace("K", "intersect_1"))
+        Metrics.endCollect()
+
+        self.assertEqual(intersector.getNumIntersects(), 3)
+
     def test_num_isect_skip_ahead_empty(self):
         """ Test SkipAheadIntersector on empty fibers"""
         a_k = Fiber()
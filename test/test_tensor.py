@@ -1,5 +1,8 @@
+import gc
 import unittest
 
+import numpy as np
+
 from fibertree import Payload
 from fibertree import Fiber
 from fibertree import Metrics
@@ -192,6 +195,107 @@ class TestTensor(unittest.TestCase):
 
         self.assertEqual(tensor, tensor_ref)
 
+    def test_fromUncompressed_ndarray(self):
+        """Test construction of a tensor from a numpy array"""
+
+        tensor_ref = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+
+        t = np.array([ [   0,   0,   0,   0 ],  # 0
+                       [ 100, 101, 102,   0 ],  # 1
+                       [   0, 201,   0, 203 ],  # 2
+                       [   0,   0,   0,   0 ],  # 3
+                       [ 400,   0, 402,   0 ],  # 4
+                       [   0,   0,   0,   0 ],  # 5
+                       [   0, 601,   0, 603 ] ]) # 6
+
+        tensor = Tensor.fromUncompressed(["M", "K"], t)
+
+        self.assertEqual(tensor, tensor_ref)
+        self.assertEqual(tensor.getShape(), [7, 4])
+
+    def test_fromUncompressed_ndarray_default(self):
+        """Test construction from a numpy array matches nested lists"""
+
+        t = np.array([ [ [ -1, 2 ], [ -1, -1 ] ],
+                       [ [ -1, -1 ], [ -1, -1 ] ],
+                       [ [ 3, -1 ], [ 4, 5 ] ] ])
+
+        for default in [-1, 0, None]:
+            with self.subTest(default=default):
+                tensor_ref = Tensor.fromUncompressed(["M", "N", "K"],
+                                                     t.tolist(),
+                                                     default=default)
+                tensor = Tensor.fromUncompressed(["M", "N", "K"],
+                                                 t,
+                                                 default=default)
+
+                self.assertEqual(tensor, tensor_ref)
+                self.assertEqual(tensor.getShape(), tensor_ref.getShape())
+                self.assertEqual(tensor.getDefault(), tensor_ref.getDefault())
+
+        empty = Fiber.fromUncompressed(np.zeros((3, 2)))
+
+        self.assertEqual(empty, Fiber.fromUncompressed([[0, 0], [0, 0], [0, 0]]))
+        self.assertEqual(empty.getShape(), [3])
+
+    def test_fromCOO(self):
+        """Test construction of a tensor from COO arrays"""
+
+        tensor_ref = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+
+        m = [ 6, 1, 2, 4, 1, 6, 2, 4, 1 ]
+        k = [ 3, 0, 1, 0, 2, 1, 3, 2, 1 ]
+        v = [ 603, 100, 201, 400, 102, 601, 203, 402, 101 ]
+
+        for storage in ["list", "array"]:
+            with self.subTest(storage=storage):
+                tensor = Tensor.fromCOO(["M", "K"], [m, k], v,
+                                        shape=[7, 4],
+                                        storage=storage)
+
+                self.assertEqual(tensor, tensor_ref)
+                self.assertEqual(tensor.getShape(), [7, 4])
+
+    def test_fromCOO_repeated(self):
+        """Test construction from COO arrays with repeated coordinates"""
+
+        tensor = Tensor.fromCOO(["M", "K"],
+                                [[1, 0, 1, 1], [2, 3, 2, 0]],
+                                [1, 2, 3, 4])
+
+        fiber_ref = Fiber([0, 1], [Fiber([3], [2]), Fiber([0, 2], [4, 4])])
+
+        self.assertEqual(tensor.getRoot(), fiber_ref)
+        self.assertEqual(tensor.getShape(), [2, 4])
+
+    def test_toCOO(self):
+        """Test conversion of a tensor to COO arrays"""
+
+        tensor = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+
+        coord_arrays, values = tensor.toCOO()
+
+        self.assertEqual([c.tolist() for c in coord_arrays],
+                         [[1, 1, 1, 2, 2, 4, 4, 6, 6],
+                          [0, 1, 2, 1, 3, 0, 2, 1, 3]])
+        self.assertEqual(values.tolist(),
+                         [100, 101, 102, 201, 203, 400, 402, 601, 603])
+
+        tensor_coo = Tensor.fromCOO(["M", "K"], coord_arrays, values,
+                                    shape=tensor.getShape())
+
+        self.assertEqual(tensor_coo, tensor)
+
+    def test_toCOO_empty(self):
+        """Test conversion of an empty tensor to COO arrays"""
+
+        tensor = Tensor(rank_ids=["M", "K"])
+
+        coord_arrays, values = tensor.toCOO()
+
+        self.assertEqual(len(coord_arrays), 2)
+        self.assertEqual(len(values), 0)
+
     def test_fromUncompressed_20(self):
         """Test construction of a tensor a scalar"""
 
@@ -617,6 +721,97 @@ class TestTensor(unittest.TestCase):
 
         self.assertTrue(tensor == tensor_tmp)
 
+    def test_save(self):
+        """Test saving a tensor in the binary format"""
+
+        tensor = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        tensor.setName("A")
+        tensor.save("/tmp/test_tensor-1.ftt")
+
+        for storage in ["array", "list"]:
+            with self.subTest(storage=storage):
+                tensor_tmp = Tensor.fromFile("/tmp/test_tensor-1.ftt", storage=storage)
+
+                self.assertEqual(tensor_tmp, tensor)
+                self.assertEqual(tensor_tmp.getShape(), tensor.getShape())
+                self.assertEqual(tensor_tmp.getName(), "A")
+                self.assertEqual(tensor_tmp.getRoot().getStorage(), storage)
+
+    def test_save_random(self):
+        """Test saving a random tensor in the binary format"""
+
+        tensor = Tensor.fromRandom(["M", "K", "N"], [10, 20, 30], [1.0, 0.5, 0.2], seed=3)
+        tensor.save("/tmp/test_tensor-random.ftt")
+
+        self.assertEqual(Tensor.fromFile("/tmp/test_tensor-random.ftt"), tensor)
+
+    def test_save_mmap(self):
+        """Test lazily loading a memory-mapped tensor file"""
+
+        tensor = Tensor.fromRandom(["M", "K", "N"], [10, 20, 30], [1.0, 0.5, 0.2], seed=3)
+        tensor.save("/tmp/test_tensor-mmap.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_tensor-mmap.ftt", mmap=True)
+
+        # Only the root fiber has been created
+        self.assertEqual(len(tensor_tmp.ranks[1].getFibers()), 0)
+
+        a_k = tensor_tmp.getRoot().getPayload(2)
+        a_n = a_k.getPayloads()[0]
+
+        self.assertEqual(a_k.getRankAttrs().getId(), "K")
+        self.assertEqual(a_n.getRankAttrs().getId(), "N")
+        self.assertIs(tensor_tmp.getRoot().getPayload(2), a_k)
+
+        self.assertEqual(tensor_tmp.getPayload(2, 5), tensor.getPayload(2, 5))
+        self.assertEqual(tensor_tmp, tensor)
+
+    def test_save_mmap_mutate(self):
+        """Test mutations of a memory-mapped tensor are kept"""
+
+        tensor = Tensor.fromRandom(["M", "K", "N"], [10, 20, 30], [1.0, 0.5, 0.2], seed=3)
+        tensor.save("/tmp/test_tensor-mmap-mutate.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_tensor-mmap-mutate.ftt", mmap=True)
+
+        c = tensor.getRoot().getPayload(2).getCoords()[0]
+        n = tensor.getRoot().getPayload(2, c).getCoords()[0]
+
+        ref = tensor_tmp.getPayloadRef(2, c, n)
+        ref += 1000
+
+        ref = tensor.getPayloadRef(2, c, n)
+        ref += 1000
+
+        del ref
+        gc.collect()
+
+        self.assertEqual(tensor_tmp.getPayload(2, c, n), tensor.getPayload(2, c, n))
+        self.assertEqual(tensor_tmp, tensor)
+
+        # The file is unchanged
+        tensor_file = Tensor.fromFile("/tmp/test_tensor-mmap-mutate.ftt", mmap=True)
+        self.assertNotEqual(tensor_file.getPayload(2, c, n), tensor.getPayload(2, c, n))
+
+    def test_save_empty(self):
+        """Test saving an empty tensor in the binary format"""
+
+        tensor = Tensor(rank_ids=["M", "K"], shape=[4, 5])
+        tensor.save("/tmp/test_tensor-empty.ftt")
+
+        tensor_tmp = Tensor.fromFile("/tmp/test_tensor-empty.ftt")
+
+        self.assertEqual(tensor_tmp, tensor)
+        self.assertEqual(tensor_tmp.getShape(), [4, 5])
+
+    def test_save_rank0(self):
+        """Test saving a rank-0 tensor in the binary format"""
+
+        tensor = Tensor.fromUncompressed(rank_ids=[], root=5)
+        tensor.save("/tmp/test_tensor-rank0.ftt")
+
+        self.assertEqual(Tensor.fromFile("/tmp/test_tensor-rank0.ftt").getRoot(), 5)
+
     def test_init_mutable(self):
         t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
         self.assertFalse(t.isMutable())
@@ -683,6 +878,201 @@ class TestTensor(unittest.TestCase):
         self.assertRaises(ValueError, lambda: t.setFormat("N", "C"))
         self.assertRaises(AssertionError, lambda: t.setFormat("M", "G"))
 
+    def test_set_format_auto(self):
+        t = Tensor.fromUncompressed(["M", "K"], [[1, 2, 3, 0],
+                                                 [0, 0, 0, 4],
+                                                 [5, 6, 0, 7]])
+
+        t.setFormat("M", "auto")
+        t.setFormat("K", "auto")
+
+        self.assertEqual(t.getFormat("M"), "U")
+        self.assertEqual(t.getFormat("K"), "U")
+
+        t.setFormat("K", "auto", threshold=0.8)
+
+        self.assertEqual(t.getFormat("K"), "C")
+
+    def test_set_formats_by_density(self):
+        t = Tensor.fromRandom(["M", "K"], [10, 100], [1.0, 0.1], seed=3)
+        t.setFormat("M", "C")
+        t.setFormat("K", "U")
+
+        report = t.setFormatsByDensity()
+
+        self.assertEqual(t.getFormat("M"), "U")
+        self.assertEqual(t.getFormat("K"), "C")
+
+        self.assertEqual([stats["rank_id"] for stats in report], ["M", "K"])
+        self.assertEqual([stats["format"] for stats in report], ["U", "C"])
+
+        occupancy = t.countValues()
+
+        self.assertEqual(report[1]["fibers"], 10)
+        self.assertEqual(report[1]["occupancy"], occupancy)
+        self.assertEqual(report[1]["density"], occupancy / 1000)
+        self.assertEqual(report[1]["estimated_memory"], {"C": 2 * occupancy, "U": 1000})
+        self.assertEqual(set(report[1]["time"].keys()), {"C", "U"})
+
+        # Only the formats are set, not the storage of the fibers
+        self.assertEqual({t_k.getStorage() for _, t_k in t.getRoot()}, {"list"})
+
+    def test_set_formats_by_density_outputs(self):
+        """Test computing with tensors formatted by density"""
+
+        def matmul(a, b):
+            z = Tensor(rank_ids=["M", "N"])
+
+            for m, (z_n, a_k) in z.getRoot() << a.getRoot():
+                for k, (a_val, b_n) in a_k & b.getRoot():
+                    for n, (z_ref, b_val) in z_n << b_n:
+                        z_ref += a_val * b_val
+
+            return z
+
+        a = Tensor.fromRandom(["M", "K"], [8, 10], [0.6, 0.7], seed=3)
+        b = Tensor.fromRandom(["K", "N"], [10, 12], [0.2, 0.3], seed=4)
+
+        z_ref = matmul(a, b)
+        a_elements = len(list(a.getRoot()))
+
+        a.setFormatsByDensity()
+        b.setFormatsByDensity()
+
+        self.assertEqual(a.getFormat("M"), "U")
+        self.assertEqual(b.getFormat("K"), "C")
+
+        # The outputs are unchanged...
+        self.assertEqual(matmul(a, b), z_ref)
+
+        # ...but "U" iteration also yields the empty elements
+        self.assertEqual(a_elements, len(a.getRoot()))
+        self.assertEqual(len(list(a.getRoot())), a.getShape()[0])
+
+    def test_result_cache(self):
+        """Test caching the results of swizzles and splits"""
+
+        t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+
+        self.assertIsNone(t.getCacheStats())
+        self.assertIsNot(t.swizzleRanks(["K", "M"]), t.swizzleRanks(["K", "M"]))
+
+        t.setCacheSize(2)
+
+        t_KM = t.swizzleRanks(["K", "M"])
+        t_KM_hit = t.swizzleRanks(["K", "M"])
+
+        self.assertEqual(t_KM_hit, t_KM)
+        self.assertEqual(t_KM_hit.isMutable(), t.isMutable())
+        self.assertEqual(t_KM, t.swapRanks())
+
+        t_split = t.splitUniform(5, depth=1)
+
+        self.assertEqual(t.splitUniform(5, depth=1), t_split)
+        self.assertNotEqual(t.splitUniform(5).getRankIds(), t_split.getRankIds())
+
+        # The swizzle was evicted as the least recently used result
+        t.splitEqual(2)
+
+        self.assertEqual(t.getCacheStats()["size"], 2)
+        self.assertEqual(t.swizzleRanks(["K", "M"]), t_KM)
+
+        self.assertEqual(t.getCacheStats(),
+                         {"hits": 2,
+                          "misses": 5,
+                          "evictions": 3,
+                          "invalidations": 0,
+                          "size": 2,
+                          "maxsize": 2})
+
+        #
+        # Mutating the tensor invalidates the cache
+        #
+        t_KM = t.swizzleRanks(["K", "M"])
+        ref = t.getPayloadRef(0, 0)
+        ref <<= 7
+
+        t_KM_new = t.swizzleRanks(["K", "M"])
+
+        self.assertNotEqual(t_KM_new, t_KM)
+        self.assertEqual(t_KM_new.getPayload(0, 0), 7)
+        self.assertEqual(t.getCacheStats()["invalidations"], 1)
+
+        t.setCacheSize(0)
+
+        self.assertIsNone(t.getCacheStats())
+
+    def test_result_cache_mutate(self):
+        """Test mutating a cached result does not change the cache"""
+
+        t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        t.setMutable(True)
+        t.setCacheSize(2)
+
+        s = t.swizzleRanks(["K", "M"])
+        value = s.getPayload(0, 0)
+
+        ref = s.getPayloadRef(0, 0)
+        ref += 100
+
+        for _, s_m in s.getRoot():
+            for _, p in s_m:
+                p += 1
+
+        s_hit = t.swizzleRanks(["K", "M"])
+
+        self.assertEqual(t.getCacheStats()["hits"], 1)
+        self.assertEqual(s_hit.getPayload(0, 0), value)
+        self.assertEqual(s_hit, t.swapRanks())
+        self.assertEqual(s.getPayload(0, 0), value + 101)
+
+        t_split = t.splitUniform(5, depth=1)
+        t_split.getRoot().append(9, Fiber([0], [Fiber([0], [1])]))
+
+        self.assertTrue(t_split.isMutable())
+
+        self.assertEqual(t.splitUniform(5, depth=1), t.swapRanks().swapRanks().splitUniform(5, depth=1))
+
+    def test_result_cache_fiber_mutate(self):
+        """Test mutating the fibers of a tensor invalidates its cache"""
+
+        t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
+        t.setCacheSize(4)
+
+        mutations = [lambda: t.getRoot().getPayloadRef(0, 9).__iadd__(3),
+                     lambda: t.getRoot().getPayload(1).getPayloadRef(0).__iadd__(5),
+                     lambda: t.getRoot().append(7, Fiber([2], [4])),
+                     lambda: t.getRoot() << Fiber([8], [Fiber([1], [6])])]
+
+        def populate():
+            for _, (t_k, a_k) in t.getRoot() << Fiber([9], [Fiber([3], [7])]):
+                for _, (t_ref, a_val) in t_k << a_k:
+                    t_ref += a_val
+
+        def accumulate():
+            for _, t_k in t.getRoot():
+                for _, t_val in t_k:
+                    t_val += 1
+
+        for mutate in mutations + [populate, accumulate]:
+            t.swizzleRanks(["K", "M"])
+            t.splitUniform(5, depth=1)
+
+            mutate()
+
+            misses = t.getCacheStats()["misses"]
+
+            self.assertEqual(t.swizzleRanks(["K", "M"]), t.swapRanks())
+            self.assertEqual(t.splitUniform(5, depth=1),
+                             t.swapRanks().swapRanks().splitUniform(5, depth=1))
+
+            self.assertEqual(t.getCacheStats()["misses"], misses + 2)
+
+        hits = t.getCacheStats()["hits"]
+        t.swizzleRanks(["K", "M"])
+
+        self.assertEqual(t.getCacheStats()["hits"], hits + 1)
+
     def test_format_after_split(self):
         t = Tensor.fromYAMLfile("./data/test_tensor-1.yaml")
         t.setFormat("K", "U")
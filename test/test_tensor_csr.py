@@ -0,0 +1,166 @@
+import gc
+import os
+import unittest
+
+import numpy as np
+
+from fibertree import Fiber
+from fibertree import Metrics
+from fibertree import Tensor
+
+
+class TestTensorCSR(unittest.TestCase):
+
+    def setUp(self):
+        # Make sure that no metrics are being collected, unless explicitly
+        # desired by the test
+        Metrics.endCollect()
+
+        # Make sure we have a tmp directory to write to
+        if not os.path.exists("tmp"):
+            os.makedirs("tmp")
+
+        self.indptr = np.array([0, 2, 2, 5, 6])
+        self.indices = np.array([1, 3, 0, 2, 3, 4])
+        self.data = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+        self.dense = [[0, 1, 0, 2, 0],
+                      [0, 0, 0, 0, 0],
+                      [3, 0, 4, 5, 0],
+                      [0, 0, 0, 0, 6]]
+
+        self.ref = Tensor.fromUncompressed(["M", "K"], self.dense)
+
+
+    def makeCSR(self):
+        return Tensor.fromCSR(["M", "K"], self.indptr, self.indices, self.data)
+
+
+    def test_fromCSR(self):
+        """Test creating a tensor from CSR arrays"""
+
+        t = self.makeCSR()
+
+        self.assertEqual(t.getRankIds(), ["M", "K"])
+        self.assertEqual(t.getShape(), [4, 5])
+        self.assertEqual(t, self.ref)
+
+        a_m = t.getRoot()
+        self.assertEqual(a_m.getCoords().tolist(), [0, 2, 3])
+
+        a_k = a_m.getPayload(2)
+        self.assertEqual(a_k.getStorage(), "array")
+        self.assertIs(a_k.getOwner(), t.ranks[1])
+        self.assertEqual(a_k.getRankAttrs().getId(), "K")
+
+        self.assertEqual(t.getPayload(2, 3), 5.0)
+        self.assertEqual(t.getPayload(1, 3), 0)
+
+
+    def test_fromCSR_views(self):
+        """Test the row fibers are views of the arrays"""
+
+        t = self.makeCSR()
+
+        self.data[3] = 40.0
+
+        self.assertEqual(t.getPayload(2, 2), 40.0)
+
+
+    def test_fromCSR_mutate(self):
+        """Test mutations of the row fibers are kept"""
+
+        t = self.makeCSR()
+
+        ref = t.getRoot().getPayloadRef(0, 1)
+        ref += 7
+
+        row = t.getRoot().getPayload(3)
+        row.append(5, 8.0)
+
+        del ref, row
+        gc.collect()
+
+        self.assertEqual(t.getPayload(0, 1), 8.0)
+        self.assertEqual(t.getRoot().getPayload(3).getCoords(), [4, 5])
+        self.assertEqual(t.getRoot().getPayload(3).getStorage(), "list")
+
+        # The other rows are still views and the arrays are unchanged
+        self.assertEqual(t.getRoot().getPayload(2).getStorage(), "array")
+        self.assertEqual(self.data.tolist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+
+
+    def test_fromCSR_unsorted(self):
+        """Test rows with unsorted coordinates are illegal"""
+
+        with self.assertRaises(AssertionError):
+            Tensor.fromCSR(["M", "K"], [0, 2, 3], [3, 1, 0], [1, 2, 3])
+
+
+    def test_fromCSC(self):
+        """Test creating a tensor from CSC arrays"""
+
+        t = Tensor.fromCSC(["K", "M"],
+                           self.indptr,
+                           self.indices,
+                           self.data,
+                           shape=[5, 4])
+
+        self.assertEqual(t.getRankIds(), ["M", "K"])
+        self.assertEqual(t.getShape(), [4, 5])
+        self.assertEqual(t, self.ref)
+
+
+    def test_and(self):
+        """Test intersection with rows of a CSR tensor"""
+
+        a_m = self.makeCSR().getRoot()
+        b_k = Fiber([0, 3, 4], [2, 3, 4])
+
+        result = [(m, [(k, a * b) for k, (a, b) in a_k & b_k])
+                  for m, a_k in a_m]
+
+        self.assertEqual(result, [(0, [(3, 6.0)]),
+                                  (2, [(0, 6.0), (3, 15.0)]),
+                                  (3, [(4, 24.0)])])
+
+
+    def test_lshift(self):
+        """Test populating a tensor from a CSR tensor"""
+
+        a = self.makeCSR()
+        z = Tensor(rank_ids=["M", "K"])
+
+        for m, (z_k, a_k) in z.getRoot() << a.getRoot():
+            for k, (z_ref, a_val) in z_k << a_k:
+                z_ref += a_val
+
+        self.assertEqual(z, self.ref)
+
+
+    def test_metrics(self):
+        """Test metrics collected on a CSR tensor"""
+
+        b_k = Fiber([0, 3, 4], [2, 3, 4])
+
+        for name, a in [("ref", self.ref), ("csr", self.makeCSR())]:
+            Metrics.beginCollect(f"tmp/test_tensor_csr_metrics_{name}")
+            Metrics.trace("K", type_="intersect_0")
+
+            for m, a_k in a.getRoot().iterShapeRef():
+                for _ in a_k & b_k:
+                    pass
+
+            Metrics.endCollect()
+
+        with open("tmp/test_tensor_csr_metrics_ref-K-intersect_0.csv", "r") as f:
+            corr = f.readlines()
+
+        with open("tmp/test_tensor_csr_metrics_csr-K-intersect_0.csv", "r") as f:
+            self.assertEqual(f.readlines(), corr)
+
+        self.assertGreater(len(corr), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 from fibertree import Payload
@@ -5,6 +6,7 @@ from fibertree import Fiber
 from fibertree import Metrics
 from fibertree import Rank
 from fibertree import Tensor
+from fibertree import LazyTensor
 
 
 class TestTensorTransform(unittest.TestCase):
@@ -397,6 +399,45 @@ class TestTensorTransform(unittest.TestCase):
         a_MMKK_2 = a_MKMK.swizzleRanks(["M.1", "M.0", "K.1", "K.0"])
         self.assertEqual(a_MMKK_2, a_MMKK)
 
+    def test_swizzleRanks_sort(self):
+        """ Test swizzleRanks() with a sort of the coordinate arrays """
+
+        a = Tensor.fromRandom(["A", "B", "C", "D"], [4, 5, 3, 6], [1.0, 0.6, 0.5, 0.5], seed=4)
+
+        rank_ids = a.getRankIds()
+        shape = a.getShape(authoritative=True)
+
+        for new_rank_ids, swiz_len in [(["D", "C", "B", "A"], 4),
+                                       (["B", "A", "C", "D"], 2),
+                                       (["C", "A", "B", "D"], 3)]:
+            with self.subTest(test="".join(new_rank_ids)):
+                guide = [rank_ids.index(r) for r in new_rank_ids][:swiz_len]
+
+                a_sorted = a._swizzleArrays(guide, shape)
+
+                self.assertEqual(a_sorted, a._swizzleBuilder(guide))
+
+                swizzled = a.swizzleRanks(new_rank_ids)
+
+                self.assertEqual(swizzled.getRankIds(), new_rank_ids)
+                self.assertEqual(swizzled.getShape(), [shape[rank_ids.index(r)] for r in new_rank_ids])
+                self.assertEqual(swizzled.swizzleRanks(rank_ids), a)
+
+    def test_swizzleRanks_tuple_coords(self):
+        """ Test swizzleRanks() of ranks with tuple coordinates """
+
+        f = Fiber([(0, 1), (2, 3)], [Fiber([1, 5], [1, 2]), Fiber([0], [3])])
+        a = Tensor.fromFiber(["A", "B"], f)
+
+        self.assertIsNone(a._swizzleArrays([1, 0], None))
+
+        a_BA = a.swizzleRanks(["B", "A"])
+
+        self.assertEqual(a_BA.getRoot(),
+                         Fiber([0, 1, 5], [Fiber([(2, 3)], [3]),
+                                           Fiber([(0, 1)], [1]),
+                                           Fiber([(0, 1)], [2])]))
+
     def test_swizzleRanks_empty(self):
         """ Test swizzleRanks() on an empty tensor """
         Z_MNOP = Tensor(rank_ids=["M", "N", "O", "P"])
@@ -697,6 +738,147 @@ class TestTensorTransform(unittest.TestCase):
 
         self.assertEqual(t, t3)
 
+    def test_transform_copy_on_write(self):
+        """Test mutating the result of a transform leaves its input unchanged"""
+
+        uncompressed = [[1, 0, 3, 0], [0, 5, 0, 7], [0, 0, 0, 0], [2, 2, 0, 1]]
+
+        a = Tensor.fromUncompressed(["M", "K"], uncompressed)
+        a_ref = Tensor.fromUncompressed(["M", "K"], uncompressed)
+
+        def mutate(fiber):
+            for c, p in list(zip(fiber.coords, fiber.payloads)):
+                if isinstance(p, Fiber):
+                    mutate(p)
+                else:
+                    ref = fiber.getPayloadRef(c)
+                    ref += 100
+
+        results = [a.splitUniform(2),
+                   a.splitUniform(2, depth=1),
+                   a.swizzleRanks(["K", "M"]),
+                   a.swizzleRanks(["M", "K"]),
+                   a.swapRanks(),
+                   a.flattenRanks(),
+                   a.updatePayloads(lambda i, c, p: p, depth=1),
+                   a.updateCoords(lambda i, c, p: c, depth=1)]
+
+        for result in results:
+            with self.subTest(test=result.getName()):
+                mutate(result.getRoot())
+                self.assertEqual(a, a_ref)
+
+        result = a.updatePayloads(lambda i, c, p: p, depth=1)
+        mutate(a.getRoot())
+
+        self.assertEqual(result, a_ref)
+        self.assertIs(result.getRoot().getPayload(0).getOwner(), result.ranks[1])
+
+    def test_lazy_materialize(self):
+        """ Test materializing a chain of lazy transforms """
+
+        a = Tensor.fromRandom(["M", "K", "N"], [20, 30, 10], [1.0, 0.3, 0.5], seed=5)
+        a_ref = copy.deepcopy(a)
+
+        chains = {"split-swizzle": lambda t: t.splitUniform(4, depth=1).swizzleRanks(["M", "K.1", "N", "K.0"]),
+                  "split-swap": lambda t: t.splitUniform(4).swapRanks(depth=0),
+                  "split-swaps": lambda t: t.splitUniform(3, rankid="N").swapRanks(depth=1).swapRanks(depth=0),
+                  "split-halo-swizzle": lambda t: t.splitUniform(4, pre_halo=1).swizzleRanks(["K", "M.1", "M.0", "N"]),
+                  "swizzle-swap": lambda t: t.swizzleRanks(["N", "K", "M"]).swapRanks(depth=1),
+                  "split-swizzle-flatten": lambda t: t.splitUniform(4, depth=1).swizzleRanks(["M", "K.1", "N", "K.0"]).flattenRanks(depth=2),
+                  "flatten-unflatten": lambda t: t.flattenRanks(depth=1).unflattenRanks(depth=1),
+                  "split-equal": lambda t: t.splitEqual(3).swapRanks(depth=1),
+                  "flatten-2": lambda t: t.flattenRanks(depth=0, levels=2),
+                  "merge-2": lambda t: t.mergeRanks(levels=2),
+                  "flatten-2-unflatten-2": lambda t: t.flattenRanks(levels=2).unflattenRanks(levels=2),
+                  "flatten-2-linear": lambda t: t.flattenRanks(levels=2, coord_style="linear"),
+                  "split-equal-flatten-2": lambda t: t.splitEqual(3).flattenRanks(depth=1, levels=2),
+                  "swap-swap-swap": lambda t: t.swapRanks(depth=0).swapRanks(depth=1).swapRanks(depth=0),
+                  "none": lambda t: t}
+
+        #
+        # The shapes of the ranks of `b` are larger than its coordinates,
+        # and `c` is empty
+        #
+        b = Tensor.fromRandom(["M", "K", "N"], [7, 6, 5], [1.0, 0.8, 0.5], seed=1)
+        c = Tensor(rank_ids=["M", "K"], shape=[4, 5])
+
+        tests = [(test, a, chain) for test, chain in chains.items()] \
+            + [("small-split-swap", b, lambda t: t.splitUniform(3, depth=1).swapRanks(depth=0)),
+               ("small-swap", b, lambda t: t.swapRanks()),
+               ("empty-swap", c, lambda t: t.swapRanks()),
+               ("empty-split-swizzle", c, lambda t: t.splitUniform(2).swizzleRanks(["K", "M.1", "M.0"]))]
+
+        for test, t, chain in tests:
+            with self.subTest(test=test):
+                t_ref = copy.deepcopy(t)
+
+                lazy = chain(t.lazy())
+                t_verify = chain(t)
+
+                self.assertIsInstance(lazy, LazyTensor)
+                self.assertEqual(lazy.getRankIds(), t_verify.getRankIds())
+                self.assertEqual(lazy.getShape(), t_verify.getShape())
+
+                t_out = lazy.materialize()
+
+                self.assertIsInstance(t_out, Tensor)
+                self.assertEqual(t_out, t_verify)
+                self.assertEqual(t_out.getRankIds(), t_verify.getRankIds())
+                self.assertEqual(t_out.getShape(), t_verify.getShape())
+                self.assertEqual(t, t_ref)
+
+        self.assertEqual(b.splitUniform(3, depth=1).swapRanks(depth=0).getShape(), [6, 7, 6, 5])
+        self.assertEqual(c.swapRanks().getShape(), [5, 4])
+
+        self.assertIs(a.materialize(), a)
+
+    def test_lazy_root(self):
+        """ Test iterating over the root of a chain of lazy transforms """
+
+        a = Tensor.fromRandom(["M", "K", "N"], [20, 30, 10], [1.0, 0.3, 0.5], seed=6)
+
+        lazy = a.lazy().splitUniform(4, depth=1).swizzleRanks(["M", "K.1", "N", "K.0"])
+        a_verify = lazy.materialize()
+        a_eager = a.splitUniform(4, depth=1).swizzleRanks(["M", "K.1", "N", "K.0"])
+
+        self.assertEqual(lazy.getRankIds(), a_eager.getRankIds())
+        self.assertEqual(lazy.getShape(), a_eager.getShape())
+        self.assertEqual(a_verify.getShape(), a_eager.getShape())
+
+        root = lazy.getRoot()
+
+        self.assertTrue(root.isLazy())
+        self.assertEqual(root.getRankAttrs().getId(), "M")
+        self.assertEqual(root.getRankAttrs().getShape(), a_eager.getShape()[0])
+        self.assertEqual(Fiber.fromLazy(root), a_verify.getRoot())
+        self.assertEqual([c for c, _ in lazy], a_verify.getRoot().getCoords())
+
+        # A transform of the top rank is applied to the whole tensor
+        lazy = a.lazy().splitUniform(4).swapRanks(depth=0)
+        a_eager = a.splitUniform(4).swapRanks(depth=0)
+
+        self.assertEqual(lazy.getRankIds(), a_eager.getRankIds())
+        self.assertEqual(lazy.getShape(), a_eager.getShape())
+
+        self.assertFalse(lazy.getRoot().isLazy())
+        self.assertEqual(lazy.getRoot(), lazy.materialize().getRoot())
+        self.assertEqual(lazy.getRoot().getRankAttrs().getId(), "M.0")
+
+        # Flattening more than one level below a split
+        flat = a.lazy().splitEqual(3).flattenRanks(depth=1, levels=2)
+        flat_eager = a.splitEqual(3).flattenRanks(depth=1, levels=2)
+
+        self.assertEqual(flat.getRankIds(), flat_eager.getRankIds())
+        self.assertEqual(flat.getShape(), flat_eager.getShape())
+        self.assertTrue(flat.getRoot().isLazy())
+        self.assertEqual(Fiber.fromLazy(flat.getRoot()), flat_eager.getRoot())
+
+        # Only the sub-fibers reached by iteration are transformed
+        for c, p in lazy.splitEqual(2, depth=1):
+            self.assertEqual(p, a.splitUniform(4).swapRanks(depth=0).splitEqual(2, depth=1).getPayload(c))
+            break
+
 
 if __name__ == '__main__':
     unittest.main()
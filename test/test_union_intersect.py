@@ -198,6 +198,118 @@ class TestUnionIntersect(unittest.TestCase):
             self.assertEqual(f.readlines(), corr)
 
 
+    def test_intersection_skip_ahead(self):
+        """Test the skip-ahead intersection() style"""
+        a_k = Fiber.fromUncompressed([1, 0, 0, 0, 0, 0, 0, 8, 4, 0, 3])
+        a_k.getRankAttrs().setId("K")
+        b_k = Fiber.fromUncompressed([0, 2, 3, 4, 6, 0, 0, 4, 0, 0, 5])
+        b_k.getRankAttrs().setId("K")
+
+        # Check the elements
+        cc = [7, 10]
+        cp = [(8, 4), (3, 5)]
+
+        ans = Fiber.intersection(a_k, b_k, style="skip-ahead")
+        for i, (c, p) in enumerate(ans):
+            self.assertEqual(cc[i], c)
+            self.assertEqual(cp[i], p)
+
+        self.assertEqual(i, 1)
+
+        # Check the fiber fields
+        self.assertEqual(ans.getActive(), (0, 11))
+        self.assertEqual(ans.getRankAttrs().getId(), "K")
+
+    def test_intersection_leapfrog(self):
+        """Test the leapfrog intersection() style"""
+        a_k = Fiber.fromUncompressed([1, 0, 3, 4, 5, 0, 2, 0, 1])
+        b_k = Fiber.fromUncompressed([0, 6, 7, 0, 8, 0, 3, 1, 1])
+        c_k = Fiber.fromUncompressed([10, 0, 9, 0, 12, 0, 0, 0, 2])
+        d_k = Fiber.fromUncompressed([1, 1, 1, 1, 1, 0, 1, 1, 1])
+
+        # Check the elements
+        cc = [2, 4, 8]
+        cp = [(3, 7, 9, 1), (5, 8, 12, 1), (1, 1, 2, 1)]
+
+        ans = Fiber.intersection(a_k, b_k, c_k, d_k, style="leapfrog")
+
+        self.assertEqual([c for c, p in ans], cc)
+        self.assertEqual([p for c, p in ans], cp)
+
+        for style in ["two-finger", "leader-follower"]:
+            ref = Fiber.intersection(a_k, b_k, c_k, d_k, style=style)
+            self.assertEqual(list(ans), [e for e in ref if e.coord in cc])
+
+    def test_intersection_leapfrog_explicit_zeros(self):
+        """Test the leapfrog intersection() skips explicit zeros"""
+        a_k = Fiber([0, 2, 3, 5], [1, 0, 3, 4])
+        b_k = Fiber([2, 3, 5], [1, 2, 0])
+        c_k = Fiber([0, 2, 3, 5], [1, 1, 1, 1])
+
+        ans = Fiber.intersection(a_k, b_k, c_k, style="leapfrog")
+
+        self.assertEqual([c for c, p in ans], [3])
+        self.assertEqual([p for c, p in ans], [(3, 2, 1)])
+
+    def test_intersection_styles(self):
+        """Test the merge styles of intersection() match the operator"""
+        a_k = Fiber([0, 1, 2, 3, 9, 20, 21], [1, 2, 3, 4, 5, 6, 7])
+        b_k = Fiber([3, 9, 10, 11, 12, 13, 21, 30], [1, 2, 3, 4, 5, 6, 7, 8])
+
+        ref = [(c, (Payload.get(a), Payload.get(b))) for c, (a, b) in a_k & b_k]
+
+        for style in ["two-finger", "skip-ahead", "leapfrog"]:
+            with self.subTest(style=style):
+                ans = Fiber.intersection(a_k, b_k, style=style)
+                self.assertEqual([(c, p) for c, p in ans], ref)
+
+                ans = Fiber.intersection(b_k, a_k, style=style)
+                self.assertEqual([(c, Payload.get(p)[::-1]) for c, p in ans], ref)
+
+    def test_intersection_update(self):
+        """Test updating the fibers through the intersection() payloads"""
+
+        for collect in [False, True]:
+            for style in ["two-finger", "skip-ahead", "leapfrog"]:
+                with self.subTest(collect=collect, style=style):
+                    z_k = Fiber([0, 2, 3, 5], [1, 2, 3, 4])
+                    z_k.getRankAttrs().setId("K")
+                    a_k = Fiber([0, 3, 4, 5], [10, 20, 30, 40])
+                    a_k.getRankAttrs().setId("K")
+
+                    if collect:
+                        Metrics.beginCollect("tmp/test_intersection_update")
+
+                    for c, (z_ref, a_val) in Fiber.intersection(z_k, a_k, style=style):
+                        z_ref += a_val
+
+                    Metrics.endCollect()
+
+                    self.assertEqual(z_k, Fiber([0, 2, 3, 5], [11, 2, 23, 44]))
+                    self.assertEqual(a_k, Fiber([0, 3, 4, 5], [10, 20, 30, 40]))
+
+    def test_intersection_skip_ahead_metrics(self):
+        """Test the skip-ahead intersection() records the two-finger traces"""
+        a_k = Fiber.fromUncompressed([1, 0, 3, 4, 5])
+        a_k.getRankAttrs().setId("K")
+        b_k = Fiber.fromUncompressed([0, 6, 7, 0, 8])
+        b_k.getRankAttrs().setId("K")
+
+        for style in ["two-finger", "skip-ahead"]:
+            Metrics.beginCollect(f"tmp/test_intersection_skip_ahead_metrics-{style}")
+            Metrics.trace("K", type_="intersect_0")
+            Metrics.trace("K", type_="intersect_1")
+            for _ in Fiber.intersection(a_k, b_k, style=style):
+                pass
+            Metrics.endCollect()
+
+        for trace in ["intersect_0", "intersect_1"]:
+            with open(f"tmp/test_intersection_skip_ahead_metrics-two-finger-K-{trace}.csv", "r") as f:
+                corr = f.readlines()
+
+            with open(f"tmp/test_intersection_skip_ahead_metrics-skip-ahead-K-{trace}.csv", "r") as f:
+                self.assertEqual(f.readlines(), corr)
+
 
 #     def test_intersection_tuple():
 #         A_coords = [(0, 2), (0, 8), (2, 10), (3, 2), (3, 4), (3, 6), (4, 17)]
@@ -391,6 +503,84 @@ class TestUnionIntersect(unittest.TestCase):
                 id_ = z_m.getRankAttrs().getId()
                 self.assertEqual(id_, "M")
 
+    def test_union_explicit_zeros(self):
+        """Test union skips explicit zeros"""
+
+        a_m = Fiber([0, 2, 3], [1, 0, 3])
+        b_m = Fiber([1, 2, 3], [0, 0, 4])
+        c_m = Fiber([2, 5], [0, 6])
+
+        z_m = Fiber.union(a_m, b_m, c_m)
+
+        self.assertEqual([(c, p) for c, p in z_m],
+                         [(0, ('A', 1, 0, 0)),
+                          (3, ('AB', 3, 4, 0)),
+                          (5, ('C', 0, 0, 6))])
+
+    def test_union_update(self):
+        """Test updating the fibers through the union() payloads"""
+
+        for collect in [False, True]:
+            with self.subTest(collect=collect):
+                z_k = Fiber([0, 2, 3, 5], [1, 2, 3, 4])
+                z_k.getRankAttrs().setId("K")
+                a_k = Fiber([0, 3, 4], [10, 20, 30])
+                a_k.getRankAttrs().setId("K")
+                b_k = Fiber([3, 5, 6], [100, 200, 300])
+                b_k.getRankAttrs().setId("K")
+
+                if collect:
+                    Metrics.beginCollect("tmp/test_union_update")
+
+                for c, (mask, z_ref, a_val, b_val) in Fiber.union(z_k, a_k, b_k):
+                    if "A" in mask:
+                        z_ref += a_val + b_val
+
+                    if "B" in mask:
+                        a_val += 1
+
+                Metrics.endCollect()
+
+                self.assertEqual(z_k, Fiber([0, 2, 3, 5], [11, 2, 123, 204]))
+                self.assertEqual(a_k, Fiber([0, 3, 4], [11, 21, 31]))
+                self.assertEqual(b_k, Fiber([3, 5, 6], [100, 200, 300]))
+
+    def test_union_reduce(self):
+        """Test unionReduce()"""
+
+        a_m = self.input["a1_m"]
+        b_m = self.input["b1_m"]
+        c_m = self.input["c1_m"]
+
+        ans = Fiber([0, 1, 2, 3, 4, 6], [4, 2, 10, 5, 5, 7])
+
+        z_m = Fiber.unionReduce(a_m, b_m, c_m)
+
+        self.assertEqual([(c, p) for c, p in z_m], [(c, p) for c, p in ans])
+        self.assertEqual(z_m.getRankAttrs().getId(), "M")
+
+        z_m = Fiber.unionReduce(a_m, b_m, c_m, func=max)
+
+        self.assertEqual([p for c, p in z_m], [2, 2, 4, 5, 5, 7])
+
+    def test_union_reduce_metrics(self):
+        """Test unionReduce() with metrics records the union traces"""
+
+        a_m = self.input["a1_m"]
+        b_m = self.input["b1_m"]
+
+        Metrics.beginCollect("tmp/test_union_reduce_metrics")
+        Metrics.trace("M", type_="union_0")
+
+        z_m = [(c, p) for c, p in Fiber.unionReduce(a_m, b_m)]
+
+        Metrics.endCollect()
+
+        self.assertEqual(z_m, [(0, 3), (2, 7), (3, 5), (4, 5), (6, 7)])
+
+        with open("tmp/test_union_reduce_metrics-M-union_0.csv", "r") as f:
+            self.assertEqual(len(f.readlines()), 5)
+
 
 if __name__ == '__main__':
     unittest.main()